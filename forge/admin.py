@@ -3,7 +3,9 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django import forms
-from .models import ForgeApp, RepoValidation, Purchase, Entitlement, UserProfile
+from .models import ForgeApp, RepoValidation, Purchase, Entitlement, UserProfile, StripeWebhookEvent
+from .page_cache import bump_marketplace_generation
+from .search import invalidate_filter_options
 
 
 class ForgeAppForm(forms.ModelForm):
@@ -161,6 +163,9 @@ class ForgeAppAdmin(admin.ModelAdmin):
         })
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_latest_validation()
+    
     def price_dollars(self, obj):
         """Display price in dollars"""
         if obj.price_cents is None:
@@ -294,6 +299,9 @@ class ForgeAppAdmin(admin.ModelAdmin):
     def publish_apps(self, request, queryset):
         """Publish selected apps"""
         updated = queryset.update(is_published=True)
+        # update() skips the model signals
+        invalidate_filter_options()
+        bump_marketplace_generation()
         self.message_user(request, f"Published {updated} apps.")
     
     publish_apps.short_description = "Publish selected apps"
@@ -301,6 +309,9 @@ class ForgeAppAdmin(admin.ModelAdmin):
     def unpublish_apps(self, request, queryset):
         """Unpublish selected apps"""
         updated = queryset.update(is_published=False)
+        # update() skips the model signals
+        invalidate_filter_options()
+        bump_marketplace_generation()
         self.message_user(request, f"Unpublished {updated} apps.")
     
     unpublish_apps.short_description = "Unpublish selected apps"
@@ -426,6 +437,21 @@ class EntitlementAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(StripeWebhookEvent)
+class StripeWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event_type', 'received_at']
+    search_fields = ['event_id']
+    readonly_fields = [
+        'event_id', 'event_type', 'payload', 'status', 'attempts', 'last_error',
+        'received_at', 'started_at', 'processed_at'
+    ]
+    
+    def has_add_permission(self, request):
+        """Events are recorded by the Stripe webhook; replay with replay_stripe_events"""
+        return False
+
+
 # Customize admin site header
 admin.site.site_header = "CollabHub Forge Administration"
 admin.site.site_title = "Forge Admin"
@@ -4,19 +4,100 @@ Handles downloading releases and injecting license files
 """
 
 import io
+import tempfile
 import zipfile
 import logging
-from django.core.files.base import ContentFile
+from mysite.github_client import RateLimited
 from .github_release_service import GitHubReleaseService
+from .release_cache import ReleaseArtifactCache
 
 logger = logging.getLogger(__name__)
 
+# Buffer size for spooling the GitHub zipball to disk and streaming it back out
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AppendOverlay(io.RawIOBase):
+    """
+    Writable view of a read-only file whose writes never reach it
+
+    Bytes before the first write position are read from the base file; from
+    there on the content lives in an in-memory tail. ZipFile in append mode
+    only writes from the old central directory onwards, so a shared cached
+    release can be licensed per purchase without copying the archive.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.cut = base.seek(0, io.SEEK_END)
+        self.tail = io.BytesIO()
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def size(self):
+        return self.cut + self.tail.getbuffer().nbytes
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size()
+        self.position = max(offset, 0)
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position < self.cut:
+            self.base.seek(self.position)
+            count = self.base.readinto(memoryview(buffer)[:self.cut - self.position])
+        else:
+            self.tail.seek(self.position - self.cut)
+            count = self.tail.readinto(buffer)
+        self.position += count
+        return count
+
+    def write(self, data):
+        if self.position < self.cut:
+            if self.tail.getbuffer().nbytes:
+                raise io.UnsupportedOperation("cannot write before data already appended")
+            self.cut = self.position
+        self.tail.seek(self.position - self.cut)
+        count = self.tail.write(data)
+        self.position += count
+        return count
+
+    def truncate(self, size=None):
+        size = self.position if size is None else size
+        if size < self.cut:
+            self.cut = size
+            self.tail = io.BytesIO()
+        else:
+            self.tail.truncate(size - self.cut)
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.base.close()
+            self.tail.close()
+        super().close()
+
 
 class LicenseDownloadService:
     """Service for creating downloads with injected license files"""
     
     def __init__(self):
         self.github_service = GitHubReleaseService()
+        self.release_cache = ReleaseArtifactCache()
     
     def generate_license_instructions(self, forge_app, purchase):
         """
@@ -94,38 +175,34 @@ https://collab.buildly.io/marketplace/verify/{purchase.id}
 Removing or modifying this file may invalidate your license.
 """
     
-    def inject_license_into_zip(self, zip_content, license_content, app_name):
+    def inject_license_into_zip(self, zip_file, license_content, app_name):
         """
-        Inject LICENSE.md into a zip file
+        Append LICENSE.md and LICENSE_INSTRUCTIONS.md to a zip file in place
+        
+        The zip is opened in append mode, so the existing compressed entries are
+        left untouched (no decompress/recompress); only the two license files
+        and a new central directory are written after them.
         
         Args:
-            zip_content: Original zip file bytes
+            zip_file: Seekable binary file opened for reading and writing, or
+                an AppendOverlay over a shared release
             license_content: License text to inject
             app_name: Name for the new archive
             
         Returns:
-            bytes: New zip file with license injected
+            bool: True if the license was injected
         """
         try:
-            # Read original zip
-            original_zip = zipfile.ZipFile(io.BytesIO(zip_content))
-            
-            # Create new zip in memory
-            new_zip_io = io.BytesIO()
-            new_zip = zipfile.ZipFile(new_zip_io, 'w', zipfile.ZIP_DEFLATED)
+            zip_file.seek(0)
+            new_zip = zipfile.ZipFile(zip_file, 'a', zipfile.ZIP_DEFLATED)
             
             # Determine root folder name
             root_folder = None
-            for name in original_zip.namelist():
+            for name in new_zip.namelist():
                 if '/' in name:
                     root_folder = name.split('/')[0]
                     break
             
-            # Copy all files from original zip
-            for item in original_zip.infolist():
-                data = original_zip.read(item.filename)
-                new_zip.writestr(item, data)
-            
             # Add LICENSE.md to root
             license_path = f"{root_folder}/LICENSE.md" if root_folder else "LICENSE.md"
             new_zip.writestr(license_path, license_content)
@@ -164,13 +241,46 @@ For questions: support@buildly.io
             new_zip.writestr(instructions_path, instructions)
             
             new_zip.close()
-            original_zip.close()
+            zip_file.seek(0)
             
-            return new_zip_io.getvalue()
+            return True
             
         except Exception as e:
             logger.error(f"Error injecting license into zip: {str(e)}")
-            return None
+            return False
+    
+    def open_release_zip(self, forge_app):
+        """
+        Open the app's latest release zip
+        
+        Tagged releases are served from the shared release cache, so GitHub is
+        only hit once per tag; untagged URLs are downloaded into a temporary
+        file.
+        
+        Returns:
+            file: The zip opened for binary reading (the caller closes it), or
+            None if the download failed
+        """
+        zip_url = forge_app.latest_release_zip_url
+        
+        def download(fileobj):
+            logger.info(f"Downloading release zip for {forge_app.slug}")
+            return self.github_service.download_release_zip_to_file(zip_url, fileobj, chunk_size=DOWNLOAD_CHUNK_SIZE)
+        
+        if forge_app.latest_release_tag:
+            return self.release_cache.open_or_fetch(
+                forge_app.repo_owner, forge_app.repo_name, forge_app.latest_release_tag, download
+            )
+        
+        zip_file = tempfile.TemporaryFile()
+        try:
+            if download(zip_file):
+                return zip_file
+        except RateLimited:
+            zip_file.close()
+            raise
+        zip_file.close()
+        return None
     
     def create_licensed_download(self, forge_app, purchase):
         """
@@ -181,36 +291,41 @@ For questions: support@buildly.io
             purchase: Purchase instance
             
         Returns:
-            tuple: (file_content, filename) or (None, None)
-        """
-        # Update release info if needed
-        self.github_service.update_app_release_info(forge_app)
+            tuple: (file, filename) or (None, None). The file is an AppendOverlay
+            positioned at the start; the caller streams it and closes it.
         
+        Raises:
+            RateLimited: GitHub's budget is exhausted and the release is not cached
+        """
+        # Release info is normally kept fresh by the refresh_forge_releases beat
+        # task. Apps published (or repointed) since its last run have no release
+        # columns yet, so look those up now; update_app_release_info skips apps
+        # checked within the last hour, so apps without releases stay cheap.
+        if not forge_app.latest_release_zip_url:
+            self.github_service.update_app_release_info(forge_app)
         if not forge_app.latest_release_zip_url:
             logger.error(f"No release zip URL for {forge_app.slug}")
             return None, None
         
-        # Download original zip
-        logger.info(f"Downloading release zip for {forge_app.slug}")
-        zip_content = self.github_service.download_release_zip(forge_app.latest_release_zip_url)
-        
-        if not zip_content:
+        release_zip = self.open_release_zip(forge_app)
+        if not release_zip:
             logger.error(f"Failed to download release for {forge_app.slug}")
             return None, None
+        # The license is appended in memory; the release itself is never copied
+        zip_file = AppendOverlay(release_zip)
         
         # Generate license
         license_content = self.generate_license_instructions(forge_app, purchase)
         
         # Inject license into zip
         logger.info(f"Injecting license into zip for {forge_app.slug}")
-        licensed_zip = self.inject_license_into_zip(zip_content, license_content, forge_app.name)
-        
-        if not licensed_zip:
+        if not self.inject_license_into_zip(zip_file, license_content, forge_app.name):
             logger.error(f"Failed to inject license for {forge_app.slug}")
+            zip_file.close()
             return None, None
         
         # Generate filename
         tag = forge_app.latest_release_tag or 'latest'
         filename = f"{forge_app.slug}-{tag}-licensed.zip"
         
-        return licensed_zip, filename
+        return zip_file, filename
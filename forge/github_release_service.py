@@ -5,23 +5,35 @@ Handles fetching and caching GitHub release information
 
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
+from mysite.github_client import RateLimited, get_github_client
 
 logger = logging.getLogger(__name__)
 
+RELEASE_FIELDS = [
+    'latest_release_name',
+    'latest_release_tag',
+    'latest_release_url',
+    'latest_release_zip_url',
+    'last_release_check',
+]
+
 
 class GitHubReleaseService:
     """Service for managing GitHub releases"""
     
-    def __init__(self, github_token=None):
+    def __init__(self, github_token=None, max_wait=0):
+        """
+        Args:
+            max_wait: Seconds to wait out an exhausted rate limit; 0 (fail
+                fast) for request paths, BACKGROUND_MAX_WAIT for tasks
+        """
         self.github_token = github_token or getattr(settings, 'GITHUB_API_TOKEN', None)
-        self.headers = {
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        if self.github_token:
-            self.headers['Authorization'] = f'token {self.github_token}'
+        self.max_wait = max_wait
+        self.client = get_github_client()
     
     def get_latest_release(self, owner, repo):
         """
@@ -29,41 +41,54 @@ class GitHubReleaseService:
         
         Returns:
             dict: Release information or None if error/no releases
-        """
-        url = f"https://api.github.com/repos/{owner}/{repo}/releases/latest"
         
+        Raises:
+            RateLimited: GitHub's budget is exhausted (not the same as no release)
+        """
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 404:
-                logger.info(f"No releases found for {owner}/{repo}")
-                return None
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'name': data.get('name') or data.get('tag_name'),
-                'tag': data.get('tag_name'),
-                'url': data.get('html_url'),
-                'zipball_url': data.get('zipball_url'),
-                'tarball_url': data.get('tarball_url'),
-                'published_at': data.get('published_at'),
-                'body': data.get('body', ''),
-                'assets': [
-                    {
-                        'name': asset['name'],
-                        'url': asset['browser_download_url'],
-                        'size': asset['size']
-                    }
-                    for asset in data.get('assets', [])
-                ]
-            }
-            
+            return self._fetch_latest_release(owner, repo)
+        except RateLimited:
+            raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching release for {owner}/{repo}: {str(e)}")
             return None
     
+    def _fetch_latest_release(self, owner, repo):
+        """
+        Latest release of owner/repo, or None if the repository has none (404)
+        
+        Raises:
+            requests.RequestException: The lookup failed (including RateLimited)
+        """
+        url = f"/repos/{owner}/{repo}/releases/latest"
+        
+        response = self.client.get(url, token=self.github_token or '', max_wait=self.max_wait)
+        
+        if response.status_code == 404:
+            logger.info(f"No releases found for {owner}/{repo}")
+            return None
+        
+        response.raise_for_status()
+        data = response.json()
+        
+        return {
+            'name': data.get('name') or data.get('tag_name'),
+            'tag': data.get('tag_name'),
+            'url': data.get('html_url'),
+            'zipball_url': data.get('zipball_url'),
+            'tarball_url': data.get('tarball_url'),
+            'published_at': data.get('published_at'),
+            'body': data.get('body', ''),
+            'assets': [
+                {
+                    'name': asset['name'],
+                    'url': asset['browser_download_url'],
+                    'size': asset['size']
+                }
+                for asset in data.get('assets', [])
+            ]
+        }
+    
     def update_app_release_info(self, forge_app, force=False):
         """
         Update ForgeApp with latest release information
@@ -74,6 +99,9 @@ class GitHubReleaseService:
             
         Returns:
             bool: True if updated, False otherwise
+        
+        Raises:
+            RateLimited: GitHub's budget is exhausted; the app is left unchecked
         """
         # Check if we need to update (only check once per hour unless forced)
         if not force and forge_app.last_release_check:
@@ -82,8 +110,15 @@ class GitHubReleaseService:
                 logger.info(f"Release info for {forge_app.slug} checked recently, skipping")
                 return False
         
-        # Fetch latest release
-        release = self.get_latest_release(forge_app.repo_owner, forge_app.repo_name)
+        # Fetch latest release; only a confirmed "no release" counts as checked,
+        # so failed lookups are retried on the next call
+        try:
+            release = self._fetch_latest_release(forge_app.repo_owner, forge_app.repo_name)
+        except RateLimited:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching release for {forge_app.slug}: {str(e)}")
+            return False
         
         if not release:
             logger.warning(f"No release found for {forge_app.slug}")
@@ -92,22 +127,70 @@ class GitHubReleaseService:
             return False
         
         # Update forge app
+        self._apply_release(forge_app, release)
+        forge_app.save(update_fields=RELEASE_FIELDS)
+        
+        logger.info(f"Updated release info for {forge_app.slug}: {release['name']}")
+        return True
+    
+    def refresh_releases(self, forge_apps, workers=8):
+        """
+        Refresh release information for many apps at once
+        
+        Latest releases are fetched concurrently (conditional requests through
+        the shared GitHub client, so unchanged releases cost no rate limit) and
+        written back with one bulk_update.
+        
+        Args:
+            forge_apps: Iterable of ForgeApp instances
+            workers: Number of concurrent GitHub requests
+            
+        Returns:
+            int: Number of apps with a release
+        """
+        from .models import ForgeApp
+        
+        forge_apps = list(forge_apps)
+        if not forge_apps:
+            return 0
+        
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            lookups = list(executor.map(self._lookup_release, forge_apps))
+        
+        checked_at = timezone.now()
+        checked = []
+        found = 0
+        for forge_app, (ok, release) in zip(forge_apps, lookups):
+            # Failed lookups (rate limits included) stay due for the next run
+            if not ok:
+                continue
+            if release:
+                self._apply_release(forge_app, release, checked_at)
+                found += 1
+            else:
+                forge_app.last_release_check = checked_at
+            checked.append(forge_app)
+        
+        if checked:
+            ForgeApp.objects.bulk_update(checked, RELEASE_FIELDS)
+        logger.info(f"Refreshed release info for {len(checked)} of {len(forge_apps)} apps ({found} with releases)")
+        return found
+    
+    def _lookup_release(self, forge_app):
+        """(ok, release) for refresh_releases; ok is False if the lookup failed"""
+        try:
+            return True, self._fetch_latest_release(forge_app.repo_owner, forge_app.repo_name)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching release for {forge_app.slug}: {str(e)}")
+            return False, None
+    
+    @staticmethod
+    def _apply_release(forge_app, release, checked_at=None):
         forge_app.latest_release_name = release['name']
         forge_app.latest_release_tag = release['tag']
         forge_app.latest_release_url = release['url']
         forge_app.latest_release_zip_url = release['zipball_url']
-        forge_app.last_release_check = timezone.now()
-        
-        forge_app.save(update_fields=[
-            'latest_release_name',
-            'latest_release_tag',
-            'latest_release_url',
-            'latest_release_zip_url',
-            'last_release_check'
-        ])
-        
-        logger.info(f"Updated release info for {forge_app.slug}: {release['name']}")
-        return True
+        forge_app.last_release_check = checked_at or timezone.now()
     
     def download_release_zip(self, zipball_url):
         """
@@ -120,10 +203,37 @@ class GitHubReleaseService:
             bytes: Zip file content or None
         """
         try:
-            response = requests.get(zipball_url, headers=self.headers, timeout=30, stream=True)
+            response = self.client.get(zipball_url, token=self.github_token or '', stream=True, max_wait=self.max_wait)
             response.raise_for_status()
             return response.content
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error downloading release zip: {str(e)}")
             return None
+    
+    def download_release_zip_to_file(self, zipball_url, fileobj, chunk_size=64 * 1024):
+        """
+        Stream a release zip from GitHub into a file without holding it in memory
+        
+        Args:
+            zipball_url: URL to the zipball
+            fileobj: Writable binary file object
+            chunk_size: Bytes read from the response at a time
+            
+        Returns:
+            bool: True if the whole archive was written
+        """
+        try:
+            with self.client.get(zipball_url, token=self.github_token or '', stream=True, max_wait=self.max_wait) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    fileobj.write(chunk)
+            fileobj.flush()
+            return True
+            
+        except RateLimited:
+            # The caller tells the user when to retry
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error downloading release zip: {str(e)}")
+            return False
@@ -0,0 +1,107 @@
+"""
+Deferred reachability checks for ForgeApp logo URLs
+
+ForgeApp.save never touches the network: it consults a per-URL result cache
+and, on a miss, queues verify_forge_logos. That task checks every unverified
+logo URL concurrently and clears the ones that are unreachable, so the UI
+falls back to the default logo.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from .page_cache import bump_marketplace_generation
+
+logger = logging.getLogger(__name__)
+
+# How long a batch verification suppresses further enqueues
+VERIFY_QUEUE_LOCK_SECONDS = 60
+VERIFY_QUEUE_LOCK_KEY = 'forge:logo-verify-queued'
+
+
+def logo_url_is_reachable(url: str, timeout: float = 3.0) -> bool:
+    """Lightweight check to see if a remote logo URL is reachable.
+    Uses HEAD, then falls back to GET for providers that don't support HEAD.
+    """
+    if not url:
+        return False
+    try:
+        resp = requests.head(url, allow_redirects=True, timeout=timeout)
+        if resp.status_code == 200:
+            return True
+        if resp.status_code in (405, 403):  # Method not allowed or auth-style block; try GET
+            resp = requests.get(url, allow_redirects=True, timeout=timeout, stream=True)
+            resp.close()
+            return resp.status_code == 200
+        return False
+    except requests.RequestException:
+        return False
+
+
+def _status_key(url):
+    return 'forge:logo-ok:' + hashlib.sha256(url.encode()).hexdigest()
+
+
+def cached_logo_status(url):
+    """True/False from a previous check still within FORGE_LOGO_CHECK_TTL, else None"""
+    return cache.get(_status_key(url))
+
+
+def verify_logos(forge_apps, workers=8, timeout=3.0):
+    """
+    Check the logo URLs of forge_apps concurrently (each distinct URL once,
+    skipping URLs with a cached result) and clear unreachable ones.
+
+    Returns:
+        int: Number of apps whose logo_url was cleared
+    """
+    from .models import ForgeApp
+
+    urls = {app.logo_url for app in forge_apps if app.logo_url and app.logo_url.startswith('http')}
+    results = {url: cached_logo_status(url) for url in urls}
+    unchecked = [url for url, ok in results.items() if ok is None]
+
+    if unchecked:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            for url, ok in zip(unchecked, executor.map(lambda u: logo_url_is_reachable(u, timeout), unchecked)):
+                results[url] = ok
+                cache.set(_status_key(url), ok, settings.FORGE_LOGO_CHECK_TTL)
+
+    invalid = [url for url, ok in results.items() if not ok]
+    if not invalid:
+        return 0
+
+    for url in invalid:
+        logger.warning("Clearing unreachable ForgeApp.logo_url: %s", url)
+    # Match on the URL too, so a logo changed since the check is left alone
+    cleared = ForgeApp.objects.filter(
+        id__in=[app.id for app in forge_apps], logo_url__in=invalid
+    ).update(logo_url=None)
+    if cleared:
+        # update() skips the post_save signal that normally invalidates cached pages
+        bump_marketplace_generation()
+    return cleared
+
+
+def queue_logo_verification():
+    """
+    Enqueue verify_forge_logos unless one was queued recently. Returns True if
+    a task was queued. A burst of saves (imports, admin bulk actions) is
+    covered by one batch run.
+    """
+    from .tasks import verify_forge_logos
+
+    if not cache.add(VERIFY_QUEUE_LOCK_KEY, True, VERIFY_QUEUE_LOCK_SECONDS):
+        return False
+    try:
+        verify_forge_logos.apply_async(countdown=5)
+    except Exception as e:
+        cache.delete(VERIFY_QUEUE_LOCK_KEY)
+        logger.error(f"Could not queue logo verification: {e}")
+        return False
+    return True
@@ -3,6 +3,7 @@ from django.conf import settings
 from django.utils.text import slugify
 from forge.models import ForgeApp
 from forge.services import GitHubRepoValidationService
+from mysite.github_client import BACKGROUND_MAX_WAIT
 import requests
 import logging
 import time
@@ -341,7 +342,7 @@ class Command(BaseCommand):
     
     def _validate_imported_apps(self, imported_apps):
         """Run validation on imported apps"""
-        validator = GitHubRepoValidationService()
+        validator = GitHubRepoValidationService(max_wait=BACKGROUND_MAX_WAIT)
         
         for app in imported_apps:
             try:
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from forge.models import StripeWebhookEvent, WebhookEventStatus
+from forge.webhooks import process_event
+
+
+class Command(BaseCommand):
+    help = 'Re-run Stripe webhook events from the inbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'event_ids',
+            nargs='*',
+            help='Stripe event ids to replay (any status)'
+        )
+        parser.add_argument(
+            '--failed',
+            action='store_true',
+            help='Replay all failed events'
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Process events that were received but never queued'
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            help='Replay events stuck in processing for longer than this'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Also take over explicitly listed events that are processing right now'
+        )
+
+    def handle(self, *args, **options):
+        selection = Q()
+        statuses = set()
+        explicit_ids = set(options['event_ids'])
+        stale_before = None
+        if explicit_ids:
+            selection |= Q(event_id__in=explicit_ids)
+            # 'processing' is claimed only when stale or forced (see claim_event)
+            statuses.update(WebhookEventStatus.values)
+        if options['failed']:
+            selection |= Q(status=WebhookEventStatus.FAILED)
+            statuses.add(WebhookEventStatus.FAILED)
+        if options['pending']:
+            selection |= Q(status=WebhookEventStatus.RECEIVED)
+            statuses.add(WebhookEventStatus.RECEIVED)
+        if options['stale_minutes'] is not None:
+            stale_before = timezone.now() - timedelta(minutes=options['stale_minutes'])
+            selection |= Q(status=WebhookEventStatus.PROCESSING, started_at__lt=stale_before)
+
+        if not statuses and stale_before is None:
+            self.stdout.write(self.style.WARNING('Nothing selected: pass event ids, --failed, --pending or --stale-minutes'))
+            return
+
+        events = list(
+            StripeWebhookEvent.objects.filter(selection).order_by('received_at').values_list('pk', 'event_id', 'status')
+        )
+        self.stdout.write(f'Replaying {len(events)} events...')
+
+        counts = {}
+        for pk, event_id, status in events:
+            force = options['force'] and event_id in explicit_ids
+            # The claim re-checks the status in its UPDATE, so events finished or
+            # taken by another worker meanwhile are skipped
+            result = process_event(pk, statuses=statuses, stale_before=stale_before, force=force)
+            if result is None and status == WebhookEventStatus.PROCESSING and not force:
+                self.stdout.write(f'{event_id}: ' + self.style.WARNING('IN FLIGHT (use --force to take it over)'))
+                counts['in flight'] = counts.get('in flight', 0) + 1
+                continue
+            result = result or 'skipped'
+            counts[result] = counts.get(result, 0) + 1
+            style = self.style.ERROR if result == WebhookEventStatus.FAILED else self.style.SUCCESS
+            self.stdout.write(f'{event_id}: ' + style(str(result).upper()))
+
+        self.stdout.write('\n' + '='*50)
+        for result, count in sorted(counts.items()):
+            self.stdout.write(f'  {result}: {count}')
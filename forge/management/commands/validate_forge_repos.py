@@ -1,6 +1,9 @@
+from datetime import timedelta
+
 from django.core.management.base import BaseCommand
-from forge.models import ForgeApp
-from forge.services import GitHubRepoValidationService
+from django.utils import timezone
+from forge.models import ForgeApp, ValidationStatus
+from forge.services import MarketplaceValidationRunner
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
     help = 'Validate all Forge app repositories'
-    
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--app-id',
@@ -30,77 +33,77 @@ class Command(BaseCommand):
             action='store_true',
             help='Force validation even if recently validated'
         )
-    
+        parser.add_argument(
+            '--since-sha',
+            action='store_true',
+            help='Skip apps whose head commit is the one they were last validated at'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of repositories validated concurrently (default: 8)'
+        )
+
     def handle(self, *args, **options):
-        validator = GitHubRepoValidationService()
-        
         # Filter apps based on options
-        queryset = ForgeApp.objects.all()
-        
+        queryset = MarketplaceValidationRunner.annotate_last_validation(ForgeApp.objects.all())
+
         if options['app_id']:
             queryset = queryset.filter(id=options['app_id'])
         elif options['slug']:
             queryset = queryset.filter(slug=options['slug'])
-        
+
         if options['published_only']:
             queryset = queryset.filter(is_published=True)
-        
-        if not queryset.exists():
+
+        apps = list(queryset)
+        if not apps:
             self.stdout.write(
                 self.style.WARNING('No apps found matching criteria')
             )
             return
-        
-        self.stdout.write(f'Validating {queryset.count()} apps...')
-        
-        success_count = 0
-        error_count = 0
-        
-        for app in queryset:
-            try:
-                self.stdout.write(f'Validating {app.slug}...', ending=' ')
-                
-                # Check if recently validated (unless force)
-                if not options['force'] and app.latest_validation:
-                    from django.utils import timezone
-                    from datetime import timedelta
-                    
-                    if app.latest_validation.run_at > timezone.now() - timedelta(hours=1):
-                        self.stdout.write(
-                            self.style.WARNING('SKIPPED (recently validated)')
-                        )
-                        continue
-                
-                validation = validator.validate_repository(
-                    owner=app.repo_owner,
-                    repo=app.repo_name,
-                    forge_app=app
-                )
-                
-                if validation.status == 'valid':
-                    self.stdout.write(self.style.SUCCESS('VALID'))
-                elif validation.status == 'invalid':
-                    self.stdout.write(self.style.WARNING('INVALID'))
-                    if validation.missing_items:
-                        for item in validation.missing_items:
-                            self.stdout.write(f'  - Missing: {item}')
-                else:
-                    self.stdout.write(self.style.ERROR(f'ERROR ({validation.status})'))
-                
-                success_count += 1
-                
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Validation failed for {app.slug}: {str(e)}")
-                self.stdout.write(self.style.ERROR(f'FAILED: {str(e)}'))
-        
+
+        # Skip recently validated apps (unless force)
+        if not options['force']:
+            cutoff = timezone.now() - timedelta(hours=1)
+            recent = [app for app in apps if app.last_validated_at and app.last_validated_at > cutoff]
+            for app in recent:
+                self.stdout.write(f'{app.slug}: ' + self.style.WARNING('SKIPPED (recently validated)'))
+            apps = [app for app in apps if app not in recent]
+
+        self.stdout.write(f'Validating {len(apps)} apps with {options["workers"]} workers...')
+
+        runner = MarketplaceValidationRunner(workers=options['workers'])
+        results = runner.run(apps, since_sha=options['since_sha'])
+
+        for app in results['skipped']:
+            self.stdout.write(f'{app.slug}: ' + self.style.WARNING('SKIPPED (commit unchanged)'))
+
+        for validation in results['validations']:
+            slug = validation.forge_app.slug
+            if validation.status == ValidationStatus.PASSED:
+                self.stdout.write(f'{slug}: ' + self.style.SUCCESS('VALID'))
+            else:
+                self.stdout.write(f'{slug}: ' + self.style.WARNING('INVALID'))
+                for item in validation.missing_items:
+                    self.stdout.write(f'  - Missing: {item}')
+
+        for app, error in results['errors']:
+            logger.error(f"Validation failed for {app.slug}: {error}")
+            self.stdout.write(f'{app.slug}: ' + self.style.ERROR(f'FAILED: {error}'))
+
+        success_count = len(results['validations'])
+        error_count = len(results['errors'])
+
         # Summary
         self.stdout.write('\n' + '='*50)
         self.stdout.write(f'Validation complete:')
         self.stdout.write(f'  Successful: {success_count}')
+        self.stdout.write(f'  Skipped (unchanged): {len(results["skipped"])}')
         self.stdout.write(f'  Errors: {error_count}')
-        
+
         if error_count == 0:
             self.stdout.write(self.style.SUCCESS('All validations completed successfully!'))
         else:
-            self.stdout.write(self.style.WARNING(f'{error_count} validations failed. Check logs for details.'))
\ No newline at end of file
+            self.stdout.write(self.style.WARNING(f'{error_count} validations failed. Check logs for details.'))
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0005_add_featured_screenshot_and_update_logo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForgeAppFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('category', 'Category'), ('target', 'Target')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('forge_app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='forge.forgeapp')),
+            ],
+            options={
+                'verbose_name': 'Forge App Facet',
+                'verbose_name_plural': 'Forge App Facets',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='forgeappfacet',
+            index=models.Index(fields=['kind', 'value'], name='forge_facet_kind_value_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='forgeappfacet',
+            unique_together={('forge_app', 'kind', 'value')},
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+FTS_TABLE = 'forge_forgeapp_fts'
+
+
+def backfill_facets(apps, schema_editor):
+    ForgeApp = apps.get_model('forge', 'ForgeApp')
+    ForgeAppFacet = apps.get_model('forge', 'ForgeAppFacet')
+    facets = []
+    for app in ForgeApp.objects.only('id', 'categories', 'targets').iterator():
+        wanted = {
+            (kind, str(value).strip()[:100])
+            for kind, values in (('category', app.categories), ('target', app.targets))
+            for value in (values or [])
+            if str(value).strip()
+        }
+        facets.extend(ForgeAppFacet(forge_app_id=app.id, kind=kind, value=value) for kind, value in wanted)
+    ForgeAppFacet.objects.bulk_create(facets, batch_size=1000)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE forge_forgeapp ADD FULLTEXT INDEX forge_forgeapp_search_ft (name, summary)'
+        )
+    elif vendor == 'sqlite':
+        # Standalone (not external-content) table: Django rebuilds SQLite tables
+        # on ALTER, which would drop triggers and reassign rowids.
+        schema_editor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(app_id UNINDEXED, name, summary)')
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (app_id, name, summary) '
+            f"SELECT id, name, COALESCE(summary, '') FROM forge_forgeapp"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE forge_forgeapp DROP INDEX forge_forgeapp_search_ft')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0006_forgeappfacet'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
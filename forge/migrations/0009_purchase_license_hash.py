@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0008_stripewebhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='license_sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='license_template_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -1,6 +1,5 @@
 import uuid
 import logging
-import requests
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
@@ -22,6 +21,12 @@ class ValidationStatus(models.TextChoices):
     FAILED = 'failed', 'Failed'
 
 
+class FacetKind(models.TextChoices):
+    """Marketplace facet types, mirroring ForgeApp.categories / ForgeApp.targets"""
+    CATEGORY = 'category', 'Category'
+    TARGET = 'target', 'Target'
+
+
 class PurchaseStatus(models.TextChoices):
     """Purchase status"""
     REQUIRES_PAYMENT = 'requires_payment', 'Requires Payment'
@@ -30,6 +35,15 @@ class PurchaseStatus(models.TextChoices):
     REFUNDED = 'refunded', 'Refunded'
 
 
+class WebhookEventStatus(models.TextChoices):
+    """Processing state of an inbound Stripe webhook event"""
+    RECEIVED = 'received', 'Received'
+    PROCESSING = 'processing', 'Processing'
+    PROCESSED = 'processed', 'Processed'
+    IGNORED = 'ignored', 'Ignored'
+    FAILED = 'failed', 'Failed'
+
+
 class UserProfile(models.Model):
     """User profile to track Labs customer status"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -46,6 +60,22 @@ class UserProfile(models.Model):
         verbose_name_plural = "User Profiles"
 
 
+class ForgeAppQuerySet(models.QuerySet):
+    def with_latest_validation(self):
+        """
+        Prefetch each app's most recent RepoValidation in one query for the
+        whole queryset; ForgeApp.latest_validation then reads it from memory
+        """
+        latest_id = RepoValidation.objects.filter(
+            forge_app=models.OuterRef('forge_app')
+        ).order_by('-run_at').values('id')[:1]
+        return self.prefetch_related(models.Prefetch(
+            'validations',
+            queryset=RepoValidation.objects.filter(id=models.Subquery(latest_id)),
+            to_attr='_latest_validations',
+        ))
+
+
 class ForgeApp(models.Model):
     """Buildly Forge marketplace application"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -83,6 +113,8 @@ class ForgeApp(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ForgeAppQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.slug})"
 
@@ -101,7 +133,9 @@ class ForgeApp(models.Model):
 
     @property
     def latest_validation(self):
-        """Get the latest validation for this app"""
+        """Get the latest validation for this app (prefetched by with_latest_validation)"""
+        if hasattr(self, '_latest_validations'):
+            return self._latest_validations[0] if self._latest_validations else None
         return self.validations.order_by('-run_at').first()
     
     @property
@@ -131,32 +165,23 @@ class ForgeApp(models.Model):
         
         return self.demo_video_url
 
-    def _logo_url_is_valid(self, url: str, timeout: float = 3.0) -> bool:
-        """Lightweight check to see if a remote logo URL is reachable.
-        Uses HEAD, then falls back to GET for providers that don't support HEAD.
-        """
-        if not url:
-            return False
-        try:
-            resp = requests.head(url, allow_redirects=True, timeout=timeout)
-            if resp.status_code == 200:
-                return True
-            if resp.status_code in (405, 403):  # Method not allowed or auth-style block; try GET
-                resp = requests.get(url, allow_redirects=True, timeout=timeout, stream=True)
-                return resp.status_code == 200
-            return False
-        except requests.RequestException:
-            return False
-
     def save(self, *args, **kwargs):
-        """Ensure `logo_url` is valid; clear it when unreachable to force default fallback."""
+        """Clear `logo_url` if it is known to be unreachable; otherwise verify it in the background.
+        Never makes network requests, the check runs in forge.tasks.verify_forge_logos.
+        """
         try:
             if self.logo_url and isinstance(self.logo_url, str) and self.logo_url.startswith('http'):
-                if not self._logo_url_is_valid(self.logo_url):
+                from django.db import transaction
+                from .logo_verification import cached_logo_status, queue_logo_verification
+                
+                status = cached_logo_status(self.logo_url)
+                if status is False:
                     logging.getLogger(__name__).warning(
                         "Clearing invalid ForgeApp.logo_url for %s: %s", self.slug, self.logo_url
                     )
                     self.logo_url = None
+                elif status is None:
+                    transaction.on_commit(queue_logo_verification)
         except Exception:
             # Never block saves on validation errors; API already falls back to default image
             pass
@@ -168,6 +193,46 @@ class ForgeApp(models.Model):
         ordering = ['-created_at']
 
 
+class ForgeAppFacet(models.Model):
+    """
+    One category or target of a ForgeApp, one row per value.
+    Kept in sync with the JSON lists by forge.signals so facet filters and
+    counts are indexed lookups on every database backend.
+    """
+    forge_app = models.ForeignKey(ForgeApp, on_delete=models.CASCADE, related_name='facets')
+    kind = models.CharField(max_length=20, choices=FacetKind.choices)
+    value = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"{self.forge_app.slug} {self.kind}={self.value}"
+
+    class Meta:
+        verbose_name = "Forge App Facet"
+        verbose_name_plural = "Forge App Facets"
+        unique_together = ('forge_app', 'kind', 'value')
+        indexes = [models.Index(fields=['kind', 'value'], name='forge_facet_kind_value_idx')]
+
+    @classmethod
+    def sync_for(cls, forge_app):
+        """Replace the facet rows of forge_app with its current categories/targets"""
+        wanted = {
+            (kind, str(value).strip()[:100])
+            for kind, values in ((FacetKind.CATEGORY, forge_app.categories), (FacetKind.TARGET, forge_app.targets))
+            for value in (values or [])
+            if str(value).strip()
+        }
+        existing = set(cls.objects.filter(forge_app=forge_app).values_list('kind', 'value'))
+        stale = existing - wanted
+        if stale:
+            stale_q = models.Q()
+            for kind, value in stale:
+                stale_q |= models.Q(kind=kind, value=value)
+            cls.objects.filter(forge_app=forge_app).filter(stale_q).delete()
+        cls.objects.bulk_create([
+            cls(forge_app=forge_app, kind=kind, value=value) for kind, value in wanted - existing
+        ])
+
+
 class RepoValidation(models.Model):
     """Repository validation results"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -198,6 +263,8 @@ class Purchase(models.Model):
     discount_applied = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=PurchaseStatus.choices, default=PurchaseStatus.REQUIRES_PAYMENT)
     license_document = models.FileField(upload_to='licenses/', blank=True, null=True)
+    license_sha256 = models.CharField(max_length=64, blank=True)
+    license_template_version = models.PositiveIntegerField(null=True, blank=True)
     download_count = models.IntegerField(default=0)
     last_downloaded = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -233,3 +300,28 @@ class Entitlement(models.Model):
         verbose_name_plural = "Entitlements"
         unique_together = [['user', 'forge_app']]
         ordering = ['-created_at']
+
+
+class StripeWebhookEvent(models.Model):
+    """
+    Inbox of verified Stripe webhook events, one row per Stripe event id.
+    The webhook only stores the event; forge.webhooks processes it later.
+    """
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=WebhookEventStatus.choices, default=WebhookEventStatus.RECEIVED)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
+
+    class Meta:
+        verbose_name = "Stripe Webhook Event"
+        verbose_name_plural = "Stripe Webhook Events"
+        ordering = ['-received_at']
+        indexes = [models.Index(fields=['status', 'received_at'], name='forge_webhook_status_idx')]
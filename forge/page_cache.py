@@ -0,0 +1,108 @@
+"""
+Anonymous page cache for the homepage and the marketplace
+
+Rendered pages are stored per path together with the marketplace generation
+they were rendered at. The generation is a counter bumped whenever published
+marketplace content changes (ForgeApp save/delete in forge.signals, the
+publish/unpublish admin actions), so a bump makes every cached page stale at
+once without having to know their keys.
+
+Stale pages (older generation, or older than MARKETPLACE_PAGE_CACHE_TIMEOUT)
+are still served for up to MARKETPLACE_PAGE_CACHE_STALE seconds while one
+request, holding a short lock, re-renders the page. Everyone else keeps
+getting the stale copy instead of piling onto the database.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+
+MARKETPLACE_GENERATION_KEY = 'forge:marketplace-generation'
+
+# How long one request may hold the re-render lock
+REVALIDATE_LOCK_SECONDS = 30
+
+
+def marketplace_generation():
+    """The current marketplace generation"""
+    generation = cache.get(MARKETPLACE_GENERATION_KEY)
+    if generation is None:
+        # Start from the clock so a cache flush never brings back old generations
+        cache.add(MARKETPLACE_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(MARKETPLACE_GENERATION_KEY)
+    return generation
+
+
+def bump_marketplace_generation():
+    """Mark every cached marketplace page as stale"""
+    try:
+        cache.incr(MARKETPLACE_GENERATION_KEY)
+    except ValueError:
+        marketplace_generation()
+
+
+def _page_key(name, request):
+    path = hashlib.sha256(request.get_full_path().encode()).hexdigest()
+    return f'forge:page:{name}:{path}'
+
+
+def _cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Pending flash messages are rendered into the page; len() does not consume them
+    return len(get_messages(request)) == 0
+
+
+def _cached_response(entry):
+    return HttpResponse(entry['content'], content_type=entry['content_type'])
+
+
+def cache_anonymous_page(name):
+    """
+    Serve anonymous GETs of a view from the page cache, with
+    stale-while-revalidate on marketplace generation changes
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_key(name, request)
+            generation = marketplace_generation()
+            entry = cache.get(key)
+            now = time.time()
+
+            if entry is not None:
+                fresh = (entry['generation'] == generation
+                         and now - entry['rendered_at'] < settings.MARKETPLACE_PAGE_CACHE_TIMEOUT)
+                if fresh:
+                    return _cached_response(entry)
+                # Stale: one request re-renders, the others are served the old page
+                if not cache.add(f'{key}:lock', True, REVALIDATE_LOCK_SECONDS):
+                    return _cached_response(entry)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and not response.is_rendered:
+                    response.render()
+                if response.status_code == 200 and not response.cookies and not response.streaming:
+                    cache.set(key, {
+                        'content': response.content,
+                        'content_type': response['Content-Type'],
+                        'generation': generation,
+                        'rendered_at': now,
+                    }, settings.MARKETPLACE_PAGE_CACHE_TIMEOUT + settings.MARKETPLACE_PAGE_CACHE_STALE)
+            finally:
+                if entry is not None:
+                    cache.delete(f'{key}:lock')
+            return response
+        return wrapper
+    return decorator
@@ -3,6 +3,7 @@ PDF License and Support Document Generator
 Generates signed license and support documents for purchased Buildly Forge apps
 """
 
+import hashlib
 import os
 from io import BytesIO
 from datetime import datetime
@@ -13,6 +14,11 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db import transaction
+
+# Bump whenever the document's layout or wording changes; stored licenses
+# rendered with an older version are regenerated on their next download.
+LICENSE_TEMPLATE_VERSION = 1
 
 
 class LicensePDFGenerator:
@@ -250,4 +256,57 @@ def generate_license_pdf(purchase_data, purchase_id):
         BytesIO: PDF document
     """
     generator = LicensePDFGenerator()
-    return generator.generate_license_document(purchase_data, purchase_id)
\ No newline at end of file
+    return generator.generate_license_document(purchase_data, purchase_id)
+
+def purchase_license_data(purchase):
+    """Build the generator's purchase_data from a Purchase (same keys as the Stripe metadata)"""
+    return {
+        'forge_app_name': purchase.forge_app.name,
+        'forge_app_repo_url': purchase.forge_app.repo_url,
+        'forge_app_repo_owner': purchase.forge_app.repo_owner,
+        'forge_app_repo_name': purchase.forge_app.repo_name,
+        'forge_app_license_type': purchase.forge_app.license_type,
+        'user_email': purchase.user.email,
+        'user_name': f"{purchase.user.first_name} {purchase.user.last_name}".strip(),
+        'original_price_cents': str(purchase.forge_app.price_cents),
+        'final_price_cents': str(purchase.amount_cents),
+        'discount_applied': str(purchase.discount_applied),
+        'is_labs_customer': str(hasattr(purchase.user, 'forge_profile') and purchase.user.forge_profile.is_labs_customer),
+    }
+
+
+def ensure_license_document(purchase, purchase_data=None, save=True):
+    """
+    Render and store the purchase's license PDF unless a current one exists
+    
+    The document goes to purchase.license_document (default_storage) together
+    with its SHA-256 and LICENSE_TEMPLATE_VERSION, so downloads are served from
+    storage and only re-rendered after a template change.
+    
+    Args:
+        purchase (Purchase): Purchase to render the license for
+        purchase_data (dict): Generator data; defaults to purchase_license_data(purchase)
+        save (bool): Save the purchase's license fields
+        
+    Returns:
+        bool: True if a new document was rendered
+    """
+    if (purchase.license_document and purchase.license_sha256
+            and purchase.license_template_version == LICENSE_TEMPLATE_VERSION):
+        return False
+    
+    content = generate_license_pdf(purchase_data or purchase_license_data(purchase), str(purchase.id)).read()
+    previous = purchase.license_document.name if purchase.license_document else None
+    
+    filename = f"license_and_support_{purchase.forge_app.slug}_{purchase.id}.pdf"
+    purchase.license_document.save(filename, ContentFile(content), save=False)
+    purchase.license_sha256 = hashlib.sha256(content).hexdigest()
+    purchase.license_template_version = LICENSE_TEMPLATE_VERSION
+    if save:
+        purchase.save(update_fields=['license_document', 'license_sha256', 'license_template_version'])
+    
+    if previous and previous != purchase.license_document.name:
+        # Only once the new document is committed (immediately outside a transaction)
+        storage = purchase.license_document.storage
+        transaction.on_commit(lambda: storage.delete(previous))
+    return True
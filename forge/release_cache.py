@@ -0,0 +1,177 @@
+"""
+On-disk cache of GitHub release zipballs
+
+Release archives are immutable per tag, so every buyer of the same release can
+share one downloaded copy. Entries live in FORGE_RELEASE_CACHE_DIR, keyed by
+owner/repo/tag, and are evicted least-recently-used once the directory grows
+past FORGE_RELEASE_CACHE_MAX_BYTES.
+
+Writes go to a temporary file that is renamed into place, and a per-entry
+file lock makes concurrent first downloads (across threads and worker
+processes on the same host) fetch from GitHub only once. Entries are handed
+out as open files, so an eviction running concurrently never pulls a zip
+out from under a download that is being served.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ZIP_SUFFIX = '.zip'
+LOCK_SUFFIX = '.lock'
+
+
+class ReleaseArtifactCache:
+    """Size-bounded LRU cache of release zip files on local disk"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or settings.FORGE_RELEASE_CACHE_DIR
+        self.max_bytes = settings.FORGE_RELEASE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    def path_for(self, owner, repo, tag):
+        """Cache file path for a release"""
+        digest = hashlib.sha256(f"{owner}/{repo}/{tag}".lower().encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{digest}{ZIP_SUFFIX}")
+
+    def open_or_fetch(self, owner, repo, tag, fetch):
+        """
+        Open the cached zip for owner/repo/tag, calling fetch(fileobj) to
+        download it on a miss
+
+        The entry is opened before it can be evicted, and an open file stays
+        readable after eviction unlinks it, so callers never race evict().
+
+        Args:
+            fetch: Callable writing the archive to a binary file object and
+                returning True on success
+
+        Returns:
+            file: The cached zip opened for binary reading (the caller closes
+            it), or None if the fetch failed
+        """
+        path = self.path_for(owner, repo, tag)
+        cached = self._open(path)
+        if cached:
+            return cached
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock(path):
+            # Another worker may have filled the entry while we waited for the lock
+            cached = self._open(path)
+            if cached:
+                return cached
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as tmp:
+                    if not fetch(tmp):
+                        return None
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            cached = open(path, 'rb')
+
+        logger.info(f"Cached release zip for {owner}/{repo}@{tag}")
+        self.evict(keep=path)
+        return cached
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used entries until the cache fits in max_bytes,
+        along with their lock files and those left behind by failed fetches
+
+        Entries whose lock is held (a fetch in progress) are skipped.
+        """
+        entries = []
+        lock_paths = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(LOCK_SUFFIX):
+                lock_paths.append(entry.path)
+                continue
+            if not entry.name.endswith(ZIP_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                total -= size
+
+        for lock_path in lock_paths:
+            path = lock_path[:-len(LOCK_SUFFIX)]
+            if not os.path.exists(path):
+                self._remove(path)
+
+    def _remove(self, path):
+        """Delete an entry and its lock file unless a fetch holds the lock"""
+        with self._lock(path, blocking=False) as locked:
+            if not locked:
+                return False
+            for stale in (path, path + LOCK_SUFFIX):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+        return True
+
+    @staticmethod
+    def _open(path):
+        """Open an entry and mark it as recently used; None if it does not exist"""
+        try:
+            cached = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted since it was opened; the open file is still readable
+            pass
+        return cached
+
+    @contextmanager
+    def _lock(self, path, blocking=True):
+        """
+        Hold the entry's file lock, yielding False if blocking is off and
+        another worker holds it
+        """
+        lock_path = path + LOCK_SUFFIX
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        while True:
+            lock_file = open(lock_path, 'a')
+            try:
+                fcntl.flock(lock_file, flags)
+            except BlockingIOError:
+                lock_file.close()
+                yield False
+                return
+            # evict() may have unlinked the lock file while we waited on it;
+            # a lock on the orphaned file would exclude nobody
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+        try:
+            yield True
+        finally:
+            # Closing the file releases the lock
+            lock_file.close()
@@ -0,0 +1,136 @@
+"""
+Marketplace search and facet filtering
+
+Facet filters (categories/targets) go through the ForgeAppFacet table, so they
+are indexed lookups that behave the same on MySQL and SQLite (JSONField
+__overlap only exists on PostgreSQL).
+
+Text search uses the database's full-text index: a FULLTEXT index on
+forge_forgeapp(name, summary) on MySQL, and the forge_forgeapp_fts FTS5 table
+on SQLite (maintained from forge.signals, since SQLite drops triggers when
+Django rebuilds a table). Other backends, or a missing index, fall back to
+icontains.
+"""
+
+import re
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+
+from .models import ForgeAppFacet, FacetKind
+
+FTS_TABLE = 'forge_forgeapp_fts'
+
+FILTER_OPTIONS_CACHE_KEY = 'forge:filter-options'
+FILTER_OPTIONS_CACHE_TIMEOUT = 60 * 60
+
+# InnoDB ignores shorter words in FULLTEXT searches (innodb_ft_min_token_size)
+MYSQL_MIN_TOKEN_SIZE = 3
+
+
+def filter_by_facet(queryset, kind, values):
+    """Apps having any of `values` for the facet `kind` (the __overlap semantics)"""
+    values = [value.strip() for value in values if value and value.strip()]
+    if not values:
+        return queryset
+    return queryset.filter(
+        id__in=ForgeAppFacet.objects.filter(kind=kind, value__in=values).values('forge_app_id')
+    )
+
+
+def search_words(term):
+    return re.findall(r'\w+', term or '')
+
+
+@lru_cache(maxsize=None)
+def sqlite_fts_available(alias=DEFAULT_DB_ALIAS):
+    """
+    Whether the FTS table exists; introspected once per connection alias
+    (cleared after migrate, see forge.signals)
+    """
+    db = connections[alias]
+    return db.vendor == 'sqlite' and FTS_TABLE in db.introspection.table_names()
+
+
+def search_apps(queryset, term):
+    """Apps whose name or summary match every word of `term` (prefix match)"""
+    words = search_words(term)
+    if not words:
+        return queryset
+
+    if connection.vendor == 'mysql' and all(len(word) >= MYSQL_MIN_TOKEN_SIZE for word in words):
+        query = ' '.join(f'+{word}*' for word in words)
+        return queryset.filter(id__in=RawSQL(
+            'SELECT id FROM forge_forgeapp WHERE MATCH (name, summary) AGAINST (%s IN BOOLEAN MODE)', [query]
+        ))
+
+    if sqlite_fts_available():
+        query = ' '.join(f'"{word}"*' for word in words)
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT app_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [query]
+        ))
+
+    for word in words:
+        queryset = queryset.filter(Q(name__icontains=word) | Q(summary__icontains=word))
+    return queryset
+
+
+def index_app(forge_app):
+    """Add or refresh an app in the SQLite FTS table (no-op on other backends)"""
+    if not sqlite_fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE app_id = %s', [forge_app.id.hex])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (app_id, name, summary) VALUES (%s, %s, %s)',
+            [forge_app.id.hex, forge_app.name or '', forge_app.summary or '']
+        )
+
+
+def unindex_app(forge_app_id):
+    """Remove an app from the SQLite FTS table (no-op on other backends)"""
+    if not sqlite_fts_available():
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE app_id = %s', [forge_app_id.hex])
+    except DatabaseError:
+        pass
+
+
+def get_filter_options():
+    """
+    Categories and targets of published apps with app counts, cached until
+    a ForgeApp is saved or deleted
+    """
+    options = cache.get(FILTER_OPTIONS_CACHE_KEY)
+    if options is not None:
+        return options
+
+    rows = (
+        ForgeAppFacet.objects.filter(forge_app__is_published=True)
+        .values('kind', 'value')
+        .annotate(count=Count('forge_app', distinct=True))
+        .order_by('value')
+    )
+    counts = {FacetKind.CATEGORY: {}, FacetKind.TARGET: {}}
+    for row in rows:
+        counts[row['kind']][row['value']] = row['count']
+
+    options = {
+        'categories': sorted(counts[FacetKind.CATEGORY]),
+        'targets': sorted(counts[FacetKind.TARGET]),
+        'counts': {
+            'categories': counts[FacetKind.CATEGORY],
+            'targets': counts[FacetKind.TARGET],
+        },
+    }
+    cache.set(FILTER_OPTIONS_CACHE_KEY, options, FILTER_OPTIONS_CACHE_TIMEOUT)
+    return options
+
+
+def invalidate_filter_options():
+    cache.delete(FILTER_OPTIONS_CACHE_KEY)
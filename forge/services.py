@@ -1,9 +1,12 @@
 import requests
 import yaml
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional
 from django.conf import settings
 from django.utils import timezone
+from mysite.github_client import BACKGROUND_MAX_WAIT, get_github_client
 from .models import ForgeApp, RepoValidation, ValidationStatus
 
 
@@ -12,13 +15,38 @@ class GitHubAPIError(Exception):
     pass
 
 
+class RepoTree:
+    """In-memory set of file and directory paths from one recursive git tree"""
+    
+    def __init__(self, entries: List[Dict]):
+        self.files = set()
+        self.directories = set()
+        for entry in entries:
+            if entry.get('type') == 'tree':
+                self.directories.add(entry['path'])
+            else:
+                self.files.add(entry['path'])
+    
+    def has_file(self, path: str) -> bool:
+        return path.strip('/') in self.files
+    
+    def has_directory(self, path: str) -> bool:
+        return path.strip('/') in self.directories
+
+
 class GitHubRepoValidationService:
     """Service for validating GitHub repositories for Forge apps"""
     
-    def __init__(self):
+    def __init__(self, use_tree: bool = True, max_wait: int = 0):
         self.github_token = getattr(settings, 'GITHUB_API_TOKEN', None)
+        # Seconds to wait out an exhausted rate limit (0 fails fast on request paths)
+        self.max_wait = max_wait
         self.marketplace_org = getattr(settings, 'FORGE_MARKETPLACE_ORG', 'buildly-marketplace')
         self.default_branch = getattr(settings, 'FORGE_DEFAULT_BRANCH', 'main')
+        # Answer file/directory checks from one recursive tree fetch instead of
+        # one contents API call per path
+        self.use_tree = use_tree
+        self.client = get_github_client()
         
         # Note: GitHub token is optional for app startup, but required for actual validation operations
     
@@ -33,14 +61,39 @@ class GitHubRepoValidationService:
             'User-Agent': 'Buildly-Forge/1.0'
         }
     
-    def check_file_exists(self, owner: str, repo: str, path: str, branch: str = None) -> bool:
+    def _get(self, path: str, params: Dict = None) -> requests.Response:
+        return self.client.get(path, token=self.github_token, params=params, headers=self.get_headers(),
+                               max_wait=self.max_wait)
+    
+    def get_repo_tree(self, owner: str, repo: str, sha: str) -> Optional[RepoTree]:
+        """
+        Fetch the full recursive git tree for a commit.
+        Returns None if it cannot be fetched or GitHub truncated it, in which
+        case callers fall back to per-path contents API checks.
+        """
+        url = f"/repos/{owner}/{repo}/git/trees/{sha}"
+        
+        try:
+            response = self._get(url, params={'recursive': '1'})
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if data.get('truncated'):
+                return None
+            return RepoTree(data.get('tree', []))
+        except (requests.RequestException, ValueError):
+            return None
+    
+    def check_file_exists(self, owner: str, repo: str, path: str, branch: str = None, tree: RepoTree = None) -> bool:
         """Check if a file exists in the repository"""
+        if tree is not None:
+            return tree.has_file(path)
         branch = branch or self.default_branch
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+        url = f"/repos/{owner}/{repo}/contents/{path}"
         params = {'ref': branch}
         
         try:
-            response = requests.get(url, headers=self.get_headers(), params=params)
+            response = self._get(url, params=params)
             return response.status_code == 200
         except requests.RequestException:
             return False
@@ -48,11 +101,11 @@ class GitHubRepoValidationService:
     def get_file_content(self, owner: str, repo: str, path: str, branch: str = None) -> Optional[str]:
         """Get the content of a file from the repository"""
         branch = branch or self.default_branch
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+        url = f"/repos/{owner}/{repo}/contents/{path}"
         params = {'ref': branch}
         
         try:
-            response = requests.get(url, headers=self.get_headers(), params=params)
+            response = self._get(url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('encoding') == 'base64':
@@ -61,14 +114,16 @@ class GitHubRepoValidationService:
         except (requests.RequestException, UnicodeDecodeError):
             return None
     
-    def check_directory_exists(self, owner: str, repo: str, path: str, branch: str = None) -> bool:
+    def check_directory_exists(self, owner: str, repo: str, path: str, branch: str = None, tree: RepoTree = None) -> bool:
         """Check if a directory exists in the repository"""
+        if tree is not None:
+            return tree.has_directory(path)
         branch = branch or self.default_branch
-        url = f"https://api.github.com/repos/{owner}/{repo}/contents/{path}"
+        url = f"/repos/{owner}/{repo}/contents/{path}"
         params = {'ref': branch}
         
         try:
-            response = requests.get(url, headers=self.get_headers(), params=params)
+            response = self._get(url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 return isinstance(data, list)  # Directory returns array of contents
@@ -79,10 +134,10 @@ class GitHubRepoValidationService:
     def get_commit_sha(self, owner: str, repo: str, branch: str = None) -> Optional[str]:
         """Get the latest commit SHA for a branch"""
         branch = branch or self.default_branch
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits/{branch}"
+        url = f"/repos/{owner}/{repo}/commits/{branch}"
         
         try:
-            response = requests.get(url, headers=self.get_headers())
+            response = self._get(url)
             if response.status_code == 200:
                 return response.json()['sha']
             return None
@@ -113,49 +168,56 @@ class GitHubRepoValidationService:
         except yaml.YAMLError as e:
             return False, {}, [f'BUILDLY.yaml parse error: {str(e)}']
     
-    def validate_target_specific_files(self, owner: str, repo: str, targets: List[str], branch: str = None) -> List[str]:
+    def validate_target_specific_files(self, owner: str, repo: str, targets: List[str], branch: str = None,
+                                       tree: RepoTree = None) -> List[str]:
         """Validate target-specific required files"""
         missing_items = []
         
+        def file_exists(path):
+            return self.check_file_exists(owner, repo, path, branch, tree=tree)
+        
+        def directory_exists(path):
+            return self.check_directory_exists(owner, repo, path, branch, tree=tree)
+        
         for target in targets:
             if target == 'github-pages':
                 # Check for pages workflow
-                if not self.check_file_exists(owner, repo, '.github/workflows/pages.yml', branch):
+                if not file_exists('.github/workflows/pages.yml'):
                     missing_items.append('github-pages: missing .github/workflows/pages.yml')
                 
                 # Check for build configuration
-                has_tailwind = self.check_file_exists(owner, repo, 'tailwind.config.js', branch)
-                has_package_json = self.check_file_exists(owner, repo, 'package.json', branch)
+                has_tailwind = file_exists('tailwind.config.js')
+                has_package_json = file_exists('package.json')
                 
                 if not (has_tailwind or has_package_json):
                     missing_items.append('github-pages: missing tailwind.config.js OR package.json with build scripts')
             
             elif target == 'docker':
-                if not self.check_file_exists(owner, repo, 'Dockerfile', branch):
+                if not file_exists('Dockerfile'):
                     missing_items.append('docker: missing Dockerfile')
             
             elif target == 'k8s' or target == 'kubernetes':
-                has_chart = self.check_directory_exists(owner, repo, 'chart', branch)
-                has_helm = self.check_directory_exists(owner, repo, 'helm', branch)
+                has_chart = directory_exists('chart')
+                has_helm = directory_exists('helm')
                 
                 if not (has_chart or has_helm):
                     missing_items.append('k8s: missing chart/ or helm/ directory')
                 else:
                     # Check for required files in the chart directory
                     chart_dir = 'chart' if has_chart else 'helm'
-                    if not self.check_file_exists(owner, repo, f'{chart_dir}/Chart.yaml', branch):
+                    if not file_exists(f'{chart_dir}/Chart.yaml'):
                         missing_items.append(f'k8s: missing {chart_dir}/Chart.yaml')
-                    if not self.check_file_exists(owner, repo, f'{chart_dir}/values.yaml', branch):
+                    if not file_exists(f'{chart_dir}/values.yaml'):
                         missing_items.append(f'k8s: missing {chart_dir}/values.yaml')
             
             elif target == 'desktop':
-                if not self.check_directory_exists(owner, repo, 'installers', branch):
+                if not directory_exists('installers'):
                     missing_items.append('desktop: missing installers/ directory')
                 else:
                     # Check for at least one OS subdirectory
                     os_dirs = ['macos', 'windows', 'linux']
                     has_os_dir = any(
-                        self.check_directory_exists(owner, repo, f'installers/{os_dir}', branch) 
+                        directory_exists(f'installers/{os_dir}') 
                         for os_dir in os_dirs
                     )
                     if not has_os_dir:
@@ -163,33 +225,54 @@ class GitHubRepoValidationService:
         
         return missing_items
     
-    def validate_repository(self, forge_app: ForgeApp) -> RepoValidation:
-        """Main validation method for a ForgeApp repository"""
+    def validate_repository(self, forge_app: ForgeApp, owner: str = None, repo: str = None) -> RepoValidation:
+        """
+        Main validation method for a ForgeApp repository.
+        owner/repo are accepted for existing callers; the app's own repo is validated.
+        """
+        validation = self.build_validation(forge_app)
+        validation.save()
+        return validation
+    
+    def build_validation(self, forge_app: ForgeApp, commit_sha: str = None) -> RepoValidation:
+        """
+        Validate a repository and return an unsaved RepoValidation.
+        Makes no database queries, so it is safe to run in worker threads.
+        Pass commit_sha if it has already been resolved.
+        """
         missing_items = []
         detected_targets = []
         status = ValidationStatus.FAILED
-        commit_sha = None
         
         try:
             # Validate that repo is in the correct organization
             if forge_app.repo_owner != self.marketplace_org:
                 missing_items.append(f'Repository must be in {self.marketplace_org} organization')
-                return self._create_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
+                return self._build_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
             
             # Get current commit SHA
-            commit_sha = self.get_commit_sha(forge_app.repo_owner, forge_app.repo_name)
+            commit_sha = commit_sha or self.get_commit_sha(forge_app.repo_owner, forge_app.repo_name)
             if not commit_sha:
                 missing_items.append('Unable to access repository or get commit SHA')
-                return self._create_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
+                return self._build_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
+            
+            # Fetch the whole tree once; None falls back to per-path API checks
+            tree = None
+            if self.use_tree:
+                tree = self.get_repo_tree(forge_app.repo_owner, forge_app.repo_name, commit_sha)
             
             # Check common required files
             common_files = ['BUILDLY.yaml', 'README.md', 'LICENSE']
             for file_path in common_files:
-                if not self.check_file_exists(forge_app.repo_owner, forge_app.repo_name, file_path):
+                if not self.check_file_exists(forge_app.repo_owner, forge_app.repo_name, file_path, tree=tree):
                     missing_items.append(f'missing {file_path}')
             
             # Parse BUILDLY.yaml
-            buildly_content = self.get_file_content(forge_app.repo_owner, forge_app.repo_name, 'BUILDLY.yaml')
+            buildly_content = None
+            if tree is None or tree.has_file('BUILDLY.yaml'):
+                buildly_content = self.get_file_content(
+                    forge_app.repo_owner, forge_app.repo_name, 'BUILDLY.yaml', commit_sha if tree else None
+                )
             if buildly_content:
                 is_valid, parsed_data, yaml_errors = self.parse_buildly_yaml(buildly_content)
                 if not is_valid:
@@ -204,7 +287,8 @@ class GitHubRepoValidationService:
                 target_missing = self.validate_target_specific_files(
                     forge_app.repo_owner, 
                     forge_app.repo_name, 
-                    detected_targets
+                    detected_targets,
+                    tree=tree
                 )
                 missing_items.extend(target_missing)
             
@@ -215,13 +299,13 @@ class GitHubRepoValidationService:
             missing_items.append(f'Validation error: {str(e)}')
             status = ValidationStatus.FAILED
         
-        return self._create_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
+        return self._build_validation_record(forge_app, status, missing_items, detected_targets, commit_sha)
     
-    def _create_validation_record(self, forge_app: ForgeApp, status: ValidationStatus, 
+    def _build_validation_record(self, forge_app: ForgeApp, status: ValidationStatus, 
                                 missing_items: List[str], detected_targets: List[str], 
                                 commit_sha: Optional[str]) -> RepoValidation:
-        """Create and save a validation record"""
-        validation = RepoValidation.objects.create(
+        """Build an unsaved validation record"""
+        validation = RepoValidation(
             forge_app=forge_app,
             status=status,
             missing_items=missing_items,
@@ -229,4 +313,80 @@ class GitHubRepoValidationService:
             validated_commit_sha=commit_sha,
             run_at=timezone.now()
         )
-        return validation
\ No newline at end of file
+        return validation
+
+
+class MarketplaceValidationRunner:
+    """
+    Validate many ForgeApps concurrently with a bounded thread pool
+    
+    Workers share the pooled GitHub client, which waits out the rate limit
+    centrally (up to max_wait, since this runs from management commands).
+    Threads only talk to GitHub; the results are written afterwards with a
+    single bulk_create.
+    """
+    
+    def __init__(self, workers: int = 8, use_tree: bool = True, max_wait: int = BACKGROUND_MAX_WAIT):
+        self.workers = max(workers, 1)
+        self.use_tree = use_tree
+        self.max_wait = max_wait
+        self._local = threading.local()
+    
+    @staticmethod
+    def annotate_last_validation(queryset):
+        """Annotate last_validated_sha / last_validated_at from each app's latest RepoValidation"""
+        from django.db.models import OuterRef, Subquery
+        latest = RepoValidation.objects.filter(forge_app=OuterRef('pk')).order_by('-run_at')
+        return queryset.annotate(
+            last_validated_sha=Subquery(latest.values('validated_commit_sha')[:1]),
+            last_validated_at=Subquery(latest.values('run_at')[:1]),
+        )
+    
+    def _service(self) -> GitHubRepoValidationService:
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = GitHubRepoValidationService(use_tree=self.use_tree, max_wait=self.max_wait)
+            self._local.service = service
+        return service
+    
+    def _validate(self, app: ForgeApp, since_sha: bool):
+        service = self._service()
+        commit_sha = None
+        last_sha = getattr(app, 'last_validated_sha', None)
+        if since_sha and last_sha:
+            commit_sha = service.get_commit_sha(app.repo_owner, app.repo_name)
+            if commit_sha == last_sha:
+                return None
+        return service.build_validation(app, commit_sha=commit_sha)
+    
+    def run(self, apps, since_sha: bool = False) -> Dict[str, list]:
+        """
+        Validate apps and save the results.
+        
+        Args:
+            apps: ForgeApps, annotated with annotate_last_validation() when
+                since_sha is used
+            since_sha: Skip apps whose head commit matches their last validated SHA
+            
+        Returns:
+            dict: 'validations' (saved RepoValidations), 'skipped' (apps) and
+            'errors' ((app, message) pairs)
+        """
+        apps = list(apps)
+        results = {'validations': [], 'skipped': [], 'errors': []}
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [(app, executor.submit(self._validate, app, since_sha)) for app in apps]
+            for app, future in futures:
+                try:
+                    validation = future.result()
+                except Exception as e:
+                    results['errors'].append((app, str(e)))
+                    continue
+                if validation is None:
+                    results['skipped'].append(app)
+                else:
+                    results['validations'].append(validation)
+        
+        RepoValidation.objects.bulk_create(results['validations'])
+        return results
@@ -0,0 +1,41 @@
+"""
+Keep marketplace search structures in step with ForgeApp rows: the facet
+table, the SQLite full-text table, the cached filter options and the
+anonymous page cache generation.
+"""
+
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import ForgeApp, ForgeAppFacet
+from .page_cache import bump_marketplace_generation
+from .search import index_app, invalidate_filter_options, sqlite_fts_available, unindex_app
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & set(fields))
+
+
+@receiver(post_save, sender=ForgeApp)
+def sync_forge_app_search(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    if _touches(update_fields, ('categories', 'targets')):
+        ForgeAppFacet.sync_for(instance)
+    if _touches(update_fields, ('name', 'summary')):
+        index_app(instance)
+    invalidate_filter_options()
+    bump_marketplace_generation()
+
+
+@receiver(post_delete, sender=ForgeApp)
+def remove_forge_app_search(sender, instance, **kwargs):
+    unindex_app(instance.id)
+    invalidate_filter_options()
+    bump_marketplace_generation()
+
+
+@receiver(post_migrate)
+def reset_search_backend(sender, **kwargs):
+    # Migrations create and drop the FTS table
+    sqlite_fts_available.cache_clear()
@@ -0,0 +1,48 @@
+"""
+Celery tasks for the forge app.
+
+refresh_forge_releases runs from the beat schedule (CELERY_BEAT_SCHEDULE) so
+purchase downloads never wait on GitHub for release metadata.
+verify_forge_logos is queued by ForgeApp.save (and runs from beat) so saves
+never wait on logo URL checks.
+process_stripe_event is queued by the Stripe webhook once the event is stored
+in the inbox (see forge.webhooks).
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_forge_releases():
+    """Refresh latest release info for every published app with a repository"""
+    from forge.github_release_service import GitHubReleaseService
+    from forge.models import ForgeApp
+    from mysite.github_client import BACKGROUND_MAX_WAIT
+
+    apps = ForgeApp.objects.filter(is_published=True).exclude(repo_owner='').exclude(repo_name='')
+    return GitHubReleaseService(max_wait=BACKGROUND_MAX_WAIT).refresh_releases(apps)
+
+
+@shared_task
+def verify_forge_logos():
+    """Check every logo URL without a cached result and clear unreachable ones"""
+    from django.core.cache import cache
+    from forge.logo_verification import verify_logos, VERIFY_QUEUE_LOCK_KEY
+    from forge.models import ForgeApp
+
+    # Saves from now on need a fresh run
+    cache.delete(VERIFY_QUEUE_LOCK_KEY)
+    apps = list(ForgeApp.objects.filter(logo_url__startswith='http').only('id', 'logo_url'))
+    return verify_logos(apps)
+
+
+@shared_task
+def process_stripe_event(inbox_event_pk):
+    """Process one event from the Stripe webhook inbox (at most once)"""
+    from forge.webhooks import process_event
+
+    return process_event(inbox_event_pk)
@@ -1,3 +1,909 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from forge.download_service import AppendOverlay, LicenseDownloadService
+from forge.github_release_service import GitHubReleaseService
+from forge.logo_verification import verify_logos, cached_logo_status
+from forge.models import (
+    Entitlement, FacetKind, ForgeApp, ForgeAppFacet, Purchase, RepoValidation, StripeWebhookEvent,
+    ValidationStatus, WebhookEventStatus,
+)
+from forge.page_cache import _page_key, bump_marketplace_generation, marketplace_generation
+from forge.release_cache import ReleaseArtifactCache
+from forge.search import FILTER_OPTIONS_CACHE_KEY
+from forge.services import GitHubRepoValidationService
+from forge.tasks import refresh_forge_releases
+from forge.webhooks import claim_event, process_event
+from mysite.github_client import GitHubClient, GitHubRateLimiter, RateLimited
+
+
+class LicenseInjectionTest(TestCase):
+    """Test license injection into release zips"""
+
+    def _release_zip(self):
+        zip_file = tempfile.TemporaryFile()
+        with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as release:
+            release.writestr('repo-abc123/README.md', 'Read me ' * 1000)
+            release.writestr('repo-abc123/src/app.py', 'print("hello")\n')
+        return zip_file
+
+    def test_license_appended_without_rewriting_entries(self):
+        """Test that existing entries are kept byte-for-byte and license files are added at the root"""
+        zip_file = self._release_zip()
+        with zipfile.ZipFile(zip_file) as release:
+            original = {info.filename: (info.header_offset, info.compress_size, info.CRC) for info in release.infolist()}
+
+        injected = LicenseDownloadService().inject_license_into_zip(zip_file, '# License', 'Test App')
+
+        self.assertTrue(injected)
+        self.assertEqual(zip_file.tell(), 0)
+        with zipfile.ZipFile(zip_file) as licensed:
+            self.assertIsNone(licensed.testzip())
+            for info in licensed.infolist():
+                if info.filename in original:
+                    self.assertEqual((info.header_offset, info.compress_size, info.CRC), original[info.filename])
+            self.assertEqual(licensed.read('repo-abc123/LICENSE.md'), b'# License')
+            self.assertIn('repo-abc123/LICENSE_INSTRUCTIONS.md', licensed.namelist())
+        zip_file.close()
+
+    def test_overlay_leaves_shared_release_untouched(self):
+        """Test that licensing through an AppendOverlay never writes to the cached release"""
+        release = self._release_zip()
+        release.seek(0)
+        original = release.read()
+
+        zip_file = AppendOverlay(release)
+        self.assertTrue(LicenseDownloadService().inject_license_into_zip(zip_file, '# License', 'Test App'))
+
+        release.seek(0)
+        self.assertEqual(release.read(), original)
+        licensed = zip_file.read()
+        self.assertEqual(len(licensed), zip_file.size())
+        with zipfile.ZipFile(io.BytesIO(licensed)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.read('repo-abc123/LICENSE.md'), b'# License')
+        zip_file.close()
+        self.assertTrue(release.closed)
+
+
+class ReleaseArtifactCacheTest(TestCase):
+    """Test the on-disk release zip cache"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_concurrent_misses_fetch_once(self):
+        """Test that concurrent first downloads of a tag fetch upstream only once"""
+        cache = ReleaseArtifactCache(directory=self.tmpdir.name, max_bytes=10 ** 6)
+        calls = []
+
+        def fetch(fileobj):
+            calls.append(1)
+            fileobj.write(b'zip-bytes')
+            return True
+
+        files = []
+        threads = [
+            threading.Thread(target=lambda: files.append(cache.open_or_fetch('acme', 'app', 'v1', fetch)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({cached.name for cached in files}), 1)
+        for cached in files:
+            self.assertEqual(cached.read(), b'zip-bytes')
+            cached.close()
+
+    def test_failed_fetch_leaves_no_entry(self):
+        """Test that a failed download is not cached"""
+        cache = ReleaseArtifactCache(directory=self.tmpdir.name, max_bytes=10 ** 6)
+
+        self.assertIsNone(cache.open_or_fetch('acme', 'app', 'v1', lambda fileobj: False))
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if not name.endswith('.lock')], [])
+
+    def test_least_recently_used_entry_evicted(self):
+        """Test that the oldest entry is evicted once the size limit is exceeded"""
+        cache = ReleaseArtifactCache(directory=self.tmpdir.name, max_bytes=250)
+
+        def fetch(fileobj):
+            fileobj.write(b'x' * 100)
+            return True
+
+        v1 = self._fetch(cache, 'v1', fetch)
+        v2 = self._fetch(cache, 'v2', fetch)
+        os.utime(v1, (1, 1))
+        os.utime(v2, (2, 2))
+        self._fetch(cache, 'v1', fetch)  # hit marks v1 as recently used
+        v3 = self._fetch(cache, 'v3', fetch)
+
+        self.assertTrue(os.path.exists(v1))
+        self.assertFalse(os.path.exists(v2))
+        self.assertFalse(os.path.exists(v2 + '.lock'))
+        self.assertTrue(os.path.exists(v3))
+
+    def test_open_entry_survives_eviction(self):
+        """Test that an entry evicted after being handed out can still be read"""
+        cache = ReleaseArtifactCache(directory=self.tmpdir.name, max_bytes=0)
+        cached = cache.open_or_fetch('acme', 'app', 'v1', lambda fileobj: fileobj.write(b'zip-bytes') > 0)
+        cache.evict()
+
+        self.assertFalse(os.path.exists(cached.name))
+        self.assertEqual(cached.read(), b'zip-bytes')
+        cached.close()
+
+    def test_evict_skips_entries_being_fetched_and_removes_orphan_locks(self):
+        """Test that eviction leaves locked entries alone and cleans up lock files without an entry"""
+        cache = ReleaseArtifactCache(directory=self.tmpdir.name, max_bytes=0)
+        cache.open_or_fetch('acme', 'app', 'v1', lambda fileobj: False)
+        v2 = self._fetch(cache, 'v2', lambda fileobj: fileobj.write(b'zip-bytes') > 0)
+
+        with cache._lock(v2):
+            cache.evict()
+            self.assertTrue(os.path.exists(v2))
+        cache.evict()
+
+        self.assertEqual(os.listdir(self.tmpdir.name), [])
+
+    @staticmethod
+    def _fetch(cache, tag, fetch):
+        with cache.open_or_fetch('acme', 'app', tag, fetch) as cached:
+            return cached.name
+
+
+@override_settings(GITHUB_API_TOKEN='test-token', FORGE_MARKETPLACE_ORG='buildly-marketplace')
+class TreeValidationTest(TestCase):
+    """Test repository validation answered from a single git tree fetch"""
+
+    def setUp(self):
+        self.app = ForgeApp.objects.create(
+            slug='tree-app',
+            name='Tree App',
+            summary='Validated from one tree',
+            repo_url='https://github.com/buildly-marketplace/tree-app',
+            repo_owner='buildly-marketplace',
+            repo_name='tree-app',
+            license_type='MIT',
+        )
+        buildly_yaml = 'name: Tree App\nslug: tree-app\nversion: 1.0\nsummary: x\nlicense: MIT\ntargets: [docker, k8s, desktop]\n'
+        tree = [
+            {'path': 'BUILDLY.yaml', 'type': 'blob'},
+            {'path': 'README.md', 'type': 'blob'},
+            {'path': 'LICENSE', 'type': 'blob'},
+            {'path': 'Dockerfile', 'type': 'blob'},
+            {'path': 'chart', 'type': 'tree'},
+            {'path': 'chart/Chart.yaml', 'type': 'blob'},
+            {'path': 'chart/values.yaml', 'type': 'blob'},
+            {'path': 'installers', 'type': 'tree'},
+            {'path': 'installers/linux', 'type': 'tree'},
+        ]
+        self.payloads = {
+            '/commits/main': {'sha': 'abc123'},
+            '/git/trees/abc123': {'sha': 'abc123', 'tree': tree, 'truncated': False},
+            '/contents/BUILDLY.yaml': {'encoding': 'base64', 'content': base64.b64encode(buildly_yaml.encode()).decode()},
+        }
+
+    def _fake_request(self, method, url, **kwargs):
+        response = mock.Mock(headers={})
+        for suffix, payload in self.payloads.items():
+            if url.endswith(suffix):
+                response.status_code = 200
+                response.json.return_value = payload
+                return response
+        response.status_code = 404
+        return response
+
+    def test_validation_uses_tree_for_path_checks(self):
+        """Test that every file and directory check is answered from the tree"""
+        service = GitHubRepoValidationService()
+
+        with mock.patch.object(service.client.session, 'request', side_effect=self._fake_request) as get:
+            validation = service.validate_repository(self.app)
+
+        self.assertEqual(validation.status, ValidationStatus.PASSED, validation.missing_items)
+        self.assertEqual(validation.validated_commit_sha, 'abc123')
+        requested = [call.args[1] for call in get.call_args_list]
+        self.assertEqual(len(requested), 3)
+        self.assertFalse(any('/contents/' in url and 'BUILDLY' not in url for url in requested))
+        self.assertTrue(all(call.kwargs.get('timeout') for call in get.call_args_list))
+
+
+class StubGitHubHandler(BaseHTTPRequestHandler):
+    """Minimal GitHub API: every repo is a valid docker app at commit 'head-<repo>'"""
+
+    buildly_yaml = 'name: App\nslug: app\nversion: 1.0\nsummary: x\nlicense: MIT\ntargets: [docker]\n'
+    requests_seen = []
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        self.requests_seen.append(path)
+        repo = path.split('/')[3]
+        if path.endswith('/commits/main'):
+            payload = {'sha': f'head-{repo}'}
+        elif '/git/trees/' in path:
+            payload = {'tree': [{'path': name, 'type': 'blob'} for name in ('BUILDLY.yaml', 'README.md', 'LICENSE', 'Dockerfile')]}
+        elif path.endswith('/contents/BUILDLY.yaml'):
+            payload = {'encoding': 'base64', 'content': base64.b64encode(self.buildly_yaml.encode()).decode()}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('X-RateLimit-Remaining', '4000')
+        self.send_header('X-RateLimit-Reset', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ValidateForgeReposCommandTest(TestCase):
+    """Test the concurrent validate_forge_repos command against a local stub GitHub server"""
+
+    def setUp(self):
+        StubGitHubHandler.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubGitHubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        api_url = f'http://127.0.0.1:{self.server.server_port}'
+        settings_override = override_settings(
+            GITHUB_API_TOKEN='test-token', GITHUB_API_URL=api_url, FORGE_MARKETPLACE_ORG='buildly-marketplace'
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.apps = [
+            ForgeApp.objects.create(
+                slug=f'app-{i}', name=f'App {i}', summary='x',
+                repo_url=f'https://github.com/buildly-marketplace/app-{i}',
+                repo_owner='buildly-marketplace', repo_name=f'app-{i}', license_type='MIT',
+            )
+            for i in range(4)
+        ]
+
+    def test_validates_all_apps_concurrently(self):
+        """Test that every app gets a passing validation written in bulk"""
+        call_command('validate_forge_repos', '--workers', '3', stdout=io.StringIO())
+
+        self.assertEqual(RepoValidation.objects.filter(status=ValidationStatus.PASSED).count(), 4)
+        self.assertEqual(
+            set(RepoValidation.objects.values_list('validated_commit_sha', flat=True)),
+            {f'head-app-{i}' for i in range(4)}
+        )
+        # commit + tree + BUILDLY.yaml per repo
+        self.assertEqual(len(StubGitHubHandler.requests_seen), 12)
+
+    def test_since_sha_skips_unchanged_apps(self):
+        """Test that --since-sha only revalidates apps whose head commit moved"""
+        old = now() - timedelta(days=1)
+        RepoValidation.objects.create(forge_app=self.apps[0], status=ValidationStatus.PASSED,
+                                      validated_commit_sha='head-app-0', run_at=old)
+        RepoValidation.objects.create(forge_app=self.apps[1], status=ValidationStatus.PASSED,
+                                      validated_commit_sha='stale-sha', run_at=old)
+
+        out = io.StringIO()
+        call_command('validate_forge_repos', '--since-sha', stdout=out)
+
+        self.assertIn('app-0: SKIPPED (commit unchanged)', out.getvalue())
+        self.assertEqual(self.apps[0].validations.count(), 1)
+        self.assertEqual(self.apps[1].validations.count(), 2)
+        self.assertEqual(RepoValidation.objects.count(), 5)
+
+
+class GitHubRateLimiterTest(TestCase):
+    """Test the shared GitHub rate limit budget"""
+
+    def _limiter(self, sleeps):
+        limiter = GitHubRateLimiter(
+            reserve=5, clock=lambda: 1000,
+            sleep=lambda delay: sleeps.append((delay, limiter._lock.locked())),
+        )
+        limiter.record(mock.Mock(headers={'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset': '1030'}))
+        return limiter
+
+    def test_interactive_callers_fail_fast(self):
+        """Test that an exhausted budget raises RateLimited instead of sleeping"""
+        sleeps = []
+        limiter = self._limiter(sleeps)
+        with self.assertRaises(RateLimited) as raised:
+            limiter.acquire()
+        self.assertEqual(raised.exception.retry_after, 30)
+        self.assertEqual(sleeps, [])
+
+    def test_background_callers_wait_without_holding_the_lock(self):
+        """Test that background callers sleep until the reset, up to max_wait, with the lock released"""
+        sleeps = []
+        limiter = self._limiter(sleeps)
+        with self.assertRaises(RateLimited):
+            limiter.acquire(max_wait=10)
+        limiter.acquire(max_wait=60)
+        self.assertEqual(sleeps, [(31, False)])
+
+
+@override_settings(GITHUB_API_TOKEN='test-token', GITHUB_API_URL='https://github.test')
+class GitHubClientTest(TestCase):
+    """Test the shared GitHub client"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _response(self, status_code, content=b'', headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        response.raw = io.BytesIO(content)
+        response.headers.update(headers or {})
+        return response
+
+    def test_unchanged_resource_served_from_etag_cache(self):
+        """Test that a 304 Not Modified returns the previously cached body"""
+        session = mock.Mock()
+        session.request.side_effect = [
+            self._response(200, b'{"login": "octo"}', {'ETag': '"v1"', 'Content-Type': 'application/json'}),
+            self._response(304),
+        ]
+        client = GitHubClient(session=session)
+
+        first = client.get('/users/octo')
+        second = client.get('/users/octo')
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        method, url = session.request.call_args_list[1].args
+        self.assertEqual(url, 'https://github.test/users/octo')
+        self.assertEqual(session.request.call_args_list[1].kwargs['headers']['If-None-Match'], '"v1"')
+
+    @mock.patch('mysite.github_client.time.sleep')
+    def test_secondary_rate_limit_only_waited_out_by_background_callers(self, sleep):
+        """Test that Retry-After fails interactive calls and is retried once for background calls"""
+        session = mock.Mock()
+        session.request.side_effect = [
+            self._response(403, headers={'Retry-After': '5'}),
+            self._response(403, headers={'Retry-After': '5'}),
+            self._response(200, b'{}'),
+        ]
+        client = GitHubClient(session=session)
+
+        with self.assertRaises(RateLimited):
+            client.get('/users/octo', conditional=False)
+        sleep.assert_not_called()
+
+        self.assertEqual(client.get('/users/octo', conditional=False, max_wait=30).status_code, 200)
+        sleep.assert_called_once_with(5)
+
+    def test_per_endpoint_timeouts(self):
+        """Test that archive downloads get a longer read timeout than API calls"""
+        self.assertEqual(GitHubClient.timeout_for('https://api.github.com/repos/a/b/zipball/v1'), (5, 60))
+        self.assertEqual(GitHubClient.timeout_for('https://api.github.com/users/octo'), (5, 10))
+
+
+class RefreshForgeReleasesTest(TestCase):
+    """Test the scheduled bulk release refresh"""
+
+    def setUp(self):
+        for i in range(3):
+            ForgeApp.objects.create(
+                slug=f'release-{i}', name=f'Release {i}', summary='x',
+                repo_url=f'https://github.com/buildly-marketplace/release-{i}',
+                repo_owner='buildly-marketplace', repo_name=f'release-{i}',
+                license_type='MIT', is_published=True,
+            )
+
+    def test_refresh_updates_published_apps_in_bulk(self):
+        """Test that releases are fetched per app but written in one bulk update"""
+        def latest_release(service, owner, repo):
+            if repo == 'release-2':
+                return None
+            return {'name': f'{repo} v2', 'tag': 'v2', 'url': f'https://github.com/{owner}/{repo}/releases/v2',
+                    'zipball_url': f'https://api.github.com/repos/{owner}/{repo}/zipball/v2'}
+
+        with mock.patch('forge.github_release_service.GitHubReleaseService._fetch_latest_release',
+                        autospec=True, side_effect=latest_release), \
+                CaptureQueriesContext(connection) as queries:
+            found = refresh_forge_releases()
+
+        self.assertEqual(found, 2)
+        # One SELECT for the apps and one UPDATE for all of them
+        self.assertEqual(len(queries), 2)
+        app = ForgeApp.objects.get(slug='release-0')
+        self.assertEqual(app.latest_release_tag, 'v2')
+        self.assertIsNotNone(app.last_release_check)
+        unreleased = ForgeApp.objects.get(slug='release-2')
+        self.assertIsNone(unreleased.latest_release_tag)
+        self.assertIsNotNone(unreleased.last_release_check)
+
+
+    def test_failed_lookups_are_not_marked_checked(self):
+        """Test that rate-limited or failed lookups leave apps due for the next run"""
+        def latest_release(service, owner, repo):
+            if repo == 'release-0':
+                raise RateLimited(120)
+            if repo == 'release-1':
+                raise requests.ConnectionError('boom')
+            return None
+
+        with mock.patch('forge.github_release_service.GitHubReleaseService._fetch_latest_release',
+                        autospec=True, side_effect=latest_release):
+            self.assertEqual(refresh_forge_releases(), 0)
+
+        self.assertIsNone(ForgeApp.objects.get(slug='release-0').last_release_check)
+        self.assertIsNone(ForgeApp.objects.get(slug='release-1').last_release_check)
+        self.assertIsNotNone(ForgeApp.objects.get(slug='release-2').last_release_check)
+
+
+class LicensedDownloadReleaseLookupTest(TestCase):
+    """Test that downloads look up releases the beat task has not refreshed yet"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='pass')
+        self.app = ForgeApp.objects.create(
+            slug='fresh-app', name='Fresh App', summary='x',
+            repo_url='https://github.com/buildly-marketplace/fresh-app',
+            repo_owner='buildly-marketplace', repo_name='fresh-app',
+            license_type='MIT', is_published=True,
+        )
+        self.purchase = Purchase.objects.create(user=self.user, forge_app=self.app, amount_cents=0, status='completed')
+
+    def test_unrefreshed_app_fetches_release_on_demand(self):
+        """Test that an app without release columns gets them before downloading"""
+        release = {'name': 'v1', 'tag': None, 'url': 'https://github.com/buildly-marketplace/fresh-app/releases/v1',
+                   'zipball_url': 'https://api.github.com/repos/buildly-marketplace/fresh-app/zipball/v1'}
+
+        def write_zip(service, url, fileobj, chunk_size=None):
+            with zipfile.ZipFile(fileobj, 'w') as archive:
+                archive.writestr('fresh-app/README.md', 'hi')
+            return True
+
+        with mock.patch('forge.github_release_service.GitHubReleaseService._fetch_latest_release', return_value=release), \
+                mock.patch('forge.github_release_service.GitHubReleaseService.download_release_zip_to_file',
+                           autospec=True, side_effect=write_zip):
+            zip_file, filename = LicenseDownloadService().create_licensed_download(self.app, self.purchase)
+
+        self.assertEqual(filename, 'fresh-app-latest-licensed.zip')
+        zip_file.close()
+        self.app.refresh_from_db()
+        self.assertEqual(self.app.latest_release_zip_url, release['zipball_url'])
+        self.assertIsNotNone(self.app.last_release_check)
+
+    def test_rate_limited_lookup_propagates_without_marking_checked(self):
+        """Test that a rate limit surfaces as RateLimited instead of a missing release"""
+        with mock.patch('forge.github_release_service.GitHubReleaseService._fetch_latest_release',
+                        side_effect=RateLimited(90)):
+            with self.assertRaises(RateLimited):
+                LicenseDownloadService().create_licensed_download(self.app, self.purchase)
+            with self.assertRaises(RateLimited):
+                GitHubReleaseService().get_latest_release('buildly-marketplace', 'fresh-app')
+
+        self.app.refresh_from_db()
+        self.assertIsNone(self.app.last_release_check)
+
+    def test_recently_checked_app_without_release_is_not_refetched(self):
+        """Test that apps checked within the hour fail without another GitHub call"""
+        self.app.last_release_check = now()
+        with mock.patch('forge.github_release_service.GitHubReleaseService._fetch_latest_release') as latest:
+            self.assertEqual(LicenseDownloadService().create_licensed_download(self.app, self.purchase), (None, None))
+        latest.assert_not_called()
+
+
+class LogoVerificationTest(TestCase):
+    """Test that logo checks are deferred and cached instead of run inside save()"""
+
+    def setUp(self):
+        cache.clear()
+
+    def _app(self, slug, logo_url):
+        return ForgeApp.objects.create(
+            slug=slug, name=slug, summary='x',
+            repo_url=f'https://github.com/buildly-marketplace/{slug}',
+            repo_owner='buildly-marketplace', repo_name=slug,
+            license_type='MIT', logo_url=logo_url,
+        )
+
+    def test_save_queues_verification_without_network(self):
+        """Test that saving an unchecked logo queues a batch check and keeps the URL"""
+        with mock.patch('forge.logo_verification.logo_url_is_reachable') as reachable, \
+                mock.patch('forge.tasks.verify_forge_logos.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            app = self._app('logo-a', 'https://img.test/a.png')
+            self._app('logo-b', 'https://img.test/b.png')
+
+        reachable.assert_not_called()
+        self.assertEqual(apply_async.call_count, 1)
+        self.assertEqual(app.logo_url, 'https://img.test/a.png')
+
+    def test_verify_logos_clears_unreachable_and_caches_results(self):
+        """Test that each distinct URL is checked once and bad ones are cleared"""
+        with mock.patch('forge.tasks.verify_forge_logos.apply_async'):
+            good = self._app('logo-good', 'https://img.test/good.png')
+            bad = self._app('logo-bad', 'https://img.test/bad.png')
+            same_bad = self._app('logo-bad-2', 'https://img.test/bad.png')
+
+        generation = marketplace_generation()
+        with mock.patch('forge.logo_verification.logo_url_is_reachable',
+                        side_effect=lambda url, timeout: 'good' in url) as reachable:
+            cleared = verify_logos([good, bad, same_bad])
+
+        self.assertEqual(cleared, 2)
+        self.assertNotEqual(marketplace_generation(), generation)
+        self.assertEqual(reachable.call_count, 2)
+        self.assertIsNone(ForgeApp.objects.get(pk=bad.pk).logo_url)
+        self.assertEqual(ForgeApp.objects.get(pk=good.pk).logo_url, 'https://img.test/good.png')
+        self.assertIs(cached_logo_status('https://img.test/bad.png'), False)
+
+        # A known-bad URL is cleared on save without any request
+        bad.logo_url = 'https://img.test/bad.png'
+        bad.save()
+        self.assertIsNone(bad.logo_url)
+
+
+class MarketplaceSearchTest(TestCase):
+    """Test facet filters, full-text search and cached filter options"""
+
+    def setUp(self):
+        cache.clear()
+        self._app('crm-suite', 'CRM Suite', 'Customer relationship management', ['sales', 'crm'], ['docker'])
+        self._app('log-shipper', 'Log Shipper', 'Ship container logs anywhere', ['devops'], ['k8s', 'docker'])
+        self._app('draft-tool', 'Draft Tool', 'Unpublished logging helper', ['devops'], ['k8s'], is_published=False)
+
+    def _app(self, slug, name, summary, categories, targets, is_published=True):
+        return ForgeApp.objects.create(
+            slug=slug, name=name, summary=summary,
+            repo_url=f'https://github.com/buildly-marketplace/{slug}',
+            repo_owner='buildly-marketplace', repo_name=slug,
+            license_type='MIT', categories=categories, targets=targets, is_published=is_published,
+        )
+
+    def _slugs(self, **params):
+        response = self.client.get(reverse('forge:forgeapp-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(app['slug'] for app in response.json()['results'])
+
+    def test_facets_follow_app_lists(self):
+        """Test that facet rows are kept in sync with categories/targets on save"""
+        app = ForgeApp.objects.get(slug='crm-suite')
+        app.categories = ['crm', 'analytics']
+        app.save()
+
+        values = set(app.facets.filter(kind=FacetKind.CATEGORY).values_list('value', flat=True))
+        self.assertEqual(values, {'crm', 'analytics'})
+        self.assertEqual(ForgeAppFacet.objects.filter(forge_app=app, kind=FacetKind.TARGET).count(), 1)
+
+    def test_list_filters_by_facets(self):
+        """Test that category/target filters match any value and skip unpublished apps"""
+        self.assertEqual(self._slugs(categories='sales,devops'), ['crm-suite', 'log-shipper'])
+        self.assertEqual(self._slugs(targets='k8s'), ['log-shipper'])
+        self.assertEqual(self._slugs(categories='crm', targets='k8s'), [])
+
+    def test_list_full_text_search(self):
+        """Test that search matches word prefixes in name and summary"""
+        self.assertEqual(self._slugs(search='custom'), ['crm-suite'])
+        self.assertEqual(self._slugs(search='log'), ['log-shipper'])
+        self.assertEqual(self._slugs(search='ship container'), ['log-shipper'])
+
+        app = ForgeApp.objects.get(slug='crm-suite')
+        app.summary = 'Pipeline tracking'
+        app.save()
+        self.assertEqual(self._slugs(search='custom'), [])
+        self.assertEqual(self._slugs(search='pipeline'), ['crm-suite'])
+
+    def test_fts_table_introspected_once(self):
+        """Test that searches do not re-introspect the schema for the FTS table"""
+        self._slugs(search='custom')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._slugs(search='custom'), ['crm-suite'])
+        self.assertFalse([q for q in queries if 'sqlite_master' in q['sql']])
+
+    def test_filter_options_cached_until_save(self):
+        """Test that filter options come from the cache and are invalidated on save"""
+        url = reverse('forge:forgeapp-filter-options')
+        data = self.client.get(url).json()
+        self.assertEqual(data['categories'], ['crm', 'devops', 'sales'])
+        self.assertEqual(data['targets'], ['docker', 'k8s'])
+        self.assertEqual(data['counts']['targets'], {'docker': 2, 'k8s': 1})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertEqual(len(queries), 0)
+
+        draft = ForgeApp.objects.get(slug='draft-tool')
+        draft.is_published = True
+        draft.categories = ['monitoring']
+        draft.save()
+        self.assertIsNone(cache.get(FILTER_OPTIONS_CACHE_KEY))
+        self.assertIn('monitoring', self.client.get(url).json()['categories'])
+
+
+class LatestValidationPrefetchTest(TestCase):
+    """Test that the latest validation is prefetched instead of queried per app"""
+
+    def setUp(self):
+        for i in range(5):
+            app = ForgeApp.objects.create(
+                slug=f'validated-{i}', name=f'Validated {i}', summary='x',
+                repo_url=f'https://github.com/buildly-marketplace/validated-{i}',
+                repo_owner='buildly-marketplace', repo_name=f'validated-{i}',
+                license_type='MIT', is_published=True,
+            )
+            RepoValidation.objects.create(forge_app=app, status=ValidationStatus.FAILED,
+                                          run_at=now() - timedelta(days=1))
+            RepoValidation.objects.create(forge_app=app, status=ValidationStatus.PASSED)
+
+    def test_list_uses_fixed_number_of_queries(self):
+        """Test that a page of apps costs count + apps + validations queries"""
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('forge:forgeapp-list'))
+        statuses = {app['latest_validation_status'] for app in response.json()['results']}
+        self.assertEqual(statuses, {ValidationStatus.PASSED})
+
+    def test_prefetched_matches_unprefetched(self):
+        """Test that the prefetched latest validation is the most recent one"""
+        app = ForgeApp.objects.with_latest_validation().get(slug='validated-0')
+        with self.assertNumQueries(0):
+            latest = app.latest_validation
+        self.assertEqual(latest, ForgeApp.objects.get(slug='validated-0').latest_validation)
+
+
+class StripeWebhookInboxTest(TestCase):
+    """Test that Stripe events are stored once, acknowledged and processed at most once"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buyer', 'buyer@example.com', 'pw')
+        self.app = ForgeApp.objects.create(
+            slug='paid-app', name='Paid App', summary='x',
+            repo_url='https://github.com/buildly-marketplace/paid-app',
+            repo_owner='buildly-marketplace', repo_name='paid-app',
+            license_type='MIT', price_cents=2900, is_published=True,
+        )
+        self.purchase = Purchase.objects.create(user=self.user, forge_app=self.app, amount_cents=2900)
+
+    def _event(self, event_id, event_type='checkout.session.completed'):
+        return {
+            'id': event_id,
+            'type': event_type,
+            'data': {'object': {
+                'id': 'cs_1', 'payment_intent': 'pi_1',
+                'metadata': {'purchase_id': str(self.purchase.id)},
+            }},
+        }
+
+    def _post(self, event):
+        with mock.patch('stripe.Webhook.construct_event', return_value=event):
+            return self.client.post(reverse('forge:stripe-webhook'), data=b'{}',
+                                    content_type='application/json', HTTP_STRIPE_SIGNATURE='sig')
+
+    def test_webhook_stores_and_queues_each_event_once(self):
+        """Test that retried deliveries are acknowledged without queueing work again"""
+        with mock.patch('forge.tasks.process_stripe_event.delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            first = self._post(self._event('evt_1'))
+            retry = self._post(self._event('evt_1'))
+
+        self.assertEqual((first.status_code, retry.status_code), (200, 200))
+        self.assertEqual(StripeWebhookEvent.objects.count(), 1)
+        delay.assert_called_once_with(StripeWebhookEvent.objects.get().pk)
+
+    def test_event_processed_at_most_once(self):
+        """Test that a checkout completes the purchase and a second run is a no-op"""
+        with mock.patch('forge.tasks.process_stripe_event.delay'), self.captureOnCommitCallbacks(execute=True):
+            self._post(self._event('evt_2'))
+        inbox_event = StripeWebhookEvent.objects.get(event_id='evt_2')
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch('forge.pdf_generator.generate_license_pdf', return_value=io.BytesIO(b'%PDF')):
+            self.assertEqual(process_event(inbox_event.pk), WebhookEventStatus.PROCESSED)
+            self.assertIsNone(process_event(inbox_event.pk))
+
+        self.purchase.refresh_from_db()
+        self.assertEqual(self.purchase.status, 'completed')
+        self.assertEqual(self.purchase.stripe_payment_intent_id, 'pi_1')
+        self.assertTrue(Entitlement.objects.filter(user=self.user, forge_app=self.app).exists())
+        inbox_event.refresh_from_db()
+        self.assertEqual(inbox_event.attempts, 1)
+
+    def test_failed_checkout_leaves_no_license_document(self):
+        """Test that a rolled back checkout removes the license PDF it stored"""
+        with mock.patch('forge.tasks.process_stripe_event.delay'), self.captureOnCommitCallbacks(execute=True):
+            self._post(self._event('evt_5'))
+        inbox_event = StripeWebhookEvent.objects.get(event_id='evt_5')
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch('forge.pdf_generator.generate_license_pdf', return_value=io.BytesIO(b'%PDF')), \
+                mock.patch('forge.webhooks.Entitlement.objects.get_or_create', side_effect=IntegrityError('boom')):
+            self.assertEqual(process_event(inbox_event.pk), WebhookEventStatus.FAILED)
+            stored = [name for _, _, names in os.walk(media_root) for name in names]
+
+        self.assertEqual(stored, [])
+        self.purchase.refresh_from_db()
+        self.assertFalse(self.purchase.license_document)
+
+    def test_replay_failed_events(self):
+        """Test that failed events are recorded and re-run by the replay command"""
+        with mock.patch('forge.tasks.process_stripe_event.delay'), self.captureOnCommitCallbacks(execute=True):
+            self._post(self._event('evt_3'))
+        inbox_event = StripeWebhookEvent.objects.get(event_id='evt_3')
+
+        with mock.patch('forge.pdf_generator.generate_license_pdf', side_effect=RuntimeError('pdf down')):
+            self.assertEqual(process_event(inbox_event.pk), WebhookEventStatus.FAILED)
+        inbox_event.refresh_from_db()
+        self.assertEqual(inbox_event.last_error, 'pdf down')
+        self.purchase.refresh_from_db()
+        self.assertNotEqual(self.purchase.status, 'completed')
+
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root), \
+                mock.patch('forge.pdf_generator.generate_license_pdf', return_value=io.BytesIO(b'%PDF')):
+            call_command('replay_stripe_events', '--failed', stdout=out)
+
+        inbox_event.refresh_from_db()
+        self.assertEqual(inbox_event.status, WebhookEventStatus.PROCESSED)
+        self.assertEqual(inbox_event.attempts, 2)
+        self.assertIn('evt_3: PROCESSED', out.getvalue())
+
+
+    def test_replay_never_takes_over_in_flight_events(self):
+        """Test that processing events are only re-claimed when stale (once) or forced"""
+        inbox_event = StripeWebhookEvent.objects.create(
+            event_id='evt_4', event_type='customer.created', payload={},
+            status=WebhookEventStatus.PROCESSING, attempts=1, started_at=now(),
+        )
+
+        out = io.StringIO()
+        call_command('replay_stripe_events', 'evt_4', '--stale-minutes', '30', stdout=out)
+        self.assertIn('evt_4: IN FLIGHT', out.getvalue())
+        inbox_event.refresh_from_db()
+        self.assertEqual((inbox_event.status, inbox_event.attempts), (WebhookEventStatus.PROCESSING, 1))
+
+        StripeWebhookEvent.objects.filter(pk=inbox_event.pk).update(started_at=now() - timedelta(hours=1))
+        cutoff = now() - timedelta(minutes=30)
+        self.assertTrue(claim_event(inbox_event.pk, stale_before=cutoff))
+        # A second replay racing on the same stale event loses the claim
+        self.assertFalse(claim_event(inbox_event.pk, stale_before=cutoff))
+        self.assertFalse(claim_event(inbox_event.pk, statuses=WebhookEventStatus.values))
+
+        call_command('replay_stripe_events', 'evt_4', '--force', stdout=io.StringIO())
+        inbox_event.refresh_from_db()
+        self.assertEqual((inbox_event.status, inbox_event.attempts), (WebhookEventStatus.IGNORED, 3))
+
+
+class LicenseDocumentDownloadTest(TestCase):
+    """Test that license PDFs are rendered once and served from storage"""
+
+    PDF = b'%PDF-1.4 license body'
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'pw')
+        app = ForgeApp.objects.create(
+            slug='licensed-app', name='Licensed App', summary='x',
+            repo_url='https://github.com/buildly-marketplace/licensed-app',
+            repo_owner='buildly-marketplace', repo_name='licensed-app',
+            license_type='MIT', is_published=True,
+        )
+        self.purchase = Purchase.objects.create(user=self.user, forge_app=app, amount_cents=0, status='completed')
+        self.url = reverse('forge:purchase-download-license', args=[self.purchase.pk])
+        self.client.force_login(self.user)
+
+    def _render(self, *args):
+        return io.BytesIO(self.PDF)
+
+    def test_rendered_once_and_served_with_etag(self):
+        """Test that repeat downloads reuse the stored PDF and honour If-None-Match"""
+        with mock.patch('forge.pdf_generator.generate_license_pdf', side_effect=self._render) as render:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(b''.join(first.streaming_content), self.PDF)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_range_request(self):
+        """Test that a byte range returns 206 with the requested slice"""
+        with mock.patch('forge.pdf_generator.generate_license_pdf', side_effect=self._render):
+            partial = self.client.get(self.url, HTTP_RANGE='bytes=0-7')
+            suffix = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+            invalid = self.client.get(self.url, HTTP_RANGE='bytes=500-')
+
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial.content, self.PDF[:8])
+        self.assertEqual(partial['Content-Range'], f'bytes 0-7/{len(self.PDF)}')
+        self.assertEqual(suffix.content, self.PDF[-4:])
+        self.assertEqual(invalid.status_code, 416)
+
+    def test_regenerated_after_template_change(self):
+        """Test that a new template version re-renders the stored PDF"""
+        with mock.patch('forge.pdf_generator.generate_license_pdf', side_effect=self._render) as render:
+            self.client.get(self.url)
+            with mock.patch('forge.pdf_generator.LICENSE_TEMPLATE_VERSION', 2):
+                self.client.get(self.url)
+                self.client.get(self.url)
+
+        self.assertEqual(render.call_count, 2)
+        self.purchase.refresh_from_db()
+        self.assertEqual(self.purchase.license_template_version, 2)
+
+
+class MarketplacePageCacheTest(TestCase):
+    """Test the anonymous page cache and its generation-based invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('forge:marketplace-home')
+        self.app = self._app('cached-app', is_published=True)
+
+    def _app(self, slug, is_published):
+        return ForgeApp.objects.create(
+            slug=slug, name=slug, summary='x',
+            repo_url=f'https://github.com/buildly-marketplace/{slug}',
+            repo_owner='buildly-marketplace', repo_name=slug,
+            license_type='MIT', is_published=is_published,
+        )
+
+    def _get(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_anonymous_hits_are_served_from_cache(self):
+        """Test that repeat anonymous renders run no queries until an app changes"""
+        first, first_queries = self._get()
+        second, second_queries = self._get()
+        self.assertGreater(first_queries, 0)
+        self.assertEqual(second_queries, 0)
+        self.assertEqual(first.content, second.content)
+
+        self._app('another-app', is_published=True)
+        refreshed, refreshed_queries = self._get()
+        self.assertGreater(refreshed_queries, 0)
+        self.assertIn(b'>2+<', refreshed.content)
+
+    def test_stale_page_served_while_revalidating(self):
+        """Test that concurrent requests get the stale page while one re-renders"""
+        first, _ = self._get()
+        bump_marketplace_generation()
+        # Another request holds the re-render lock
+        cache.add(_page_key('marketplace', RequestFactory().get(self.url)) + ':lock', True)
+
+        stale, stale_queries = self._get()
+        self.assertEqual(stale_queries, 0)
+        self.assertEqual(stale.content, first.content)
+
+    def test_logged_in_users_bypass_cache(self):
+        """Test that authenticated renders are never cached"""
+        self.client.force_login(User.objects.create_user('viewer', 'viewer@example.com', 'pw'))
+        self._get()
+        _, queries = self._get()
+        self.assertGreater(queries, 0)
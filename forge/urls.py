@@ -1,5 +1,6 @@
 from django.urls import path, include
 from django.views.generic import TemplateView
+from rest_framework import permissions
 from rest_framework.routers import DefaultRouter
 from .views import (
     ForgeAppViewSet, PurchaseViewSet, EntitlementViewSet,
@@ -35,7 +36,9 @@ urlpatterns = [
     path('admin-api/', include(admin_router.urls)),
     
     # Stripe webhook endpoint (separate from viewset for security)
-    path('webhook/stripe/', PurchaseViewSet.as_view({'post': 'handle_webhook'}), name='stripe-webhook'),
+    path('webhook/stripe/', PurchaseViewSet.as_view(
+        {'post': 'handle_webhook'}, permission_classes=[permissions.AllowAny], authentication_classes=[]
+    ), name='stripe-webhook'),
 ]
 
 """
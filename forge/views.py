@@ -5,23 +5,26 @@ from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
-from django.db import models
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
 from django.utils import timezone
 import stripe
 import logging
 
-from .models import ForgeApp, Purchase, Entitlement, UserProfile
-from .pdf_generator import generate_license_pdf
+from mysite.github_client import RateLimited
+
+from .models import ForgeApp, Purchase, Entitlement, UserProfile, FacetKind
+from .pdf_generator import ensure_license_document
 from .github_release_service import GitHubReleaseService
-from .download_service import LicenseDownloadService
+from .download_service import LicenseDownloadService, DOWNLOAD_CHUNK_SIZE
 from .serializers import (
     ForgeAppListSerializer, ForgeAppDetailSerializer, ForgeAppCreateUpdateSerializer,
     PurchaseSerializer, EntitlementSerializer, CheckoutSessionRequestSerializer,
     CheckoutSessionResponseSerializer, ValidationTriggerSerializer
 )
+from .search import filter_by_facet, search_apps, get_filter_options
+from .page_cache import cache_anonymous_page
 from .services import GitHubRepoValidationService
+from .webhooks import record_event
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,17 @@ logger = logging.getLogger(__name__)
 stripe.api_key = getattr(settings, 'STRIPE_API_KEY', '')
 
 
+def _rate_limited_response(error, what):
+    """503 telling the client when GitHub's rate limit resets"""
+    minutes = max(error.retry_after // 60, 1)
+    response = Response(
+        {'error': f'{what} temporarily rate limited by GitHub. Please try again in about {minutes} minute(s).'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
 class StandardResultsSetPagination(PageNumberPagination):
     """Standard pagination for API responses"""
     page_size = 20
@@ -36,6 +50,30 @@ class StandardResultsSetPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def _parse_byte_range(header, size):
+    """
+    Parse a single-range "bytes=start-end" header into inclusive offsets.
+    Returns None when the range is malformed or not satisfiable.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
 class ForgeAppViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Forge app management
@@ -54,7 +92,7 @@ class ForgeAppViewSet(viewsets.ModelViewSet):
         """Filter queryset based on user permissions"""
         if self.action in ['list', 'retrieve']:
             # Public views - only published apps
-            return ForgeApp.objects.filter(is_published=True).order_by('-created_at')
+            return ForgeApp.objects.filter(is_published=True).with_latest_validation().order_by('-created_at')
         else:
             # Staff views - all apps
             return ForgeApp.objects.all().order_by('-created_at')
@@ -73,7 +111,7 @@ class ForgeAppViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Set permissions based on action"""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'filter_options']:
             # Public actions
             permission_classes = [permissions.AllowAny]
         else:
@@ -85,25 +123,19 @@ class ForgeAppViewSet(viewsets.ModelViewSet):
         """List published apps with filtering and search"""
         queryset = self.get_queryset()
         
-        # Filter by categories
+        # Filter by categories / targets (any of the given values)
         categories = request.query_params.get('categories')
         if categories:
-            category_list = [cat.strip() for cat in categories.split(',')]
-            queryset = queryset.filter(categories__overlap=category_list)
+            queryset = filter_by_facet(queryset, FacetKind.CATEGORY, categories.split(','))
         
-        # Filter by targets
         targets = request.query_params.get('targets')
         if targets:
-            target_list = [target.strip() for target in targets.split(',')]
-            queryset = queryset.filter(targets__overlap=target_list)
+            queryset = filter_by_facet(queryset, FacetKind.TARGET, targets.split(','))
         
-        # Search by name or summary
+        # Full-text search on name and summary
         search = request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                models.Q(name__icontains=search) | 
-                models.Q(summary__icontains=search)
-            )
+            queryset = search_apps(queryset, search)
         
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -157,7 +189,10 @@ class ForgeAppViewSet(viewsets.ModelViewSet):
         
         # Update release info
         github_service = GitHubReleaseService()
-        updated = github_service.update_app_release_info(app, force=force)
+        try:
+            updated = github_service.update_app_release_info(app, force=force)
+        except RateLimited as e:
+            return _rate_limited_response(e, 'Release lookups are')
         
         if updated:
             return Response({
@@ -183,27 +218,11 @@ class ForgeAppViewSet(viewsets.ModelViewSet):
         
         Returns: {
             'categories': ['productivity', 'development', ...],
-            'targets': ['docker', 'k8s', ...]
+            'targets': ['docker', 'k8s', ...],
+            'counts': {'categories': {'productivity': 3, ...}, 'targets': {...}}
         }
         """
-        published_apps = ForgeApp.objects.filter(is_published=True)
-        
-        # Collect all unique categories
-        all_categories = set()
-        for app in published_apps:
-            if app.categories:
-                all_categories.update(app.categories)
-        
-        # Collect all unique targets
-        all_targets = set()
-        for app in published_apps:
-            if app.targets:
-                all_targets.update(app.targets)
-        
-        return Response({
-            'categories': sorted(list(all_categories)),
-            'targets': sorted(list(all_targets))
-        })
+        return Response(get_filter_options())
 
 
 
@@ -431,9 +450,12 @@ class PurchaseViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Create licensed download
         download_service = LicenseDownloadService()
-        zip_content, filename = download_service.create_licensed_download(forge_app, purchase)
+        try:
+            zip_file, filename = download_service.create_licensed_download(forge_app, purchase)
+        except RateLimited as e:
+            return _rate_limited_response(e, 'Downloads are')
         
-        if not zip_content:
+        if not zip_file:
             return Response(
                 {'error': 'Failed to generate download. Please try again later.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -444,10 +466,10 @@ class PurchaseViewSet(viewsets.ReadOnlyModelViewSet):
         purchase.last_downloaded = timezone.now()
         purchase.save(update_fields=['download_count', 'last_downloaded'])
         
-        # Return zip file
-        response = HttpResponse(zip_content, content_type='application/zip')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response['Content-Length'] = len(zip_content)
+        # Stream the licensed zip; FileResponse closes it when done
+        response = FileResponse(zip_file, as_attachment=True, filename=filename, content_type='application/zip')
+        response.block_size = DOWNLOAD_CHUNK_SIZE
+        response['Content-Length'] = zip_file.size()
         
         logger.info(f"User {request.user.username} downloaded {forge_app.name} (purchase {purchase.id})")
         
@@ -479,7 +501,10 @@ class PurchaseViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Update release info
         github_service = GitHubReleaseService()
-        updated = github_service.update_app_release_info(forge_app, force=force)
+        try:
+            updated = github_service.update_app_release_info(forge_app, force=force)
+        except RateLimited as e:
+            return _rate_limited_response(e, 'Release lookups are')
         
         if updated:
             return Response({
@@ -498,9 +523,9 @@ class PurchaseViewSet(viewsets.ReadOnlyModelViewSet):
             })
 
     
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny], authentication_classes=[])
     def handle_webhook(self, request):
-        """Handle Stripe webhook events"""
+        """Receive Stripe webhook events (authenticated by their signature)"""
         payload = request.body
         sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
         endpoint_secret = getattr(settings, 'STRIPE_WEBHOOK_SECRET', '')
@@ -516,111 +541,62 @@ class PurchaseViewSet(viewsets.ReadOnlyModelViewSet):
             logger.error("Invalid signature in Stripe webhook")
             return Response(status=status.HTTP_400_BAD_REQUEST)
         
-        # Handle the event
-        if event['type'] == 'checkout.session.completed':
-            session = event['data']['object']
-            self._handle_successful_payment(session)
-        elif event['type'] == 'payment_intent.payment_failed':
-            payment_intent = event['data']['object']
-            self._handle_failed_payment(payment_intent)
-        
+        # Store and acknowledge; forge.webhooks processes the event asynchronously
+        record_event(event)
         return Response(status=status.HTTP_200_OK)
     
-    def _handle_successful_payment(self, session):
-        """Handle successful payment from Stripe webhook"""
-        try:
-            purchase_id = session['metadata']['purchase_id']
-            purchase = Purchase.objects.get(id=purchase_id)
-            
-            # Update purchase status
-            purchase.status = 'completed'
-            purchase.stripe_payment_intent_id = session['payment_intent']
-            purchase.stripe_session_id = session['id']
-            
-            # Generate license PDF with comprehensive metadata
-            purchase_data = session['metadata']
-            pdf_buffer = generate_license_pdf(purchase_data, str(purchase.id))
-            
-            # Save the PDF to the purchase record
-            filename = f"license_and_support_{purchase.forge_app.slug}_{purchase.id}.pdf"
-            purchase.license_document.save(
-                filename,
-                ContentFile(pdf_buffer.read()),
-                save=False
-            )
-            
-            purchase.save()
-            
-            # Create entitlement
-            Entitlement.objects.get_or_create(
-                user=purchase.user,
-                forge_app=purchase.forge_app,
-                defaults={'purchase': purchase}
-            )
-            
-            logger.info(f"Successfully processed payment and generated license for purchase {purchase_id}")
-            
-        except Purchase.DoesNotExist:
-            logger.error(f"Purchase not found for session {session['id']}")
-        except Exception as e:
-            logger.error(f"Error processing successful payment: {str(e)}")
-    
-    def _handle_failed_payment(self, payment_intent):
-        """Handle failed payment from Stripe webhook"""
-        try:
-            purchase = Purchase.objects.get(stripe_payment_intent_id=payment_intent['id'])
-            purchase.status = 'failed'
-            purchase.save()
-            
-            logger.info(f"Marked purchase {purchase.id} as failed")
-            
-        except Purchase.DoesNotExist:
-            logger.error(f"Purchase not found for payment intent {payment_intent['id']}")
-        except Exception as e:
-            logger.error(f"Error processing failed payment: {str(e)}")
-    
     @action(detail=True, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def download_license(self, request, pk=None):
-        """Download the license document for a completed purchase"""
+        """
+        Download the license document for a completed purchase
+        
+        The PDF is rendered once (on payment, or here if missing or from an
+        older template) and served from storage with an ETag and byte ranges.
+        """
+        purchase = get_object_or_404(
+            Purchase.objects.select_related('forge_app', 'user'), id=pk, user=request.user, status='completed'
+        )
         try:
-            purchase = get_object_or_404(Purchase, id=pk, user=request.user, status='completed')
-            
-            if not purchase.license_document:
-                # If no document exists, generate it now
-                purchase_data = {
-                    'forge_app_name': purchase.forge_app.name,
-                    'forge_app_repo_url': purchase.forge_app.repo_url,
-                    'forge_app_repo_owner': purchase.forge_app.repo_owner,
-                    'forge_app_repo_name': purchase.forge_app.repo_name,
-                    'forge_app_license_type': purchase.forge_app.license_type,
-                    'user_email': purchase.user.email,
-                    'user_name': f"{purchase.user.first_name} {purchase.user.last_name}".strip(),
-                    'original_price_cents': str(purchase.forge_app.price_cents),
-                    'final_price_cents': str(purchase.amount_cents),
-                    'discount_applied': str(purchase.discount_applied),
-                    'is_labs_customer': str(hasattr(purchase.user, 'forge_profile') and purchase.user.forge_profile.is_labs_customer),
-                }
-                
-                pdf_buffer = generate_license_pdf(purchase_data, str(purchase.id))
-                filename = f"license_and_support_{purchase.forge_app.slug}_{purchase.id}.pdf"
-                purchase.license_document.save(
-                    filename,
-                    ContentFile(pdf_buffer.read()),
-                    save=True
-                )
-            
-            # Return the file for download
-            from django.http import HttpResponse
-            response = HttpResponse(purchase.license_document.read(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="Buildly_License_{purchase.forge_app.name}_{purchase.id}.pdf"'
-            return response
-            
+            ensure_license_document(purchase)
         except Exception as e:
-            logger.error(f"Error downloading license: {str(e)}")
+            logger.error(f"Error generating license for purchase {purchase.id}: {str(e)}")
             return Response(
                 {'error': 'Unable to generate license document'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        etag = f'"{purchase.license_sha256}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+        
+        filename = f"Buildly_License_{purchase.forge_app.name}_{purchase.id}.pdf"
+        size = purchase.license_document.size
+        document = purchase.license_document.open('rb')
+        
+        range_header = request.headers.get('Range')
+        if range_header and request.headers.get('If-Range', etag) == etag:
+            byte_range = _parse_byte_range(range_header, size)
+            if byte_range is None:
+                document.close()
+                response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            start, end = byte_range
+            document.seek(start)
+            response = HttpResponse(document.read(end - start + 1), status=status.HTTP_206_PARTIAL_CONTENT,
+                                    content_type='application/pdf')
+            document.close()
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        else:
+            response = FileResponse(document, as_attachment=True, filename=filename, content_type='application/pdf')
+            response['Content-Length'] = size
+        
+        response['ETag'] = etag
+        response['Accept-Ranges'] = 'bytes'
+        return response
 
 
 class EntitlementViewSet(viewsets.ReadOnlyModelViewSet):
@@ -709,9 +685,11 @@ class AdminEntitlementViewSet(viewsets.ReadOnlyModelViewSet):
 # HTML Template Views for Public Marketplace
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import TemplateView
+from django.utils.decorators import method_decorator
 from django.http import JsonResponse
 import json
 
+@method_decorator(cache_anonymous_page('marketplace'), name='dispatch')
 class MarketplaceView(TemplateView):
     """Public marketplace listing page"""
     template_name = 'forge/marketplace.html'
@@ -729,7 +707,7 @@ class AppDetailView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         slug = kwargs.get('slug')
-        app = get_object_or_404(ForgeApp, slug=slug, is_published=True)
+        app = get_object_or_404(ForgeApp.objects.with_latest_validation(), slug=slug, is_published=True)
         context['app'] = app
         return context
 
@@ -0,0 +1,152 @@
+"""
+Stripe webhook inbox
+
+The webhook view verifies the signature, stores the event in
+StripeWebhookEvent (unique on the Stripe event id, so retried deliveries are
+dropped by the database) and acknowledges straight away. Processing happens
+in the process_stripe_event task.
+
+Each event is processed at most once: a worker claims it with a conditional
+UPDATE (received -> processing) and only the worker whose UPDATE matched runs
+the handlers; no row locks are held. Failed or stuck events are re-run
+explicitly with the replay_stripe_events management command.
+"""
+
+import logging
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Entitlement, Purchase, StripeWebhookEvent, WebhookEventStatus
+from .pdf_generator import ensure_license_document
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(event):
+    """
+    Store a verified Stripe event in the inbox and queue its processing.
+
+    Returns:
+        bool: False if the event id was already recorded (a retried delivery)
+    """
+    try:
+        with transaction.atomic():
+            inbox_event = StripeWebhookEvent.objects.create(
+                event_id=event['id'],
+                event_type=event['type'],
+                payload=event['data']['object'],
+            )
+    except IntegrityError:
+        logger.info(f"Ignoring duplicate Stripe event {event['id']}")
+        return False
+
+    transaction.on_commit(lambda: queue_event(inbox_event.pk))
+    return True
+
+
+def queue_event(inbox_event_pk):
+    from .tasks import process_stripe_event
+
+    try:
+        process_stripe_event.delay(inbox_event_pk)
+    except Exception as e:
+        # The event stays 'received' and is picked up by replay_stripe_events
+        logger.error(f"Could not queue Stripe event {inbox_event_pk}: {e}")
+
+
+def claim_event(inbox_event_pk, statuses=(WebhookEventStatus.RECEIVED,), stale_before=None, force=False):
+    """
+    Move an event to 'processing' if it is claimable; True if this caller won.
+
+    Events already in 'processing' are only claimable when they were started
+    before `stale_before` (checked in the UPDATE itself, so two replays cannot
+    both take over the same stale event) or when `force` is set. 'processing'
+    in `statuses` is ignored.
+    """
+    claimable = Q(status__in=[s for s in statuses if s != WebhookEventStatus.PROCESSING])
+    if force:
+        claimable |= Q(status=WebhookEventStatus.PROCESSING)
+    elif stale_before is not None:
+        claimable |= Q(status=WebhookEventStatus.PROCESSING, started_at__lt=stale_before)
+    return StripeWebhookEvent.objects.filter(claimable, pk=inbox_event_pk).update(
+        status=WebhookEventStatus.PROCESSING,
+        attempts=F('attempts') + 1,
+        started_at=timezone.now(),
+    ) == 1
+
+
+def process_event(inbox_event_pk, statuses=(WebhookEventStatus.RECEIVED,), stale_before=None, force=False):
+    """
+    Claim and handle one inbox event (see claim_event for what is claimable).
+
+    Returns:
+        str or None: The event's final status, or None if it was not claimed
+        (already processed, or being processed by another worker)
+    """
+    if not claim_event(inbox_event_pk, statuses, stale_before, force):
+        return None
+
+    inbox_event = StripeWebhookEvent.objects.get(pk=inbox_event_pk)
+    handler = EVENT_HANDLERS.get(inbox_event.event_type)
+    error = ''
+    try:
+        if handler is None:
+            status = WebhookEventStatus.IGNORED
+        else:
+            with transaction.atomic():
+                handled = handler(inbox_event.payload)
+            status = WebhookEventStatus.PROCESSED if handled else WebhookEventStatus.IGNORED
+    except Exception as e:
+        logger.exception(f"Error processing Stripe event {inbox_event.event_id}")
+        status = WebhookEventStatus.FAILED
+        error = str(e)
+
+    StripeWebhookEvent.objects.filter(pk=inbox_event_pk).update(
+        status=status, last_error=error, processed_at=timezone.now()
+    )
+    return status
+
+
+def handle_checkout_completed(session):
+    """Mark the purchase completed, attach its license and grant the entitlement"""
+    purchase_id = (session.get('metadata') or {}).get('purchase_id')
+    purchase = Purchase.objects.select_related('forge_app', 'user').filter(id=purchase_id).first() if purchase_id else None
+    if purchase is None:
+        logger.error(f"Purchase not found for session {session['id']}")
+        return False
+
+    purchase.status = 'completed'
+    purchase.stripe_payment_intent_id = session.get('payment_intent') or ''
+    purchase.stripe_session_id = session['id']
+
+    # Render the license PDF now so downloads are served from storage
+    rendered = ensure_license_document(purchase, session['metadata'], save=False)
+    try:
+        purchase.save()
+        Entitlement.objects.get_or_create(user=purchase.user, forge_app=purchase.forge_app)
+    except Exception:
+        # Storage is not transactional: drop the document the rollback orphans
+        if rendered:
+            purchase.license_document.storage.delete(purchase.license_document.name)
+        raise
+
+    logger.info(f"Successfully processed payment and generated license for purchase {purchase.id}")
+    return True
+
+
+def handle_payment_failed(payment_intent):
+    """Mark the purchase paid with this payment intent as failed"""
+    updated = Purchase.objects.filter(stripe_payment_intent_id=payment_intent['id']).update(status='failed')
+    if not updated:
+        logger.error(f"Purchase not found for payment intent {payment_intent['id']}")
+        return False
+    logger.info(f"Marked purchase for payment intent {payment_intent['id']} as failed")
+    return True
+
+
+EVENT_HANDLERS = {
+    'checkout.session.completed': handle_checkout_completed,
+    'payment_intent.payment_failed': handle_payment_failed,
+}
@@ -0,0 +1,21 @@
+"""
+Celery application for background jobs (newsletter dispatch, scheduled syncs).
+
+Run a worker and the beat scheduler alongside the web process:
+
+    celery -A mysite worker -l info
+    celery -A mysite beat -l info --scheduler django_celery_beat.schedulers:DatabaseScheduler
+
+With CELERY_TASK_ALWAYS_EAGER=True tasks run inline, so no broker is needed
+for local development and tests.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings.production')
+
+app = Celery('mysite')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
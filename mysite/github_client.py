@@ -0,0 +1,275 @@
+"""
+Shared GitHub REST API client
+
+Every GitHub integration (Forge validation and releases, the error reporting
+middleware, developer skill/profile syncing) goes through one pooled
+requests.Session so connections are reused across calls.
+
+GET responses carrying an ETag or Last-Modified header are kept in the Django
+cache; repeat requests are sent as conditional requests, and a
+304 Not Modified (which does not count against the rate limit) is answered
+from the cached body. Rate limit headers are tracked per token. Once a
+token's budget runs low, interactive callers (views, middleware) get a
+RateLimited error straight away; background callers (Celery tasks, beat,
+management commands) pass max_wait and sleep until the reset, up to that cap.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GITHUB_API_URL = 'https://api.github.com'
+
+# (connect, read) timeouts in seconds, first matching path pattern wins
+ENDPOINT_TIMEOUTS = [
+    (re.compile(r'/(zipball|tarball)(/|$)'), (5, 60)),
+    (re.compile(r'^/search/'), (5, 15)),
+    (re.compile(r'/git/trees/'), (5, 20)),
+]
+DEFAULT_TIMEOUT = (5, 10)
+
+# How long conditional-request validators and bodies are kept
+ETAG_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Longest secondary rate limit (Retry-After) we wait out before retrying once
+MAX_RETRY_AFTER = 60
+
+# max_wait for background callers: longest they sleep for a rate limit reset
+BACKGROUND_MAX_WAIT = 15 * 60
+
+
+class RateLimited(requests.RequestException):
+    """The token's GitHub budget is exhausted and the caller cannot wait for the reset"""
+
+    def __init__(self, retry_after, message=None):
+        self.retry_after = max(int(retry_after), 1)
+        super().__init__(message or f"GitHub rate limit exhausted; retry in {self.retry_after}s")
+
+
+class GitHubRateLimiter:
+    """
+    Shared GitHub API budget for one token.
+
+    Tracks X-RateLimit-Remaining / X-RateLimit-Reset from every response.
+    Once the remaining budget drops to `reserve` requests, callers either
+    wait for the reset (if it is within their max_wait) or get RateLimited,
+    instead of running into 403s. The lock only guards the counters; nobody
+    sleeps while holding it.
+    """
+
+    def __init__(self, reserve: int = 10, clock=time.time, sleep=time.sleep):
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def record(self, response: requests.Response):
+        """Update the budget from a response's rate limit headers"""
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        with self._lock:
+            self.remaining = int(remaining)
+            self.reset_at = int(reset)
+
+    def acquire(self, max_wait=0):
+        """
+        Count a request against the budget, waiting up to `max_wait` seconds
+        for the reset if the budget is exhausted.
+
+        Raises:
+            RateLimited: The reset is further away than max_wait
+        """
+        with self._lock:
+            if self.remaining is None:
+                return
+            if self.remaining > self.reserve:
+                self.remaining -= 1
+                return
+            delay = self.reset_at - self._clock()
+            if delay <= 0:
+                self.remaining = None
+                return
+            if delay > max_wait:
+                raise RateLimited(delay)
+
+        logger.warning(f"GitHub rate limit nearly exhausted; waiting {delay:.0f}s for reset")
+        self._sleep(delay + 1)
+        with self._lock:
+            if self.reset_at is not None and self._clock() >= self.reset_at:
+                self.remaining = None
+
+
+class GitHubClient:
+    """Pooled GitHub API client with conditional GETs and central rate limiting"""
+
+    def __init__(self, token=None, base_url=None, session=None):
+        self._token = token
+        self._base_url = base_url
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+        self._limiters = {}
+        self._limiters_lock = threading.Lock()
+
+    @property
+    def token(self):
+        if self._token is not None:
+            return self._token
+        return getattr(settings, 'GITHUB_API_TOKEN', None)
+
+    @property
+    def base_url(self) -> str:
+        return (self._base_url or getattr(settings, 'GITHUB_API_URL', None) or DEFAULT_GITHUB_API_URL).rstrip('/')
+
+    def url_for(self, path_or_url: str) -> str:
+        if path_or_url.startswith(('http://', 'https://')):
+            return path_or_url
+        return f"{self.base_url}/{path_or_url.lstrip('/')}"
+
+    @staticmethod
+    def timeout_for(url: str):
+        path = re.sub(r'^https?://[^/]+', '', url)
+        for pattern, timeout in ENDPOINT_TIMEOUTS:
+            if pattern.search(path):
+                return timeout
+        return DEFAULT_TIMEOUT
+
+    def limiter_for(self, token) -> GitHubRateLimiter:
+        """Rate limits are per token (or per IP when anonymous)"""
+        with self._limiters_lock:
+            return self._limiters.setdefault(token or '', GitHubRateLimiter())
+
+    def headers_for(self, token, extra=None):
+        headers = {
+            'Accept': 'application/vnd.github.v3+json',
+            'User-Agent': 'Buildly-Collab/1.0',
+        }
+        if token:
+            headers['Authorization'] = f'token {token}'
+        headers.update(extra or {})
+        return headers
+
+    @staticmethod
+    def _etag_key(url, params, token):
+        raw = f"{url}|{sorted((params or {}).items())}|{token or ''}"
+        return 'github:etag:' + hashlib.sha256(raw.encode()).hexdigest()
+
+    def request(self, method: str, path_or_url: str, token=None, params=None, json=None,
+                headers=None, timeout=None, stream=False, conditional=True,
+                max_wait=0) -> requests.Response:
+        """
+        Send a request to the GitHub API.
+
+        Args:
+            token: Token for this call; defaults to GITHUB_API_TOKEN. Pass ''
+                for an anonymous request.
+            timeout: Overrides the per-endpoint timeout
+            conditional: Use the ETag cache (GET, non-streaming only)
+            max_wait: Seconds this caller may sleep for a rate limit reset.
+                Interactive callers keep the default 0 and fail fast;
+                background callers pass e.g. BACKGROUND_MAX_WAIT.
+
+        Raises:
+            requests.RequestException on network errors, like requests itself
+            RateLimited (a RequestException) when the budget is exhausted
+        """
+        token = self.token if token is None else token
+        url = self.url_for(path_or_url)
+        request_headers = self.headers_for(token, headers)
+        timeout = timeout or self.timeout_for(url)
+
+        cache_key = None
+        cached = None
+        if conditional and method == 'GET' and not stream:
+            cache_key = self._etag_key(url, params, token)
+            cached = cache.get(cache_key)
+            if cached:
+                if cached.get('etag'):
+                    request_headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    request_headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self._send(method, url, token, max_wait, params=params, json=json,
+                              headers=request_headers, timeout=timeout, stream=stream)
+
+        if cached and response.status_code == 304:
+            return self._cached_response(cached, response)
+
+        if cache_key and response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                cache.set(cache_key, {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'content': response.content,
+                    'headers': {k: v for k, v in response.headers.items() if k.lower().startswith(('content-type', 'link'))},
+                }, ETAG_CACHE_TIMEOUT)
+
+        return response
+
+    def _send(self, method, url, token, max_wait, **kwargs):
+        limiter = self.limiter_for(token)
+        limiter.acquire(max_wait)
+        response = self.session.request(method, url, **kwargs)
+        limiter.record(response)
+
+        # Secondary rate limits ask us to back off briefly; background callers retry once
+        if response.status_code in (403, 429) and response.headers.get('Retry-After'):
+            retry_after = int(response.headers['Retry-After'])
+            response.close()
+            if retry_after > min(max_wait, MAX_RETRY_AFTER):
+                raise RateLimited(retry_after)
+            logger.warning(f"GitHub secondary rate limit on {url}; retrying in {retry_after}s")
+            time.sleep(retry_after)
+            limiter.acquire(max_wait)
+            response = self.session.request(method, url, **kwargs)
+            limiter.record(response)
+        return response
+
+    @staticmethod
+    def _cached_response(cached, not_modified):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = cached['content']
+        response.headers.update(cached['headers'])
+        response.headers.update(not_modified.headers)
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.encoding = not_modified.encoding or 'utf-8'
+        return response
+
+    def get(self, path_or_url, **kwargs) -> requests.Response:
+        return self.request('GET', path_or_url, **kwargs)
+
+    def post(self, path_or_url, **kwargs) -> requests.Response:
+        return self.request('POST', path_or_url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_github_client() -> GitHubClient:
+    """The process-wide GitHub client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
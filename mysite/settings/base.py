@@ -129,6 +129,58 @@ DATABASES = {
 }
 
 
+# Cache
+# LocMemCache is per-process; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (file-based or Redis-compatible) to share entries between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'collabhub'),
+    }
+}
+
+# Seconds a cached unread-notification count may live (signals invalidate it sooner)
+NOTIFICATION_COUNT_CACHE_TIMEOUT = int(os.environ.get('NOTIFICATION_COUNT_CACHE_TIMEOUT', '300'))
+
+# Anonymous homepage/marketplace page cache (forge.page_cache): pages are fresh
+# for MARKETPLACE_PAGE_CACHE_TIMEOUT seconds or until marketplace content
+# changes, then served stale for up to MARKETPLACE_PAGE_CACHE_STALE more
+# seconds while one request re-renders them
+MARKETPLACE_PAGE_CACHE_TIMEOUT = int(os.environ.get('MARKETPLACE_PAGE_CACHE_TIMEOUT', '300'))
+MARKETPLACE_PAGE_CACHE_STALE = int(os.environ.get('MARKETPLACE_PAGE_CACHE_STALE', '3600'))
+
+
+# Celery (background tasks)
+# Set CELERY_TASK_ALWAYS_EAGER=True to run tasks inline without a broker.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', None)
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False').lower() == 'true'
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-pending-newsletters': {
+        'task': 'onboarding.tasks.dispatch_pending_newsletters',
+        'schedule': crontab(minute='*'),
+    },
+    'refresh-forge-releases': {
+        'task': 'forge.tasks.refresh_forge_releases',
+        'schedule': crontab(minute='*/30'),
+    },
+    'verify-forge-logos': {
+        'task': 'forge.tasks.verify_forge_logos',
+        'schedule': crontab(minute=15, hour='*/6'),
+    },
+}
+
+# Newsletter dispatch
+NEWSLETTER_BATCH_SIZE = int(os.environ.get('NEWSLETTER_BATCH_SIZE', '25'))  # recipients claimed per batch
+NEWSLETTER_SEND_RATE = float(os.environ.get('NEWSLETTER_SEND_RATE', '0.5'))  # emails per second, per worker process
+NEWSLETTER_SEND_BURST = int(os.environ.get('NEWSLETTER_SEND_BURST', '5'))  # token bucket capacity
+NEWSLETTER_MAX_RETRIES = int(os.environ.get('NEWSLETTER_MAX_RETRIES', '5'))  # rate-limited attempts before failing
+NEWSLETTER_RETRY_BACKOFF = int(os.environ.get('NEWSLETTER_RETRY_BACKOFF', '60'))  # seconds, doubled per retry
+NEWSLETTER_CLAIM_TIMEOUT = int(os.environ.get('NEWSLETTER_CLAIM_TIMEOUT', '900'))  # seconds before a dead worker's claims are released
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -247,6 +299,9 @@ SOCIAL_AUTH_GITHUB_SECRET = os.environ.get('GITHUB_SECRET')
 # Scopes for GitHub authentication
 SOCIAL_AUTH_GITHUB_SCOPE = ['repo', 'user']
 
+# GitHub REST API base URL (overridable to point Forge validation at a stub server)
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+
 # labs auth
 LABS_TOKEN_URL = os.environ.get('LABS_TOKEN_URL', 'https://labs-api.buildly.dev')
 LABS_CLIENT_ID = os.environ.get('LABS_CLIENT_ID')
@@ -267,6 +322,13 @@ STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY')
 STRIPE_API_KEY = os.environ.get('STRIPE_API_KEY')
 STRIPE_WEBHOOK_SECRET = os.environ.get('STRIPE_WEBHOOK_SECRET')  # Will be set up later
 
+# Forge release zip cache (shared by all purchases of the same release tag)
+FORGE_RELEASE_CACHE_DIR = os.environ.get('FORGE_RELEASE_CACHE_DIR', os.path.join(BASE_DIR, 'release_cache'))
+FORGE_RELEASE_CACHE_MAX_BYTES = int(os.environ.get('FORGE_RELEASE_CACHE_MAX_BYTES', str(2 * 1024 ** 3)))
+
+# Seconds a ForgeApp logo URL reachability result is reused before rechecking
+FORGE_LOGO_CHECK_TTL = int(os.environ.get('FORGE_LOGO_CHECK_TTL', str(6 * 60 * 60)))
+
 # Redirect URL after successful login
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
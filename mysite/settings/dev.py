@@ -18,6 +18,12 @@ ALLOWED_HOSTS = ['*']
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Run Celery tasks inline unless a broker is explicitly configured
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'True').lower() == 'true'
+
+# Console email backend has no provider limits
+NEWSLETTER_SEND_RATE = float(os.environ.get('NEWSLETTER_SEND_RATE', '0'))
+
 MIDDLEWARE = MIDDLEWARE + ['debug_toolbar.middleware.DebugToolbarMiddleware']
 
 INSTALLED_APPS = INSTALLED_APPS + ["debug_toolbar",]
@@ -2,3 +2,6 @@ from .base import *
 
 # Use simple staticfiles storage for tests to avoid manifest errors
 STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+# Run Celery tasks inline; no broker in tests
+CELERY_TASK_ALWAYS_EAGER = True
@@ -22,16 +22,18 @@ from django.core.mail import send_mail
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from .forms import CustomerIntakeForm
+from forge.page_cache import cache_anonymous_page
 
 User = get_user_model()
 
 
+@cache_anonymous_page('homepage')
 def homepage(request):
     """View function for home page of site."""
     # Get some featured Forge apps for the homepage
     try:
         from forge.models import ForgeApp
-        featured_apps = ForgeApp.objects.filter(is_published=True)[:6]
+        featured_apps = ForgeApp.objects.filter(is_published=True).with_latest_validation()[:6]
         apps_count = ForgeApp.objects.filter(is_published=True).count()
     except:
         # Handle case where Forge app is not available
@@ -12,6 +12,7 @@ admin.site.register(CertificationExam, CertificationExamAdmin)
 admin.site.register(Quiz, QuizAdmin)
 admin.site.register(QuizQuestion, QuizQuestionAdmin)
 admin.site.register(QuizAnswer, QuizAnswerAdmin)
+admin.site.register(DeveloperQuizResult, DeveloperQuizResultAdmin)
 
 # Register DevelopmentAgency
 admin.site.register(DevelopmentAgency, DevelopmentAgencyAdmin)
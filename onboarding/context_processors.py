@@ -5,7 +5,7 @@ This makes assessment status available globally in templates so we can
 show persistent reminders/notifications for incomplete assessments.
 """
 
-from onboarding.models import TeamMember
+from onboarding.identity import get_request_identity
 
 
 def user_roles(request):
@@ -31,23 +31,22 @@ def user_roles(request):
     # Staff flag
     ctx["is_staff"] = bool(getattr(user, "is_staff", False))
 
+    identity = get_request_identity(request)
+
     # CompanyAdmin detection
     try:
-        from .models import CompanyAdmin
-        admin_qs = CompanyAdmin.objects.filter(user=user, is_active=True)
-        if admin_qs.exists():
+        company_admin = identity.company_admin
+        if company_admin is not None:
             ctx["is_company_admin"] = True
-            ctx["company_admin_customer"] = admin_qs.first().customer
+            ctx["company_admin_customer"] = company_admin.customer
     except Exception:
         # Avoid breaking templates if DB isn't ready
         pass
 
-    # Notifications presence (lazy check)
+    # Notifications presence (single count query)
     try:
-        from .models import Notification
-        unread_qs = Notification.objects.filter(recipient=user, is_read=False)
-        ctx["has_notifications"] = unread_qs.exists()
-        ctx["notification_count"] = unread_qs.count()
+        ctx["notification_count"] = identity.unread_notification_count
+        ctx["has_notifications"] = ctx["notification_count"] > 0
     except Exception:
         pass
 
@@ -68,13 +67,10 @@ def assessment_status(request):
     }
     
     # Only check for authenticated users
-    if request.user.is_authenticated:
-        try:
-            team_member = TeamMember.objects.get(user=request.user)
-            context['needs_assessment'] = not team_member.has_completed_assessment
-            context['assessment_reminder_count'] = team_member.assessment_reminder_count
-        except TeamMember.DoesNotExist:
-            pass
+    team_member = get_request_identity(request).team_member
+    if team_member is not None:
+        context['needs_assessment'] = not team_member.has_completed_assessment
+        context['assessment_reminder_count'] = team_member.assessment_reminder_count
     
     return context
 
@@ -93,7 +89,8 @@ def newsletter_reminder(request):
     }
     
     # Only check for staff users
-    if request.user.is_authenticated and request.user.is_staff:
+    identity = get_request_identity(request)
+    if identity.is_authenticated and identity.user.is_staff:
         try:
             from onboarding.models import CommunityNewsletter
             context['show_newsletter_reminder'] = CommunityNewsletter.should_show_reminder()
@@ -0,0 +1,212 @@
+"""
+Set-based certification eligibility
+
+Evaluates many developers against many certifications (CertificationLevel and
+CompositeCertification) with a fixed number of grouped queries, instead of the
+per-requirement / per-developer queries of check_developer_eligibility. The
+model methods delegate here, so single checks and batch runs always agree on
+the outcome and on the reason given.
+"""
+
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.db.models import Count, prefetch_related_objects
+
+from .models import (
+    CertificationLevel,
+    CertificationTrack,
+    CompositeCertification,
+    DeveloperCertificationProgress,
+    DeveloperQuizResult,
+    DeveloperTrainingEnrollment,
+    QuizQuestion,
+    SectionProgress,
+)
+
+
+class Eligibility(NamedTuple):
+    eligible: bool
+    reason: str
+    # Tracks that count towards a composite certification (empty for levels)
+    qualifying_tracks: tuple = ()
+
+
+def _developer_ids(developers):
+    return [getattr(developer, 'pk', developer) for developer in developers]
+
+
+def evaluate_level_eligibility(developers, levels):
+    """
+    Evaluate developers against CertificationLevel requirements.
+
+    Args:
+        developers: TeamMember instances or ids
+        levels: CertificationLevel instances
+
+    Returns:
+        dict: {(developer_id, level_id): Eligibility}
+    """
+    developer_ids = _developer_ids(developers)
+    levels = list(levels)
+    if not developer_ids or not levels:
+        return {}
+
+    prefetch_related_objects(levels, 'required_trainings', 'required_sections', 'required_quizzes')
+    training_ids = {t.id for level in levels for t in level.required_trainings.all()}
+    section_ids = {s.id for level in levels for s in level.required_sections.all()}
+    quiz_ids = {q.id for level in levels for q in level.required_quizzes.all()}
+
+    completed_trainings = set()
+    if training_ids:
+        completed_trainings = set(
+            DeveloperTrainingEnrollment.objects
+            .filter(developer_id__in=developer_ids, training_id__in=training_ids, status='completed')
+            .values_list('developer_id', 'training_id')
+        )
+
+    completed_sections = set()
+    if section_ids:
+        completed_sections = set(
+            SectionProgress.objects
+            .filter(enrollment__developer_id__in=developer_ids, section_id__in=section_ids, status='completed')
+            .values_list('enrollment__developer_id', 'section_id')
+        )
+
+    question_counts = {}
+    passed_quizzes = set()
+    if quiz_ids:
+        question_counts = dict(
+            QuizQuestion.objects
+            .filter(quiz_id__in=quiz_ids)
+            .order_by()
+            .values('quiz_id')
+            .annotate(total=Count('id'))
+            .values_list('quiz_id', 'total')
+        )
+        passed_quizzes = set(
+            DeveloperQuizResult.objects
+            .filter(developer_id__in=developer_ids, quiz_id__in=quiz_ids, passed=True)
+            .values_list('developer_id', 'quiz_id')
+        )
+
+    matrix = {}
+    for level in levels:
+        for developer_id in developer_ids:
+            matrix[(developer_id, level.id)] = _level_result(
+                level, developer_id, completed_trainings, completed_sections,
+                question_counts, passed_quizzes,
+            )
+    return matrix
+
+
+def _level_result(level, developer_id, completed_trainings, completed_sections,
+                  question_counts, passed_quizzes):
+    for training in level.required_trainings.all():
+        if (developer_id, training.id) not in completed_trainings:
+            return Eligibility(False, f"Training '{training.name}' not completed")
+
+    for section in level.required_sections.all():
+        if (developer_id, section.id) not in completed_sections:
+            return Eligibility(False, f"Section '{section.name}' not completed")
+
+    for quiz in level.required_quizzes.all():
+        # Quizzes without questions cannot be failed
+        if not question_counts.get(quiz.id):
+            continue
+        if (developer_id, quiz.id) not in passed_quizzes:
+            return Eligibility(False, f"Quiz '{quiz.name}' not passed")
+
+    return Eligibility(True, "All requirements met")
+
+
+def evaluate_composite_eligibility(developers, composites):
+    """
+    Evaluate developers against CompositeCertification requirements.
+
+    A track counts once the developer has completed a community level in it
+    at or above the composite's min_level.
+
+    Args:
+        developers: TeamMember instances or ids
+        composites: CompositeCertification instances
+
+    Returns:
+        dict: {(developer_id, composite_id): Eligibility}
+    """
+    developer_ids = _developer_ids(developers)
+    composites = list(composites)
+    if not developer_ids or not composites:
+        return {}
+
+    prefetch_related_objects(composites, 'required_tracks')
+
+    # Highest completed level per (developer, track)
+    highest_levels = defaultdict(dict)
+    completed = (
+        DeveloperCertificationProgress.objects
+        .filter(developer_id__in=developer_ids, status='completed',
+                certification_level__level__gte=min(c.min_level for c in composites))
+        .values_list('developer_id', 'certification_level__track_id', 'certification_level__level')
+    )
+    for developer_id, track_id, level in completed:
+        tracks = highest_levels[developer_id]
+        tracks[track_id] = max(level, tracks.get(track_id, 0))
+
+    track_ids = {track_id for tracks in highest_levels.values() for track_id in tracks}
+    tracks_by_id = CertificationTrack.objects.in_bulk(track_ids) if track_ids else {}
+    track_order = sorted(tracks_by_id.values(), key=lambda t: (t.order, t.name))
+
+    matrix = {}
+    for composite in composites:
+        required_tracks = list(composite.required_tracks.all())
+        for developer_id in developer_ids:
+            levels = highest_levels.get(developer_id, {})
+            qualifying = tuple(t for t in track_order if levels.get(t.id, 0) >= composite.min_level)
+            matrix[(developer_id, composite.id)] = _composite_result(composite, required_tracks, qualifying)
+    return matrix
+
+
+def _composite_result(composite, required_tracks, qualifying):
+    qualifying_ids = {track.id for track in qualifying}
+    missing_required = [track for track in required_tracks if track.id not in qualifying_ids]
+    if missing_required:
+        track_names = ', '.join(track.name for track in missing_required)
+        return Eligibility(False, f"Missing required track(s): {track_names}", qualifying)
+
+    if len(qualifying) < composite.min_total_tracks:
+        return Eligibility(
+            False,
+            f"Need Level {composite.min_level}+ in {composite.min_total_tracks} tracks, have {len(qualifying)}",
+            qualifying,
+        )
+
+    return Eligibility(True, "All requirements met!", qualifying)
+
+
+def evaluate_certification_eligibility(developers, certifications):
+    """
+    Build the eligibility matrix for developers x certifications.
+
+    Args:
+        developers: TeamMember instances or ids
+        certifications: CertificationLevel and/or CompositeCertification instances
+
+    Returns:
+        dict: {(developer_id, certification): Eligibility}
+    """
+    developers = list(developers)
+    certifications = list(certifications)
+    levels = [c for c in certifications if isinstance(c, CertificationLevel)]
+    composites = [c for c in certifications if isinstance(c, CompositeCertification)]
+
+    level_matrix = evaluate_level_eligibility(developers, levels)
+    composite_matrix = evaluate_composite_eligibility(developers, composites)
+
+    matrix = {}
+    for developer_id in _developer_ids(developers):
+        for level in levels:
+            matrix[(developer_id, level)] = level_matrix[(developer_id, level.id)]
+        for composite in composites:
+            matrix[(developer_id, composite)] = composite_matrix[(developer_id, composite.id)]
+    return matrix
@@ -0,0 +1,72 @@
+"""
+Bulk training enrolment
+
+Enrols any number of developers into a TeamTraining with a fixed number of
+queries: existing enrolments are diffed in one query, the missing ones are
+inserted with a single bulk_create, and their SectionProgress rows for the
+training's active sections are created in the same transaction. The training
+row is locked for the diff, so concurrent enrolments into the same training
+are serialised and each call counts only the enrolments it created; both
+inserts still ignore conflicts on the (developer, training) and
+(enrollment, section) unique constraints.
+"""
+
+from django.db import transaction
+
+from .models import DeveloperTrainingEnrollment, SectionProgress, TeamTraining
+
+
+def enroll_developers(training, developers, assigned_by=None):
+    """
+    Enrol developers into a training, skipping those already enrolled.
+
+    Args:
+        training: TeamTraining to enrol into
+        developers: TeamMember instances or ids
+        assigned_by: User recorded on the new enrolments
+
+    Returns:
+        int: Number of developers newly enrolled
+    """
+    developer_ids = {getattr(developer, 'pk', developer) for developer in developers}
+    if not developer_ids:
+        return 0
+
+    with transaction.atomic():
+        # Held until commit: a concurrent call diffs only after our rows exist
+        TeamTraining.objects.select_for_update().only('pk').get(pk=training.pk)
+        enrolled = set(
+            DeveloperTrainingEnrollment.objects
+            .filter(training=training, developer_id__in=developer_ids)
+            .values_list('developer_id', flat=True)
+        )
+        missing = developer_ids - enrolled
+        if not missing:
+            return 0
+
+        DeveloperTrainingEnrollment.objects.bulk_create(
+            [
+                DeveloperTrainingEnrollment(developer_id=developer_id, training=training, assigned_by=assigned_by)
+                for developer_id in sorted(missing)
+            ],
+            ignore_conflicts=True,
+        )
+
+        section_ids = list(training.sections.filter(is_active=True).values_list('id', flat=True))
+        if section_ids:
+            # bulk_create with ignore_conflicts does not return primary keys
+            enrollment_ids = (
+                DeveloperTrainingEnrollment.objects
+                .filter(training=training, developer_id__in=missing)
+                .values_list('id', flat=True)
+            )
+            SectionProgress.objects.bulk_create(
+                [
+                    SectionProgress(enrollment_id=enrollment_id, section_id=section_id)
+                    for enrollment_id in enrollment_ids
+                    for section_id in section_ids
+                ],
+                ignore_conflicts=True,
+            )
+
+    return len(missing)
@@ -6,7 +6,6 @@ import sys
 import logging
 from django.shortcuts import render
 from django.conf import settings
-import requests
 from datetime import datetime
 
 # Set up logging
@@ -79,23 +78,20 @@ class ErrorHandlerMiddleware:
         - GITHUB_ERROR_REPO: Repository in format "owner/repo"
         - GITHUB_ERROR_TOKEN: GitHub personal access token with repo access
         """
+        from mysite.github_client import get_github_client
+        
         repo = settings.GITHUB_ERROR_REPO
         token = settings.GITHUB_ERROR_TOKEN
-        
-        headers = {
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json',
-        }
+        client = get_github_client()
         
         # Build issue title (used for searching)
         title = f"🐛 {error_context['error_type']}: {error_context['error_message'][:80]}"
         
         # Search for existing open issues with same error
         search_query = f"is:issue is:open repo:{repo} {error_context['error_type']} in:title"
-        search_url = f"https://api.github.com/search/issues"
         search_params = {'q': search_query}
         
-        search_response = requests.get(search_url, headers=headers, params=search_params)
+        search_response = client.get('/search/issues', token=token, params=search_params)
         
         existing_issue = None
         if search_response.status_code == 200:
@@ -129,7 +125,7 @@ class ErrorHandlerMiddleware:
 </details>
 """
             comment_url = existing_issue['comments_url']
-            comment_response = requests.post(comment_url, json={'body': comment_body}, headers=headers)
+            comment_response = client.post(comment_url, token=token, json={'body': comment_body})
             
             if comment_response.status_code == 201:
                 print(f"✓ Added comment to existing GitHub issue: {existing_issue['html_url']}")
@@ -154,14 +150,14 @@ class ErrorHandlerMiddleware:
 *This issue was automatically created by the error handler middleware.*
 """
             
-            create_url = f"https://api.github.com/repos/{repo}/issues"
+            create_url = f"/repos/{repo}/issues"
             data = {
                 'title': title,
                 'body': body,
                 'labels': ['bug', 'auto-generated', 'production-error'],
             }
             
-            response = requests.post(create_url, json=data, headers=headers)
+            response = client.post(create_url, token=token, json=data)
             
             if response.status_code == 201:
                 issue_url = response.json().get('html_url')
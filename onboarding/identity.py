@@ -0,0 +1,61 @@
+"""
+Request-scoped identity for the current user.
+
+The assessment middleware, the context processors and several views all need
+the user's TeamMember, active CompanyAdmin record and unread notification
+count. RequestIdentity loads each of these lazily, at most once per request,
+and is attached to the request as ``request.identity``.
+"""
+
+from django.utils.functional import cached_property
+
+
+class RequestIdentity:
+    """Lazily resolved profile records for one user during one request"""
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @cached_property
+    def team_member(self):
+        """The user's TeamMember, or None"""
+        if not self.is_authenticated:
+            return None
+        from onboarding.models import TeamMember
+        try:
+            return TeamMember.objects.get(user=self.user)
+        except TeamMember.DoesNotExist:
+            return None
+
+    @cached_property
+    def company_admin(self):
+        """The user's first active CompanyAdmin record (with customer), or None"""
+        if not self.is_authenticated:
+            return None
+        from onboarding.models import CompanyAdmin
+        return CompanyAdmin.objects.filter(
+            user=self.user, is_active=True
+        ).select_related('customer').first()
+
+    @cached_property
+    def unread_notification_count(self):
+        """Number of unread notifications for the user"""
+        if not self.is_authenticated:
+            return 0
+        from onboarding.models import Notification
+        return Notification.get_unread_count(self.user)
+
+
+def get_request_identity(request):
+    """Return the RequestIdentity for this request, creating it on first use"""
+    user = getattr(request, 'user', None)
+    identity = getattr(request, 'identity', None)
+    # Rebuild if the user changed mid-request (e.g. login() during registration)
+    if identity is None or identity.user is not user:
+        identity = RequestIdentity(user)
+        request.identity = identity
+    return identity
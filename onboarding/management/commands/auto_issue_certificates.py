@@ -0,0 +1,129 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from onboarding.eligibility import evaluate_certification_eligibility
+from onboarding.models import (
+    CertificationLevel,
+    CompositeCertification,
+    DeveloperCertification,
+    DeveloperCompositeCertification,
+    TeamMember,
+)
+
+logger = logging.getLogger(__name__)
+
+AUTO_ISSUE_NOTE = 'Issued automatically: all certification requirements met'
+
+
+class Command(BaseCommand):
+    help = 'Issue certificates to every approved developer who meets the requirements but does not hold them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the certificates that would be issued'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Developers evaluated per batch (default: 500)'
+        )
+        parser.add_argument(
+            '--skip-documents',
+            action='store_true',
+            help='Do not generate PDF/PNG documents for issued certificates'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        # Certifications without requirements would be issued to everyone
+        levels = [
+            level for level in CertificationLevel.objects.filter(is_active=True)
+            .prefetch_related('required_trainings', 'required_sections', 'required_quizzes')
+            if level.total_required_items()
+        ]
+        composites = [
+            composite for composite in CompositeCertification.objects.filter(is_active=True)
+            .prefetch_related('required_tracks')
+            if composite.min_total_tracks or composite.required_tracks.all()
+        ]
+        certifications = levels + composites
+        if not certifications:
+            self.stdout.write(self.style.WARNING('No active certifications with requirements'))
+            return
+
+        developer_ids = list(TeamMember.objects.filter(approved=True).order_by('id').values_list('id', flat=True))
+        self.stdout.write(
+            f'Evaluating {len(developer_ids)} developers against {len(certifications)} certifications...'
+        )
+
+        issued = 0
+        for start in range(0, len(developer_ids), batch_size):
+            batch = developer_ids[start:start + batch_size]
+            matrix = evaluate_certification_eligibility(batch, certifications)
+
+            held = set(
+                DeveloperCertification.objects
+                .filter(developer_id__in=batch, certification_level__in=levels)
+                .values_list('developer_id', 'certification_level_id')
+            )
+            held_composite = set(
+                DeveloperCompositeCertification.objects
+                .filter(developer_id__in=batch, certification__in=composites)
+                .values_list('developer_id', 'certification_id')
+            )
+            developers = TeamMember.objects.in_bulk(batch)
+
+            for (developer_id, certification), result in matrix.items():
+                if not result.eligible:
+                    continue
+                if isinstance(certification, CertificationLevel):
+                    if (developer_id, certification.id) in held:
+                        continue
+                elif (developer_id, certification.id) in held_composite:
+                    continue
+
+                developer = developers[developer_id]
+                self.stdout.write(f'  {developer.first_name} {developer.last_name}: {certification.name}')
+                issued += 1
+                if dry_run:
+                    continue
+                if isinstance(certification, CertificationLevel):
+                    self._issue_level(developer, certification, options['skip_documents'])
+                else:
+                    self._issue_composite(developer, certification, result.qualifying_tracks)
+
+        verb = 'Would issue' if dry_run else 'Issued'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {issued} certificates'))
+
+    def _issue_level(self, developer, level, skip_documents):
+        with transaction.atomic():
+            cert = DeveloperCertification.objects.create(
+                developer=developer,
+                certification_level=level,
+                notes=AUTO_ISSUE_NOTE,
+            )
+            cert.certificate_hash = cert.generate_hash()
+            cert.save(update_fields=['certificate_hash'])
+
+        if skip_documents:
+            return
+        from onboarding.document_generator import save_certificate_documents
+        try:
+            save_certificate_documents(cert)
+        except Exception as e:
+            logger.error(f"Failed to generate certificate documents for {cert.certificate_number}: {e}")
+
+    def _issue_composite(self, developer, composite, qualifying_tracks):
+        with transaction.atomic():
+            award = DeveloperCompositeCertification.objects.create(
+                developer=developer,
+                certification=composite,
+                notes=AUTO_ISSUE_NOTE,
+            )
+            award.qualifying_tracks.set(qualifying_tracks)
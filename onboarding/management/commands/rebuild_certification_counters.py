@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F, Q
+from onboarding.models import DeveloperCertificationProgress
+
+
+class Command(BaseCommand):
+    help = 'Check and rebuild the denormalised counters on DeveloperCertificationProgress'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report rows whose counters are wrong (exits non-zero if any)'
+        )
+
+    def handle(self, *args, **options):
+        expressions = DeveloperCertificationProgress.counter_expressions()
+        fields = DeveloperCertificationProgress.COUNTER_FIELDS
+
+        mismatch = Q()
+        for field in fields:
+            mismatch |= ~Q(**{field: F(f'expected_{field}')})
+
+        stale = (
+            DeveloperCertificationProgress.objects
+            .annotate(**{f'expected_{field}': expressions[field] for field in fields})
+            .filter(mismatch)
+            .select_related('developer', 'certification_level__track')
+        )
+
+        stale_count = 0
+        for progress in stale:
+            stale_count += 1
+            diffs = ', '.join(
+                f'{field} {getattr(progress, field)} -> {getattr(progress, f"expected_{field}")}'
+                for field in fields
+                if getattr(progress, field) != getattr(progress, f'expected_{field}')
+            )
+            self.stdout.write(f'  {progress}: {diffs}')
+
+        if options['check']:
+            if stale_count:
+                raise CommandError(f'{stale_count} progress rows have stale counters')
+            self.stdout.write(self.style.SUCCESS('All certification progress counters are current'))
+            return
+
+        updated = DeveloperCertificationProgress.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt counters on {updated} progress rows ({stale_count} were stale)'
+        ))
@@ -8,7 +8,7 @@ skill assessment and redirects them to the assessment landing page if not.
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.utils.deprecation import MiddlewareMixin
-from onboarding.models import TeamMember
+from onboarding.identity import get_request_identity
 
 
 class AssessmentRequiredMiddleware(MiddlewareMixin):
@@ -50,16 +50,11 @@ class AssessmentRequiredMiddleware(MiddlewareMixin):
                 return None
         
         # Check if user has completed assessment
-        try:
-            team_member = TeamMember.objects.get(user=request.user)
-            
-            if not team_member.has_completed_assessment:
-                # Redirect to assessment landing page
-                assessment_url = reverse('onboarding:assessment_landing')
-                if path != assessment_url:
-                    return redirect(assessment_url)
-        except TeamMember.DoesNotExist:
-            # User doesn't have a team member profile yet
-            pass
+        team_member = get_request_identity(request).team_member
+        if team_member is not None and not team_member.has_completed_assessment:
+            # Redirect to assessment landing page
+            assessment_url = reverse('onboarding:assessment_landing')
+            if path != assessment_url:
+                return redirect(assessment_url)
         
         return None
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0038_add_github_top_repos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterrecipient',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, help_text='Earliest time a rate-limited send may be retried', null=True),
+        ),
+    ]
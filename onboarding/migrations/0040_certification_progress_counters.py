@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Progress = apps.get_model('onboarding', 'DeveloperCertificationProgress')
+    Submission = apps.get_model('onboarding', 'CertificationProjectSubmission')
+
+    def count_of(queryset, group_by):
+        return Coalesce(Subquery(
+            queryset.order_by().values(group_by).annotate(total=Count('pk')).values('total')[:1],
+            output_field=models.IntegerField()
+        ), 0)
+
+    Progress.objects.update(
+        resources_completed_count=count_of(
+            Progress.resources_completed.through.objects.filter(developercertificationprogress=OuterRef('pk')),
+            'developercertificationprogress'
+        ),
+        quizzes_passed_count=count_of(
+            Progress.quizzes_passed.through.objects.filter(developercertificationprogress=OuterRef('pk')),
+            'developercertificationprogress'
+        ),
+        approved_projects_count=count_of(
+            Submission.objects.filter(
+                developer=OuterRef('developer'),
+                project__certification_level=OuterRef('certification_level'),
+                status='approved'
+            ),
+            'developer'
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0039_newsletterrecipient_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='developercertificationprogress',
+            name='approved_projects_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='developercertificationprogress',
+            name='quizzes_passed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='developercertificationprogress',
+            name='resources_completed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
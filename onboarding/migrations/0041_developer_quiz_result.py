@@ -0,0 +1,67 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:14
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+import django.db.models.deletion
+
+
+def backfill_quiz_results(apps, schema_editor):
+    QuizAnswer = apps.get_model('onboarding', 'QuizAnswer')
+    QuizQuestion = apps.get_model('onboarding', 'QuizQuestion')
+    DeveloperQuizResult = apps.get_model('onboarding', 'DeveloperQuizResult')
+
+    question_counts = dict(
+        QuizQuestion.objects.order_by().values('quiz_id').annotate(total=Count('id')).values_list('quiz_id', 'total')
+    )
+    summaries = (
+        QuizAnswer.objects.order_by()
+        .values('team_member_id', 'question__quiz_id')
+        .annotate(
+            best=Max('evaluator_score'),
+            passed_count=Count('id', filter=Q(evaluator_score__gte=3)),
+            last_evaluated=Max('evaluated_at'),
+        )
+    )
+    DeveloperQuizResult.objects.bulk_create([
+        DeveloperQuizResult(
+            developer_id=row['team_member_id'],
+            quiz_id=row['question__quiz_id'],
+            best_score=row['best'],
+            questions_passed=row['passed_count'],
+            passed=question_counts.get(row['question__quiz_id'], 0) > 0
+                   and row['passed_count'] >= question_counts[row['question__quiz_id']],
+            last_evaluated_at=row['last_evaluated'],
+        )
+        for row in summaries.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0040_certification_progress_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeveloperQuizResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_score', models.IntegerField(blank=True, help_text="Highest evaluator score across the quiz's answers", null=True)),
+                ('questions_passed', models.PositiveIntegerField(default=0)),
+                ('passed', models.BooleanField(default=False)),
+                ('last_evaluated_at', models.DateTimeField(blank=True, null=True)),
+                ('developer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_results', to='onboarding.teammember')),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='developer_results', to='onboarding.quiz')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='developerquizresult',
+            index=models.Index(fields=['quiz', 'passed'], name='onboarding_quizresult_passed'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='developerquizresult',
+            unique_together={('developer', 'quiz')},
+        ),
+        migrations.RunPython(backfill_quiz_results, migrations.RunPython.noop),
+    ]
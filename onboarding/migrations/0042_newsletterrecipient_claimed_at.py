@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0041_developer_quiz_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletterrecipient',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a dispatch worker claimed this recipient for sending', null=True),
+        ),
+        migrations.AlterField(
+            model_name='newsletterrecipient',
+            name='status',
+            field=models.CharField(choices=[('sent', 'Sent'), ('failed', 'Failed'), ('pending', 'Pending'), ('sending', 'Sending')], default='pending', max_length=20),
+        ),
+    ]
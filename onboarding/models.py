@@ -1,6 +1,8 @@
 # onboarding/models.py
 
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.contrib import admin
 from django.utils import timezone
@@ -283,6 +285,22 @@ class TeamMemberResource(models.Model):
     def __str__(self):
         return f'{self.team_member} - {self.resource} - {self.percentage_complete}%'
 
+    @classmethod
+    def annotate_progress(cls, resources, team_member):
+        """
+        Annotate a Resource queryset with the member's progress_percentage.
+        Uses the most recent TeamMemberResource row per resource (duplicates exist
+        in older data) and defaults to 0, all inside the resource query itself.
+        """
+        latest_progress = cls.objects.filter(
+            team_member=team_member,
+            resource=OuterRef('pk')
+        ).order_by('-id').values('percentage_complete')[:1]
+
+        return resources.annotate(
+            progress_percentage=Coalesce(Subquery(latest_progress), Value(0))
+        )
+
 class TeamMemberResourceAdmin(admin.ModelAdmin):
     list_display = ('team_member', 'resource', 'percentage_complete')
     display = 'Team Member Resource Admin'
@@ -355,6 +373,98 @@ class QuizAnswerAdmin(admin.ModelAdmin):
     answer_preview.short_description = 'Answer Preview'
 
 
+# Evaluator score (out of 4) from which a quiz answer counts as passed
+PASSING_EVALUATOR_SCORE = 3
+
+
+class DeveloperQuizResult(models.Model):
+    """
+    Summary of a developer's evaluated answers to one quiz.
+    Kept current by onboarding.signals whenever answers or questions change.
+    For certifications a quiz is passed once every question has a passing
+    evaluator score (passed); training sections only need one passing answer
+    (questions_passed >= 1).
+    """
+    developer = models.ForeignKey("onboarding.TeamMember", on_delete=models.CASCADE, related_name='quiz_results')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='developer_results')
+    best_score = models.IntegerField(null=True, blank=True, help_text="Highest evaluator score across the quiz's answers")
+    questions_passed = models.PositiveIntegerField(default=0)
+    passed = models.BooleanField(default=False)
+    last_evaluated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ['developer', 'quiz']
+        indexes = [
+            models.Index(fields=['quiz', 'passed'], name='onboarding_quizresult_passed'),
+        ]
+
+    def __str__(self):
+        return f"{self.developer} - {self.quiz} ({'passed' if self.passed else 'not passed'})"
+
+    @classmethod
+    def refresh(cls, quiz_ids, developer_ids=None, create=True):
+        """
+        Recompute the results for the given quizzes, optionally limited to
+        some developers, from their QuizAnswer rows.
+
+        With create=False only existing rows are updated or removed; used on
+        deletes, where the quiz itself may be going away in the same cascade.
+        """
+        from django.db.models import Max, Q
+
+        quiz_ids = set(quiz_ids)
+        if not quiz_ids:
+            return
+        answers = QuizAnswer.objects.filter(question__quiz_id__in=quiz_ids)
+        results = cls.objects.filter(quiz_id__in=quiz_ids)
+        if developer_ids is not None:
+            answers = answers.filter(team_member_id__in=developer_ids)
+            results = results.filter(developer_id__in=developer_ids)
+
+        question_counts = dict(
+            QuizQuestion.objects.filter(quiz_id__in=quiz_ids)
+            .order_by().values('quiz_id').annotate(total=Count('id')).values_list('quiz_id', 'total')
+        )
+        summaries = (
+            answers.order_by()
+            .values('team_member_id', 'question__quiz_id')
+            .annotate(
+                best=Max('evaluator_score'),
+                passed_count=Count('id', filter=Q(evaluator_score__gte=PASSING_EVALUATOR_SCORE)),
+                last_evaluated=Max('evaluated_at'),
+            )
+        )
+
+        existing = {(r.developer_id, r.quiz_id): r for r in results}
+        for summary in summaries:
+            key = (summary['team_member_id'], summary['question__quiz_id'])
+            total = question_counts.get(key[1], 0)
+            values = {
+                'best_score': summary['best'],
+                'questions_passed': summary['passed_count'],
+                'passed': total > 0 and summary['passed_count'] >= total,
+                'last_evaluated_at': summary['last_evaluated'],
+            }
+            result = existing.pop(key, None)
+            if result is None:
+                if create:
+                    cls.objects.create(developer_id=key[0], quiz_id=key[1], **values)
+            elif any(getattr(result, field) != value for field, value in values.items()):
+                cls.objects.filter(pk=result.pk).update(**values)
+
+        # Developers whose answers are all gone
+        if existing:
+            cls.objects.filter(pk__in=[r.pk for r in existing.values()]).delete()
+
+
+class DeveloperQuizResultAdmin(admin.ModelAdmin):
+    list_display = ('developer', 'quiz', 'best_score', 'questions_passed', 'passed', 'last_evaluated_at')
+    list_filter = ('passed', 'quiz')
+    search_fields = ('developer__first_name', 'developer__last_name', 'quiz__name')
+    list_select_related = ('developer', 'quiz')
+    readonly_fields = ('best_score', 'questions_passed', 'passed', 'last_evaluated_at')
+
+
 # Developer Teams (groups within a customer)
 class DeveloperTeam(models.Model):
     """A team/group of developers within a customer organization."""
@@ -417,16 +527,9 @@ class TeamTraining(models.Model):
         if not self.developer_team:
             return 0
         
-        enrolled_count = 0
-        for member in self.developer_team.members.all():
-            enrollment, created = DeveloperTrainingEnrollment.objects.get_or_create(
-                developer=member,
-                training=self,
-                defaults={'assigned_by': assigned_by}
-            )
-            if created:
-                enrolled_count += 1
-        return enrolled_count
+        from .enrollment import enroll_developers
+        member_ids = self.developer_team.members.values_list('id', flat=True)
+        return enroll_developers(self, member_ids, assigned_by=assigned_by)
 
     class Meta:
         ordering = ['-created_at']
@@ -828,6 +931,33 @@ class SectionResourceAdmin(admin.ModelAdmin):
     )
 
 
+class SectionProgressQuerySet(models.QuerySet):
+    def with_progress(self):
+        """
+        Annotate resource counts and the quiz pass flag so progress_percent
+        and quizzes_passed need no queries per row
+        """
+        from django.db.models import Exists, IntegerField
+
+        completed = ResourceProgress.objects.filter(
+            section_progress=OuterRef('pk'), is_completed=True
+        ).order_by().values('section_progress').annotate(n=Count('id')).values('n')
+        total = SectionResource.objects.filter(
+            section=OuterRef('section'), is_active=True, is_required=True
+        ).order_by().values('section').annotate(n=Count('id')).values('n')
+        passed_quizzes = DeveloperQuizResult.objects.filter(
+            developer=OuterRef(OuterRef('enrollment__developer')), questions_passed__gte=1
+        ).values('quiz')
+        unpassed_quizzes = TrainingSection.quizzes.through.objects.filter(
+            trainingsection=OuterRef('section')
+        ).exclude(quiz__in=passed_quizzes)
+        return self.annotate(
+            _resources_completed=Coalesce(Subquery(completed, output_field=IntegerField()), 0),
+            _resources_total=Coalesce(Subquery(total, output_field=IntegerField()), 0),
+            _has_unpassed_quiz=Exists(unpassed_quizzes),
+        )
+
+
 class SectionProgress(models.Model):
     """
     Tracks a developer's progress through a training section.
@@ -844,6 +974,8 @@ class SectionProgress(models.Model):
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    objects = SectionProgressQuerySet.as_manager()
+    
     class Meta:
         unique_together = ('enrollment', 'section')
         ordering = ['section__order']
@@ -853,10 +985,14 @@ class SectionProgress(models.Model):
     
     def resources_completed(self):
         """Count resources completed in this section"""
+        if hasattr(self, '_resources_completed'):
+            return self._resources_completed
         return self.resource_progress.filter(is_completed=True).count()
     
     def resources_total(self):
         """Total resources in this section"""
+        if hasattr(self, '_resources_total'):
+            return self._resources_total
         return self.section.section_resources.filter(is_active=True, is_required=True).count()
     
     def progress_percent(self):
@@ -867,18 +1003,16 @@ class SectionProgress(models.Model):
         return int((self.resources_completed() / total) * 100)
     
     def quizzes_passed(self):
-        """Check if all section quizzes have been passed"""
-        from django.db.models import Q
-        required_quizzes = self.section.quizzes.all()
-        if not required_quizzes.exists():
-            return True
-        # Check quiz answers for this developer
-        passed_count = QuizAnswer.objects.filter(
-            team_member=self.enrollment.developer,
-            question__quiz__in=required_quizzes,
-            evaluator_score__gte=3  # Assuming 3+ is passing
-        ).values('question__quiz').distinct().count()
-        return passed_count >= required_quizzes.count()
+        """
+        Check if all section quizzes have been passed; a section quiz counts
+        as passed once any of its answers has a passing evaluator score
+        """
+        if hasattr(self, '_has_unpassed_quiz'):
+            return not self._has_unpassed_quiz
+        passed = DeveloperQuizResult.objects.filter(
+            developer_id=self.enrollment.developer_id, questions_passed__gte=1
+        ).values('quiz')
+        return not self.section.quizzes.exclude(id__in=passed).exists()
 
 
 class SectionProgressAdmin(admin.ModelAdmin):
@@ -887,6 +1021,9 @@ class SectionProgressAdmin(admin.ModelAdmin):
     search_fields = ('enrollment__developer__first_name', 'enrollment__developer__last_name', 'section__name')
     readonly_fields = ('started_at', 'completed_at')
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_progress()
+
 
 class ResourceProgress(models.Model):
     """
@@ -1507,43 +1644,10 @@ class CertificationLevel(models.Model):
     
     def check_developer_eligibility(self, developer):
         """Check if a developer meets all requirements for this certification"""
-        # Check trainings
-        for training in self.required_trainings.all():
-            enrollment = DeveloperTrainingEnrollment.objects.filter(
-                developer=developer,
-                training=training,
-                status='completed'
-            ).first()
-            if not enrollment:
-                return False, f"Training '{training.name}' not completed"
-        
-        # Check sections
-        for section in self.required_sections.all():
-            progress = SectionProgress.objects.filter(
-                enrollment__developer=developer,
-                section=section,
-                status='completed'
-            ).first()
-            if not progress:
-                return False, f"Section '{section.name}' not completed"
-        
-        # Check quizzes
-        for quiz in self.required_quizzes.all():
-            # Check if developer has answered all questions with passing score
-            total_questions = quiz.questions.count()
-            if total_questions == 0:
-                continue
-            
-            passed_answers = QuizAnswer.objects.filter(
-                team_member=developer,
-                question__quiz=quiz,
-                evaluator_score__gte=3  # Assuming 3+ out of 4 is passing
-            ).count()
-            
-            if passed_answers < total_questions:
-                return False, f"Quiz '{quiz.name}' not passed"
-        
-        return True, "All requirements met"
+        from .eligibility import evaluate_level_eligibility
+
+        result = evaluate_level_eligibility([developer], [self])[(developer.pk, self.pk)]
+        return result.eligible, result.reason
     
     class Meta:
         ordering = ['level_type', 'name']
@@ -1769,6 +1873,28 @@ class Notification(models.Model):
     
     def __str__(self):
         return f"{self.title} - {self.recipient.get_full_name()}"
+    
+    @staticmethod
+    def unread_count_cache_key(user_id):
+        return f"notifications:unread:{user_id}"
+    
+    @classmethod
+    def get_unread_count(cls, user):
+        """Unread notification count for a user, served from cache with a DB fallback"""
+        from django.conf import settings
+        from django.core.cache import cache
+        key = cls.unread_count_cache_key(user.pk)
+        count = cache.get(key)
+        if count is None:
+            count = cls.objects.filter(recipient=user, is_read=False).count()
+            cache.set(key, count, getattr(settings, 'NOTIFICATION_COUNT_CACHE_TIMEOUT', 300))
+        return count
+    
+    @classmethod
+    def invalidate_unread_count(cls, user_id):
+        """Drop the cached unread count; call after bulk updates that bypass signals"""
+        from django.core.cache import cache
+        cache.delete(cls.unread_count_cache_key(user_id))
 
 
 class LabsAccount(models.Model):
@@ -2107,7 +2233,7 @@ class CommunityNewsletter(models.Model):
         """Update recipient counts from actual recipient records"""
         self.recipient_count = self.recipients.filter(status='sent').count()
         self.failed_count = self.recipients.filter(status='failed').count()
-        self.pending_count = self.recipients.filter(status='pending').count()
+        self.pending_count = self.recipients.filter(status__in=['pending', 'sending']).count()
         if self.pending_count == 0 and self.status == 'sending':
             self.status = 'completed'
         self.save()
@@ -2141,6 +2267,7 @@ class NewsletterRecipient(models.Model):
         ('sent', 'Sent'),
         ('failed', 'Failed'),
         ('pending', 'Pending'),
+        ('sending', 'Sending'),
     ]
     
     newsletter = models.ForeignKey(CommunityNewsletter, on_delete=models.CASCADE, related_name='recipients')
@@ -2150,6 +2277,8 @@ class NewsletterRecipient(models.Model):
     error_message = models.TextField(blank=True, null=True)
     sent_at = models.DateTimeField(null=True, blank=True)
     retry_count = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, help_text="Earliest time a rate-limited send may be retried")
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When a dispatch worker claimed this recipient for sending")
     
     class Meta:
         ordering = ['status', 'email']
@@ -2433,32 +2562,10 @@ class CompositeCertification(models.Model):
         Check if a developer qualifies for this composite certification.
         Returns (is_eligible, message, qualifying_tracks)
         """
-        from .models import DeveloperCertificationProgress
-        
-        # Get all Level 3 certifications for this developer
-        level_3_certs = DeveloperCertificationProgress.objects.filter(
-            developer=developer,
-            level__level__gte=self.min_level,
-            status='completed'
-        ).select_related('level__track')
-        
-        completed_tracks = set()
-        for cert in level_3_certs:
-            completed_tracks.add(cert.level.track)
-        
-        # Check required tracks
-        required_tracks = set(self.required_tracks.all())
-        missing_required = required_tracks - completed_tracks
-        
-        if missing_required:
-            track_names = ', '.join([t.name for t in missing_required])
-            return False, f"Missing required track(s): {track_names}", list(completed_tracks)
-        
-        # Check minimum total tracks
-        if len(completed_tracks) < self.min_total_tracks:
-            return False, f"Need Level {self.min_level}+ in {self.min_total_tracks} tracks, have {len(completed_tracks)}", list(completed_tracks)
-        
-        return True, "All requirements met!", list(completed_tracks)
+        from .eligibility import evaluate_composite_eligibility
+
+        result = evaluate_composite_eligibility([developer], [self])[(developer.pk, self.pk)]
+        return result.eligible, result.reason, list(result.qualifying_tracks)
 
 
 class CompositeCertificationAdmin(admin.ModelAdmin):
@@ -2820,6 +2927,12 @@ class DeveloperCertificationProgress(models.Model):
     resources_completed = models.ManyToManyField('Resource', blank=True, related_name='completed_by_progress')
     quizzes_passed = models.ManyToManyField('Quiz', blank=True, related_name='passed_by_progress')
     
+    # Denormalised counts, kept current by onboarding.signals
+    # (rebuild with: manage.py rebuild_certification_counters)
+    resources_completed_count = models.PositiveIntegerField(default=0)
+    quizzes_passed_count = models.PositiveIntegerField(default=0)
+    approved_projects_count = models.PositiveIntegerField(default=0)
+    
     # Scores
     average_quiz_score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     
@@ -2847,11 +2960,42 @@ class DeveloperCertificationProgress(models.Model):
     def __str__(self):
         return f"{self.developer.first_name} - {self.certification_level} ({self.status})"
     
+    COUNTER_FIELDS = ['resources_completed_count', 'quizzes_passed_count', 'approved_projects_count']
+    
+    @classmethod
+    def counter_expressions(cls):
+        """Correlated subqueries computing each denormalised counter from its source rows"""
+        def count_of(queryset, group_by):
+            return Coalesce(Subquery(
+                queryset.order_by().values(group_by).annotate(total=Count('pk')).values('total')[:1],
+                output_field=models.IntegerField()
+            ), 0)
+        
+        resources = cls.resources_completed.through.objects.filter(developercertificationprogress=OuterRef('pk'))
+        quizzes = cls.quizzes_passed.through.objects.filter(developercertificationprogress=OuterRef('pk'))
+        approved = CertificationProjectSubmission.objects.filter(
+            developer=OuterRef('developer'),
+            project__certification_level=OuterRef('certification_level'),
+            status='approved'
+        )
+        return {
+            'resources_completed_count': count_of(resources, 'developercertificationprogress'),
+            'quizzes_passed_count': count_of(quizzes, 'developercertificationprogress'),
+            'approved_projects_count': count_of(approved, 'developer'),
+        }
+    
+    @classmethod
+    def recount(cls, queryset=None, fields=None):
+        """Recompute the denormalised counters of the given progress rows in one UPDATE"""
+        queryset = cls.objects.all() if queryset is None else queryset
+        expressions = cls.counter_expressions()
+        return queryset.update(**{field: expressions[field] for field in (fields or cls.COUNTER_FIELDS)})
+    
     @property
     def resources_progress_percent(self):
         """Calculate percentage of required resources completed"""
         required = self.certification_level.required_resources_count
-        completed = self.resources_completed.count()
+        completed = self.resources_completed_count
         if required == 0:
             return 100
         return min(100, int((completed / required) * 100))
@@ -2860,7 +3004,7 @@ class DeveloperCertificationProgress(models.Model):
     def quizzes_progress_percent(self):
         """Calculate percentage of required quizzes passed"""
         required = self.certification_level.required_quizzes_count
-        passed = self.quizzes_passed.count()
+        passed = self.quizzes_passed_count
         if required == 0:
             return 100
         return min(100, int((passed / required) * 100))
@@ -2869,11 +3013,7 @@ class DeveloperCertificationProgress(models.Model):
     def projects_progress_percent(self):
         """Calculate percentage of required projects approved"""
         required = self.certification_level.required_projects_count
-        approved = CertificationProjectSubmission.objects.filter(
-            developer=self.developer,
-            project__certification_level=self.certification_level,
-            status='approved'
-        ).count()
+        approved = self.approved_projects_count
         if required == 0:
             return 100
         return min(100, int((approved / required) * 100))
@@ -2887,11 +3027,11 @@ class DeveloperCertificationProgress(models.Model):
     def check_completion(self):
         """Check if all requirements are met for certification"""
         # Check resources
-        if self.resources_completed.count() < self.certification_level.required_resources_count:
+        if self.resources_completed_count < self.certification_level.required_resources_count:
             return False, "More resources need to be completed"
         
         # Check quizzes
-        if self.quizzes_passed.count() < self.certification_level.required_quizzes_count:
+        if self.quizzes_passed_count < self.certification_level.required_quizzes_count:
             return False, "More quizzes need to be passed"
         
         # Check quiz score average
@@ -2899,13 +3039,7 @@ class DeveloperCertificationProgress(models.Model):
             return False, f"Average quiz score ({self.average_quiz_score}%) is below minimum ({self.certification_level.min_quiz_score}%)"
         
         # Check projects
-        approved_projects = CertificationProjectSubmission.objects.filter(
-            developer=self.developer,
-            project__certification_level=self.certification_level,
-            status='approved'
-        ).count()
-        
-        if approved_projects < self.certification_level.required_projects_count:
+        if self.approved_projects_count < self.certification_level.required_projects_count:
             return False, "More project submissions need to be approved"
         
         return True, "All requirements met"
@@ -2914,11 +3048,13 @@ class DeveloperCertificationProgress(models.Model):
 class DeveloperCertificationProgressAdmin(admin.ModelAdmin):
     list_display = ('developer', 'certification_level', 'status', 'overall_progress_percent', 
                    'started_at', 'completed_at')
+    list_select_related = ('developer', 'certification_level__track')
     list_filter = ('status', 'certification_level__track', 'certification_level__level')
     search_fields = ('developer__first_name', 'developer__last_name')
     raw_id_fields = ('developer', 'issued_certificate')
     filter_horizontal = ('resources_completed', 'quizzes_passed')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('resources_completed_count', 'quizzes_passed_count', 'approved_projects_count',
+                       'created_at', 'updated_at')
 
 admin.site.register(DeveloperCertificationProgress, DeveloperCertificationProgressAdmin)
 
@@ -0,0 +1,291 @@
+"""
+Background dispatch engine for community newsletters.
+
+Workers claim pending NewsletterRecipient rows in batches: a short
+SELECT ... FOR UPDATE SKIP LOCKED transaction moves them to 'sending' with a
+claimed_at timestamp and commits, so several workers (and overlapping beat
+runs) can work through the same newsletter without sending twice. Emails are
+then sent outside any transaction and each recipient's outcome is saved on
+its own, so a worker dying mid-batch never rolls back a send that went out.
+Claims older than NEWSLETTER_CLAIM_TIMEOUT (a dead worker) are released back
+to pending; at most the email in flight at the crash can be sent again.
+
+Sends are paced by a token bucket, and rate-limited sends are pushed back with
+exponential backoff tracked in retry_count / next_attempt_at.
+
+The newsletter body is rendered once per dispatch (PreparedEmail) and each
+batch is sent over a single email backend connection.
+
+The Celery tasks in onboarding.tasks are thin wrappers around this module.
+"""
+
+import calendar
+import logging
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+NEWSLETTER_TEMPLATE = 'emails/community_newsletter.html'
+
+# SMTP replies that mean "slow down" rather than "this address is bad"
+RATE_LIMIT_SMTP_CODES = (421, 429, 450, 451, 452)
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` sends per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+
+    def _refill(self):
+        current = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (current - self._last) * self.rate)
+        self._last = current
+
+    def acquire(self):
+        """Block until a token is available, then take it. A rate of 0 means unlimited."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        while self.tokens < 1:
+            self._sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+def default_bucket():
+    return TokenBucket(settings.NEWSLETTER_SEND_RATE, settings.NEWSLETTER_SEND_BURST)
+
+
+def build_newsletter_context(newsletter):
+    """Template context shared by every recipient of a newsletter"""
+    from onboarding.utils import get_site_url
+
+    site_url = get_site_url()
+    today = timezone.now()
+    return {
+        'custom_message': newsletter.custom_message,
+        'month_name': calendar.month_name[today.month],
+        'year': today.year,
+        'total_developers': newsletter.total_developers,
+        'total_customers': newsletter.total_customers,
+        'new_developers_this_month': newsletter.new_developers_this_month,
+        'new_customers_this_month': newsletter.new_customers_this_month,
+        'active_opportunities': newsletter.active_opportunities,
+        'open_source_projects': newsletter.open_source_projects,
+        'dashboard_url': f"{site_url}/onboarding/dashboard/",
+        'certifications_url': f"{site_url}/onboarding/certifications/",
+        'resources_url': f"{site_url}/onboarding/resources/",
+        'unsubscribe_url': f"{site_url}/onboarding/unsubscribe/",
+    }
+
+
+def build_newsletter_email(newsletter):
+    """Render the newsletter once; the result is sent unchanged to every recipient"""
+    from onboarding.utils import PreparedEmail
+
+    return PreparedEmail(newsletter.subject, NEWSLETTER_TEMPLATE, build_newsletter_context(newsletter))
+
+
+def materialize_recipients(newsletter, developers, batch_size=1000):
+    """
+    Create pending NewsletterRecipient rows for a TeamMember queryset with
+    bulk_create, streaming (id, email) pairs instead of loading model instances.
+    Duplicate emails are skipped (one row per address). Returns the row count.
+    Call inside a transaction so a failure leaves no partial recipient list.
+    """
+    from onboarding.models import NewsletterRecipient
+
+    rows = developers.order_by('email', 'id').values_list('id', 'email').iterator(chunk_size=batch_size)
+
+    created = 0
+    batch = []
+    last_email = None
+    for developer_id, email in rows:
+        if email == last_email:
+            continue
+        last_email = email
+        batch.append(NewsletterRecipient(
+            newsletter=newsletter,
+            developer_id=developer_id,
+            email=email,
+            status='pending',
+        ))
+        if len(batch) >= batch_size:
+            NewsletterRecipient.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        NewsletterRecipient.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def is_rate_limited(exc):
+    """True if a send error means the provider is throttling us"""
+    if isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code in RATE_LIMIT_SMTP_CODES:
+        return True
+    message = str(exc)
+    return 'Too many requests' in message or '450' in message
+
+
+def retry_delay(retry_count):
+    """Backoff before the next attempt: NEWSLETTER_RETRY_BACKOFF doubled per retry"""
+    return timedelta(seconds=settings.NEWSLETTER_RETRY_BACKOFF * (2 ** max(retry_count - 1, 0)))
+
+
+def claimable_recipients(newsletter):
+    """Pending recipients whose backoff (if any) has expired"""
+    return newsletter.recipients.filter(status='pending').filter(
+        Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=timezone.now())
+    )
+
+
+def claim_recipients(newsletter, batch_size):
+    """Move up to batch_size claimable recipients to 'sending' and return them"""
+    from onboarding.models import NewsletterRecipient
+
+    with transaction.atomic():
+        ids = list(
+            claimable_recipients(newsletter)
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            NewsletterRecipient.objects.filter(id__in=ids).update(status='sending', claimed_at=timezone.now())
+    return list(NewsletterRecipient.objects.filter(id__in=ids).order_by('id')) if ids else []
+
+
+def release_recipients(recipient_ids):
+    """Return claimed recipients that were never attempted to pending"""
+    from onboarding.models import NewsletterRecipient
+
+    NewsletterRecipient.objects.filter(id__in=recipient_ids, status='sending').update(status='pending', claimed_at=None)
+
+
+def release_stale_claims(newsletter):
+    """Release claims left behind by a worker that died mid-batch. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=settings.NEWSLETTER_CLAIM_TIMEOUT)
+    released = newsletter.recipients.filter(status='sending', claimed_at__lt=cutoff).update(
+        status='pending', claimed_at=None
+    )
+    if released:
+        logger.warning(f"Released {released} stale newsletter claims for newsletter {newsletter.id}")
+    return released
+
+
+def send_to_recipient(email, recipient, connection=None):
+    """
+    Send a prepared newsletter email to one recipient and record the outcome
+    on it (unsaved). Returns 'sent', 'failed' or 'rate_limited'.
+    """
+    try:
+        result = email.send(recipient.email, connection=connection, fail_silently=False)
+    except Exception as e:
+        if connection is not None:
+            # The session may be unusable after an error; the next send reopens it
+            connection.close()
+        recipient.retry_count += 1
+        if not is_rate_limited(e):
+            recipient.status = 'failed'
+            recipient.error_message = str(e)
+            return 'failed'
+        if recipient.retry_count >= settings.NEWSLETTER_MAX_RETRIES:
+            recipient.status = 'failed'
+            recipient.error_message = f'Rate limited after {recipient.retry_count} attempts: {e}'
+        else:
+            # Stays unsent; it becomes claimable again once the backoff expires
+            recipient.error_message = f'Rate limited: {e}'
+            recipient.next_attempt_at = timezone.now() + retry_delay(recipient.retry_count)
+        return 'rate_limited'
+
+    if result:
+        recipient.status = 'sent'
+        recipient.sent_at = timezone.now()
+        recipient.error_message = None
+        recipient.next_attempt_at = None
+        return 'sent'
+
+    recipient.status = 'failed'
+    recipient.error_message = 'Email send returned False'
+    recipient.retry_count += 1
+    return 'failed'
+
+
+def dispatch_batch(newsletter, batch_size=None, bucket=None, email=None):
+    """
+    Claim up to batch_size recipients and send to them over one connection.
+    Returns (processed, rate_limited); a rate limit ends the batch early and the
+    unprocessed rows are released for a later run.
+    """
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    bucket = bucket or default_bucket()
+    email = email or build_newsletter_email(newsletter)
+
+    recipients = claim_recipients(newsletter, batch_size)
+    if not recipients:
+        return 0, False
+
+    processed = 0
+    rate_limited = False
+    connection = get_connection()
+    try:
+        for recipient in recipients:
+            bucket.acquire()
+            outcome = send_to_recipient(email, recipient, connection)
+            if recipient.status == 'sending':
+                # Rate limited with retries left: pending again once the backoff expires
+                recipient.status = 'pending'
+            recipient.claimed_at = None
+            recipient.save(update_fields=['status', 'sent_at', 'error_message', 'retry_count',
+                                          'next_attempt_at', 'claimed_at'])
+            processed += 1
+            if outcome == 'rate_limited':
+                rate_limited = True
+                break
+    finally:
+        connection.close()
+        release_recipients([r.id for r in recipients[processed:]])
+    return processed, rate_limited
+
+
+def dispatch_newsletter(newsletter, batch_size=None, bucket=None, max_batches=None, heartbeat=None):
+    """
+    Send batches until nothing is claimable, the provider rate-limits us, or
+    max_batches is reached. heartbeat, if given, is called before each batch
+    (the Celery task renews its dispatch lock there). Refreshes the newsletter
+    counters and returns the number of recipients processed.
+    """
+    bucket = bucket or default_bucket()
+    email = build_newsletter_email(newsletter)
+    release_stale_claims(newsletter)
+
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        if heartbeat:
+            heartbeat()
+        processed, rate_limited = dispatch_batch(newsletter, batch_size, bucket, email)
+        total += processed
+        batches += 1
+        if not processed or rate_limited:
+            if rate_limited:
+                logger.warning(f"Newsletter {newsletter.id} rate limited; backing off until the next run")
+            break
+
+    newsletter.update_counts()
+    return total
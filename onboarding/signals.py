@@ -1,13 +1,18 @@
 """
 Email notification signals for CollabHub
-Sends admin notifications when new users register
+Sends admin notifications when new users register, and keeps cached or
+denormalised counts (notifications, certification progress, quiz results)
+current
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.models import User
-from .models import TeamMember
+from .models import (
+    TeamMember, Notification, CertificationProject, CertificationProjectSubmission,
+    DeveloperCertificationProgress, DeveloperQuizResult, QuizAnswer, QuizQuestion,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -103,3 +108,107 @@ Admin Dashboard: https://collab.buildly.io/admin/auth/user/{instance.id}/change/
             
         except Exception as e:
             logger.error(f"Failed to send admin notification for {instance.username}: {str(e)}")
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_notification_count(sender, instance, **kwargs):
+    """
+    Drop the recipient's cached unread count when a notification changes
+    """
+    Notification.invalidate_unread_count(instance.recipient_id)
+
+
+def _recount_progress(progress_ids, fields):
+    if progress_ids:
+        DeveloperCertificationProgress.recount(
+            DeveloperCertificationProgress.objects.filter(pk__in=progress_ids), fields
+        )
+
+
+def _progress_m2m_changed(counter_field):
+    """
+    Build an m2m_changed receiver keeping `counter_field` current for either
+    side of the relation (progress.resources_completed.add(...) or
+    resource.completed_by_progress.add(...))
+    """
+    def receiver_func(sender, instance, action, reverse, pk_set, **kwargs):
+        if action == 'pre_clear' and reverse:
+            # The affected progress rows are gone after the clear; remember them
+            instance._cleared_progress_ids = list(
+                sender.objects.filter(**{f'{instance._meta.model_name}_id': instance.pk})
+                .values_list('developercertificationprogress_id', flat=True)
+            )
+            return
+        if action not in ('post_add', 'post_remove', 'post_clear'):
+            return
+        if not reverse:
+            _recount_progress([instance.pk], [counter_field])
+            # Keep the in-memory instance in step so a later save() does not write back a stale count
+            instance.refresh_from_db(fields=[counter_field])
+        elif action == 'post_clear':
+            _recount_progress(getattr(instance, '_cleared_progress_ids', []), [counter_field])
+        else:
+            _recount_progress(pk_set, [counter_field])
+    return receiver_func
+
+
+sync_resources_completed_count = _progress_m2m_changed('resources_completed_count')
+sync_quizzes_passed_count = _progress_m2m_changed('quizzes_passed_count')
+m2m_changed.connect(sync_resources_completed_count, sender=DeveloperCertificationProgress.resources_completed.through)
+m2m_changed.connect(sync_quizzes_passed_count, sender=DeveloperCertificationProgress.quizzes_passed.through)
+
+
+@receiver(post_save, sender=CertificationProjectSubmission)
+@receiver(post_delete, sender=CertificationProjectSubmission)
+def sync_approved_projects_count(sender, instance, raw=False, **kwargs):
+    """
+    Recount approved projects on the developer's progress for the project's level
+    whenever a submission changes (its status may have moved to or from approved)
+    """
+    if raw:
+        return
+    progress = DeveloperCertificationProgress.objects.filter(
+        developer_id=instance.developer_id,
+        certification_level_id__in=CertificationProject.objects.filter(
+            pk=instance.project_id
+        ).values('certification_level_id'),
+    )
+    DeveloperCertificationProgress.recount(progress, ['approved_projects_count'])
+
+
+@receiver(post_save, sender=DeveloperCertificationProgress)
+def count_existing_approved_projects(sender, instance, created, raw=False, **kwargs):
+    """A new progress row starts from the submissions approved before it existed"""
+    if created and not raw:
+        DeveloperCertificationProgress.recount(
+            DeveloperCertificationProgress.objects.filter(pk=instance.pk), ['approved_projects_count']
+        )
+        instance.refresh_from_db(fields=['approved_projects_count'])
+
+
+QUIZ_RESULT_FIELDS = {'evaluator_score', 'evaluated_at', 'question', 'team_member'}
+
+
+@receiver(post_save, sender=QuizAnswer)
+def sync_quiz_result_on_answer_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Refresh the developer's result for the answer's quiz when it is evaluated"""
+    if raw or (update_fields is not None and not QUIZ_RESULT_FIELDS & set(update_fields)):
+        return
+    quiz_ids = QuizQuestion.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True)
+    DeveloperQuizResult.refresh(quiz_ids, [instance.team_member_id])
+
+
+@receiver(post_delete, sender=QuizAnswer)
+def sync_quiz_result_on_answer_delete(sender, instance, **kwargs):
+    quiz_ids = QuizQuestion.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True)
+    DeveloperQuizResult.refresh(quiz_ids, [instance.team_member_id], create=False)
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def sync_quiz_results_on_question_change(sender, instance, raw=False, created=False, **kwargs):
+    """Adding or removing a question changes what passing the quiz means for everyone"""
+    if raw or (kwargs.get('signal') is post_save and not created):
+        return
+    DeveloperQuizResult.refresh([instance.quiz_id], create=False)
@@ -0,0 +1,86 @@
+"""
+Celery tasks for the onboarding app.
+
+dispatch_pending_newsletters runs every minute from the beat schedule
+(CELERY_BEAT_SCHEDULE), so newsletters keep sending without an admin page open.
+"""
+
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# How long a queued dispatch suppresses duplicate enqueues for the same
+# newsletter, on top of the time one paced batch takes (see dispatch_lock_seconds)
+DISPATCH_QUEUE_LOCK_SECONDS = 60
+
+
+@shared_task
+def dispatch_newsletter(newsletter_id, max_batches=None):
+    """Send pending recipients of one newsletter"""
+    from onboarding.models import CommunityNewsletter
+    from onboarding.newsletter_dispatch import dispatch_newsletter as run_dispatch
+
+    try:
+        newsletter = CommunityNewsletter.objects.get(id=newsletter_id, status='sending')
+    except CommunityNewsletter.DoesNotExist:
+        return 0
+    lock_key = _dispatch_lock_key(newsletter_id)
+
+    def hold_lock():
+        # Renewed before every batch: a second dispatcher would pace itself with
+        # its own token bucket and double the real send rate
+        cache.set(lock_key, True, dispatch_lock_seconds())
+
+    try:
+        return run_dispatch(newsletter, max_batches=max_batches, heartbeat=hold_lock)
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task
+def dispatch_pending_newsletters():
+    """Queue a dispatch for every newsletter that still has claimable recipients"""
+    from onboarding.models import CommunityNewsletter
+    from onboarding.newsletter_dispatch import claimable_recipients
+
+    queued = 0
+    for newsletter in CommunityNewsletter.objects.filter(status='sending'):
+        if claimable_recipients(newsletter).exists():
+            queued += queue_newsletter_dispatch(newsletter.id)
+        else:
+            # Refresh counters so fully processed newsletters flip to 'completed'
+            newsletter.update_counts()
+    return queued
+
+
+def queue_newsletter_dispatch(newsletter_id):
+    """
+    Enqueue dispatch_newsletter unless one is queued or running. Returns True
+    if a task was queued. Duplicate dispatches are safe (rows are claimed with
+    SKIP LOCKED) but would multiply the send rate, so polling views and the
+    beat task go through this helper.
+    """
+    if not cache.add(_dispatch_lock_key(newsletter_id), True, dispatch_lock_seconds()):
+        return False
+    try:
+        dispatch_newsletter.delay(newsletter_id)
+    except Exception as e:
+        cache.delete(_dispatch_lock_key(newsletter_id))
+        logger.error(f"Could not queue newsletter {newsletter_id} dispatch: {e}")
+        return False
+    return True
+
+
+def dispatch_lock_seconds():
+    """Lock lifetime: long enough to outlast one batch sent at NEWSLETTER_SEND_RATE"""
+    rate = settings.NEWSLETTER_SEND_RATE
+    batch_seconds = settings.NEWSLETTER_BATCH_SIZE / rate if rate > 0 else 0
+    return DISPATCH_QUEUE_LOCK_SECONDS + int(batch_seconds)
+
+
+def _dispatch_lock_key(newsletter_id):
+    return f"newsletter:dispatch-queued:{newsletter_id}"
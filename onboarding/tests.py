@@ -1,11 +1,27 @@
 """
 Tests for the onboarding app, specifically admin dashboard data accuracy
 """
-from django.test import TestCase, Client
+import io
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.core.cache import cache
+from django.core import mail
+from django.core.mail import get_connection
+from django.template.loader import render_to_string
+from unittest import mock
+import smtplib
 from django.contrib.auth.models import User
 from django.utils.timezone import now
 from datetime import timedelta
-from onboarding.models import TeamMember, TeamMemberType, Quiz, QuizQuestion, QuizAnswer
+from onboarding.models import TeamMember, TeamMemberType, Quiz, QuizQuestion, QuizAnswer, Resource, TeamMemberResource, Notification
+from onboarding.context_processors import assessment_status, user_roles, newsletter_reminder
+from onboarding.middleware import AssessmentRequiredMiddleware
+from onboarding.models import CommunityNewsletter, NewsletterRecipient
+from onboarding.newsletter_dispatch import (
+    TokenBucket, dispatch_batch, dispatch_newsletter, claimable_recipients, materialize_recipients
+)
+from onboarding.utils import send_email
 from onboarding.views import admin_dashboard
 
 
@@ -306,6 +322,546 @@ class AdminDashboardDataTest(TestCase):
         self.assertIn(self.tm_old.id, completion_ids, "Old user with completed assessment should be in completions")
 
 
+class DashboardResourceProgressTest(TestCase):
+    """Test that the developer dashboard annotates resource progress without per-row queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='progressdev',
+            email='progressdev@test.com',
+            password='pass123'
+        )
+        cls.team_member = TeamMember.objects.create(
+            user=cls.user,
+            team_member_type='buildly-hire-frontend',
+            first_name='Progress',
+            last_name='Dev',
+            email='progressdev@test.com',
+            approved=True,
+            has_completed_assessment=True
+        )
+        cls.resource = Resource.objects.create(team_member_type='all', title='Resource A')
+        cls.untouched_resource = Resource.objects.create(team_member_type='all', title='Resource B')
+
+        # Duplicate progress rows exist in older data: the latest one wins
+        TeamMemberResource.objects.create(team_member=cls.team_member, resource=cls.resource, percentage_complete=20)
+        TeamMemberResource.objects.create(team_member=cls.team_member, resource=cls.resource, percentage_complete=60)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def _dashboard_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/onboarding/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_progress_uses_latest_row(self):
+        """Test that progress_percentage comes from the most recent row and defaults to 0"""
+        response, _ = self._dashboard_query_count()
+        progress = {r.id: r.progress_percentage for r in response.context['resources']}
+
+        self.assertEqual(progress[self.resource.id], 60)
+        self.assertEqual(progress[self.untouched_resource.id], 0)
+
+    def test_query_count_constant_with_more_resources(self):
+        """Test that the dashboard query count does not grow with the number of resources"""
+        _, baseline = self._dashboard_query_count()
+
+        for i in range(25):
+            resource = Resource.objects.create(team_member_type='all', title=f'Extra {i}')
+            TeamMemberResource.objects.create(team_member=self.team_member, resource=resource, percentage_complete=i)
+
+        response, with_more = self._dashboard_query_count()
+
+        self.assertEqual(len(response.context['resources']), 27)
+        self.assertEqual(
+            with_more,
+            baseline,
+            f"Dashboard queries grew with resources: {baseline} -> {with_more}"
+        )
+
+
+class AdminAssessmentReportsTest(TestCase):
+    """Test that assessment report stats come from one grouped query per page"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='reportadmin',
+            email='reportadmin@test.com',
+            password='testpass123'
+        )
+        cls.quiz = Quiz.objects.create(
+            name='Report Quiz',
+            owner=cls.admin_user,
+            url='https://example.com/report-quiz',
+            available_date=now().date()
+        )
+        cls.mc_question = QuizQuestion.objects.create(
+            quiz=cls.quiz,
+            question='What is 2+2?',
+            question_type='multiple_choice'
+        )
+        cls.essay_question = QuizQuestion.objects.create(
+            quiz=cls.quiz,
+            question='Explain your experience.',
+            question_type='essay'
+        )
+        cls.evaluated_member = cls._create_member('evaluated')
+        QuizAnswer.objects.create(team_member=cls.evaluated_member, question=cls.mc_question, answer='4')
+        QuizAnswer.objects.create(
+            team_member=cls.evaluated_member,
+            question=cls.essay_question,
+            answer='Plenty',
+            evaluator_score=3,
+            ai_detection_score=85
+        )
+        cls.pending_member = cls._create_member('pending')
+        QuizAnswer.objects.create(team_member=cls.pending_member, question=cls.essay_question, answer='Some')
+        # Members without answers never show up in the report
+        cls._create_member('noanswers')
+
+    @classmethod
+    def _create_member(cls, username):
+        user = User.objects.create_user(username=username, email=f'{username}@test.com', password='pass123')
+        return TeamMember.objects.create(
+            user=user,
+            team_member_type='buildly-hire-backend',
+            first_name=username.title(),
+            last_name='Member',
+            email=f'{username}@test.com'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+
+    def _report(self, **params):
+        response = self.client.get('/onboarding/admin-assessments/', params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_submission_stats(self):
+        """Test that per-member counts match the underlying answers"""
+        response = self._report()
+        by_member = {s['team_member'].id: s for s in response.context['submissions']}
+
+        self.assertEqual(set(by_member), {self.evaluated_member.id, self.pending_member.id})
+        evaluated = by_member[self.evaluated_member.id]
+        self.assertEqual(evaluated['total_answers'], 2)
+        self.assertEqual(evaluated['mc_count'], 1)
+        self.assertEqual(evaluated['essay_count'], 1)
+        self.assertEqual(evaluated['evaluated_essays'], 1)
+        self.assertEqual(evaluated['ai_flagged'], 1)
+        self.assertEqual(evaluated['quiz'], self.quiz)
+        self.assertEqual(by_member[self.pending_member.id]['evaluated_essays'], 0)
+
+    def test_status_filters(self):
+        """Test that status filters keep full answer counts for matching members"""
+        evaluated = self._report(status='evaluated').context['submissions']
+        self.assertEqual([s['team_member'].id for s in evaluated], [self.evaluated_member.id])
+        self.assertEqual(evaluated[0]['total_answers'], 2)
+
+        pending = self._report(status='pending').context['submissions']
+        self.assertEqual([s['team_member'].id for s in pending], [self.pending_member.id])
+
+    def test_query_count_constant_with_more_members(self):
+        """Test that the report query count does not grow with the number of members"""
+        with CaptureQueriesContext(connection) as baseline:
+            self._report()
+
+        for i in range(15):
+            member = self._create_member(f'extra{i}')
+            QuizAnswer.objects.create(team_member=member, question=self.essay_question, answer='More')
+
+        with CaptureQueriesContext(connection) as with_more:
+            response = self._report()
+
+        self.assertEqual(response.context['total_submissions'], 17)
+        self.assertEqual(len(with_more.captured_queries), len(baseline.captured_queries))
+
+
+class AdminDevelopersListTest(TestCase):
+    """Test that developer list filters and pagination run in the database"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='listadmin',
+            email='listadmin@test.com',
+            password='testpass123'
+        )
+        cls.backend_type = TeamMemberType.objects.create(key='list-backend', label='List Backend')
+        cls.approved_dev = cls._create_member(
+            'approveddev', community_approval_date=now(), experience_years=8, is_independent=False
+        )
+        cls.approved_dev.profile_types.add(cls.backend_type)
+        cls.legacy_dev = cls._create_member('legacydev', approved=True, experience_years=4)
+        cls.pending_dev = cls._create_member('pendingdev', experience_years=1)
+
+    @classmethod
+    def _create_member(cls, username, **kwargs):
+        user = User.objects.create_user(username=username, email=f'{username}@test.com', password='pass123')
+        return TeamMember.objects.create(
+            user=user,
+            team_member_type='buildly-hire-backend',
+            first_name=username.title(),
+            last_name='Dev',
+            email=f'{username}@test.com',
+            **kwargs
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+
+    def _developer_ids(self, **params):
+        response = self.client.get('/onboarding/admin/developers/', params)
+        self.assertEqual(response.status_code, 200)
+        return {d['id'] for d in response.context['developers']}
+
+    def test_approval_status_filter(self):
+        """Test that approval_status is annotated and filterable"""
+        self.assertEqual(self._developer_ids(approval='approved'), {self.approved_dev.id})
+        self.assertEqual(self._developer_ids(approval='legacy'), {self.legacy_dev.id})
+        self.assertEqual(self._developer_ids(approval='pending'), {self.pending_dev.id})
+
+    def test_type_experience_and_affiliation_filters(self):
+        """Test that type, experience and affiliation filters match the right developers"""
+        self.assertEqual(self._developer_ids(type='list-backend'), {self.approved_dev.id})
+        self.assertEqual(self._developer_ids(experience='junior'), {self.pending_dev.id})
+        self.assertEqual(self._developer_ids(experience='mid'), {self.legacy_dev.id})
+        self.assertEqual(self._developer_ids(experience='senior'), {self.approved_dev.id})
+        self.assertEqual(self._developer_ids(affiliation='agency'), {self.approved_dev.id})
+        self.assertEqual(self._developer_ids(search='legacydev'), {self.legacy_dev.id})
+
+    def test_query_count_constant_with_more_developers(self):
+        """Test that the list query count does not grow with the number of developers"""
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get('/onboarding/admin/developers/')
+
+        for i in range(15):
+            self._create_member(f'extradev{i}', experience_years=i)
+
+        with CaptureQueriesContext(connection) as with_more:
+            response = self.client.get('/onboarding/admin/developers/')
+
+        self.assertEqual(response.context['total_developers'], TeamMember.objects.count())
+        self.assertEqual(len(with_more.captured_queries), len(baseline.captured_queries))
+
+
+class RequestIdentityTest(TestCase):
+    """Test that middleware and context processors share one identity lookup per request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='identitydev',
+            email='identitydev@test.com',
+            password='pass123'
+        )
+        cls.team_member = TeamMember.objects.create(
+            user=cls.user,
+            team_member_type='buildly-hire-backend',
+            first_name='Identity',
+            last_name='Dev',
+            email='identitydev@test.com',
+            has_completed_assessment=True,
+            assessment_reminder_count=2
+        )
+        Notification.objects.create(
+            recipient=cls.user,
+            notification_type='custom',
+            title='Hello',
+            message='Unread'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_lookups_run_once_per_request(self):
+        """Test that TeamMember, CompanyAdmin and notification queries are not repeated"""
+        request = RequestFactory().get('/onboarding/resources/')
+        request.user = self.user
+
+        # TeamMember, CompanyAdmin and unread notification count
+        with self.assertNumQueries(3):
+            self.assertIsNone(AssessmentRequiredMiddleware(lambda r: None).process_request(request))
+            status = assessment_status(request)
+            roles = user_roles(request)
+            newsletter_reminder(request)
+            user_roles(request)
+
+        self.assertEqual(request.identity.team_member, self.team_member)
+        self.assertFalse(status['needs_assessment'])
+        self.assertEqual(status['assessment_reminder_count'], 2)
+        self.assertFalse(roles['is_company_admin'])
+        self.assertTrue(roles['has_notifications'])
+        self.assertEqual(roles['notification_count'], 1)
+
+
+class UnreadNotificationCountCacheTest(TestCase):
+    """Test that unread notification counts are cached and invalidated on change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='notifydev',
+            email='notifydev@test.com',
+            password='pass123'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _notify(self, **kwargs):
+        return Notification.objects.create(
+            recipient=self.user,
+            notification_type='custom',
+            title='Update',
+            message='Something happened',
+            **kwargs
+        )
+
+    def test_count_served_from_cache(self):
+        """Test that a second read does not hit the database"""
+        self._notify()
+        self.assertEqual(Notification.get_unread_count(self.user), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(Notification.get_unread_count(self.user), 1)
+
+    def test_signals_invalidate_count(self):
+        """Test that creating, reading and deleting notifications refresh the count"""
+        self.assertEqual(Notification.get_unread_count(self.user), 0)
+        notification = self._notify()
+        self.assertEqual(Notification.get_unread_count(self.user), 1)
+
+        notification.is_read = True
+        notification.save()
+        self.assertEqual(Notification.get_unread_count(self.user), 0)
+
+        unread = self._notify()
+        self.assertEqual(Notification.get_unread_count(self.user), 1)
+        unread.delete()
+        self.assertEqual(Notification.get_unread_count(self.user), 0)
+
+    def test_mark_all_read_invalidates_count(self):
+        """Test that the bulk mark-all-read action clears the cached count"""
+        self._notify()
+        self._notify()
+        self.assertEqual(Notification.get_unread_count(self.user), 2)
+
+        self.client.force_login(self.user)
+        self.client.get('/onboarding/notifications/', {'mark_read': 'all'})
+
+        self.assertEqual(Notification.get_unread_count(self.user), 0)
+
+
+@override_settings(NEWSLETTER_SEND_RATE=0, NEWSLETTER_BATCH_SIZE=2)
+class NewsletterDispatchTest(TestCase):
+    """Test the background newsletter dispatcher in eager mode (no broker)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(
+            username='newsletteradmin',
+            email='newsletteradmin@test.com',
+            password='testpass123'
+        )
+        for i in range(3):
+            user = User.objects.create_user(username=f'reader{i}', email=f'reader{i}@test.com', password='pass123')
+            TeamMember.objects.create(
+                user=user,
+                team_member_type='buildly-hire-backend',
+                first_name='Reader',
+                last_name=str(i),
+                email=f'reader{i}@test.com',
+                approved=True,
+                has_completed_assessment=True
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def _newsletter_with_recipients(self):
+        newsletter = CommunityNewsletter.objects.create(
+            subject='Monthly update',
+            custom_message='Hello community',
+            status='sending',
+            sent_by=self.admin_user
+        )
+        for developer in TeamMember.objects.filter(approved=True):
+            NewsletterRecipient.objects.create(newsletter=newsletter, developer=developer, email=developer.email)
+        return newsletter
+
+    def test_send_email_shares_the_prepared_email_send_path(self):
+        """Test that one-off emails go through PreparedEmail.send, including bcc and failures"""
+        self.assertEqual(send_email('reader0@test.com', 'Hi', 'emails/community_approval.html',
+                                    {'first_name': 'Reader'}, bcc=['audit@test.com']), 1)
+        self.assertEqual(mail.outbox[-1].bcc, ['audit@test.com'])
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=smtplib.SMTPException('down')):
+            self.assertFalse(send_email('reader0@test.com', 'Hi', 'emails/community_approval.html', {}))
+        self.assertFalse(send_email('reader0@test.com', 'Hi', 'emails/missing.html', {}))
+
+    def test_token_bucket_paces_sends(self):
+        """Test that the bucket allows a burst and then waits for refills"""
+        clock = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+    def test_dispatch_sends_all_batches(self):
+        """Test that every pending recipient is sent and the newsletter completes"""
+        newsletter = self._newsletter_with_recipients()
+
+        processed = dispatch_newsletter(newsletter)
+
+        self.assertEqual(processed, 3)
+        self.assertEqual(len(mail.outbox), 3)
+        newsletter.refresh_from_db()
+        self.assertEqual(newsletter.status, 'completed')
+        self.assertEqual(newsletter.recipient_count, 3)
+
+    def test_dispatch_renders_once_and_reuses_connection(self):
+        """Test that the template is rendered once and each batch shares one connection"""
+        newsletter = self._newsletter_with_recipients()
+
+        with mock.patch('onboarding.utils.render_to_string', wraps=render_to_string) as render, \
+                mock.patch('onboarding.newsletter_dispatch.get_connection', wraps=get_connection) as connect:
+            dispatch_newsletter(newsletter)
+
+        self.assertEqual(render.call_count, 1)
+        # Batches of 2 and 1 recipients; the final empty claim opens no connection
+        self.assertEqual(connect.call_count, 2)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][0], mail.outbox[2].alternatives[0][0])
+
+    def test_rate_limited_send_backs_off(self):
+        """Test that a rate-limited send stays pending with a backoff and stops the run"""
+        newsletter = self._newsletter_with_recipients()
+        throttled = smtplib.SMTPResponseException(450, b'Too many requests')
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=throttled):
+            processed = dispatch_newsletter(newsletter)
+
+        self.assertEqual(processed, 1)
+        limited = newsletter.recipients.get(retry_count=1)
+        self.assertEqual(limited.status, 'pending')
+        self.assertIsNotNone(limited.next_attempt_at)
+        self.assertNotIn(limited, claimable_recipients(newsletter))
+        self.assertEqual(claimable_recipients(newsletter).count(), 2)
+
+    def test_sends_persist_when_worker_dies_mid_batch(self):
+        """Test that sends already made stay recorded and unattempted claims are released"""
+        newsletter = self._newsletter_with_recipients()
+        bucket = mock.Mock()
+        bucket.acquire.side_effect = [None, SystemExit]
+
+        with self.assertRaises(SystemExit):
+            dispatch_batch(newsletter, batch_size=3, bucket=bucket)
+
+        self.assertEqual(len(mail.outbox), 1)
+        statuses = sorted(newsletter.recipients.values_list('status', flat=True))
+        self.assertEqual(statuses, ['pending', 'pending', 'sent'])
+        self.assertFalse(newsletter.recipients.filter(claimed_at__isnull=False).exists())
+
+    def test_stale_claims_are_released(self):
+        """Test that claims left by a killed worker become claimable after the timeout"""
+        newsletter = self._newsletter_with_recipients()
+        newsletter.recipients.update(status='sending', claimed_at=now() - timedelta(hours=1))
+        fresh = newsletter.recipients.first()
+        NewsletterRecipient.objects.filter(pk=fresh.pk).update(claimed_at=now())
+
+        with override_settings(NEWSLETTER_CLAIM_TIMEOUT=600):
+            processed = dispatch_newsletter(newsletter)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(NewsletterRecipient.objects.get(pk=fresh.pk).status, 'sending')
+        newsletter.refresh_from_db()
+        self.assertEqual(newsletter.pending_count, 1)
+        self.assertEqual(newsletter.status, 'sending')
+
+    @override_settings(NEWSLETTER_BATCH_SIZE=1, NEWSLETTER_SEND_RATE=0.01)
+    def test_running_dispatch_keeps_beat_from_queueing_another(self):
+        """Test that the dispatch lock is held for the whole run, however many batches it takes"""
+        from onboarding import tasks
+
+        newsletter = self._newsletter_with_recipients()
+        requeued = []
+        real_dispatch_batch = dispatch_batch
+
+        def batch(*args, **kwargs):
+            requeued.append(tasks.queue_newsletter_dispatch(newsletter.id))
+            return real_dispatch_batch(*args, **kwargs)
+
+        with mock.patch('onboarding.newsletter_dispatch.dispatch_batch', side_effect=batch), \
+                mock.patch.object(tasks.cache, 'set', wraps=tasks.cache.set) as renew:
+            self.assertEqual(tasks.dispatch_newsletter(newsletter.id), 3)
+
+        self.assertEqual(requeued, [False] * 4)
+        # Each renewal outlasts a batch sent at the configured rate (100s here)
+        renewals = [call.args for call in renew.call_args_list if call.args[0] == tasks._dispatch_lock_key(newsletter.id)]
+        self.assertEqual(len(renewals), 4)
+        self.assertEqual({args[2] for args in renewals}, {tasks.DISPATCH_QUEUE_LOCK_SECONDS + 100})
+        self.assertIsNone(tasks.cache.get(tasks._dispatch_lock_key(newsletter.id)))
+
+    def test_materialize_recipients_in_bulk(self):
+        """Test that recipients are bulk created in batches, one per email address"""
+        user = User.objects.create_user(username='reader-dup', email='reader0@test.com', password='pass123')
+        TeamMember.objects.create(
+            user=user,
+            team_member_type='buildly-hire-backend',
+            first_name='Reader',
+            last_name='Duplicate',
+            email='reader0@test.com',
+            approved=True,
+            has_completed_assessment=True
+        )
+        newsletter = CommunityNewsletter.objects.create(
+            subject='Bulk update',
+            status='sending',
+            sent_by=self.admin_user
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            created = materialize_recipients(newsletter, TeamMember.objects.filter(approved=True), batch_size=2)
+
+        self.assertEqual(created, 3)
+        self.assertEqual(
+            sorted(newsletter.recipients.values_list('email', flat=True)),
+            ['reader0@test.com', 'reader1@test.com', 'reader2@test.com']
+        )
+        # One SELECT plus one INSERT per batch, never one INSERT per recipient
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+
+    def test_create_view_dispatches_in_background(self):
+        """Test that creating a newsletter queues the dispatch without page polling"""
+        self.client.force_login(self.admin_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/onboarding/admin/newsletter/', {
+                'subject': 'Queued newsletter',
+                'custom_message': 'Sent by the worker',
+            })
+
+        newsletter = CommunityNewsletter.objects.get(subject='Queued newsletter')
+        self.assertEqual(newsletter.status, 'completed')
+        self.assertEqual(newsletter.recipients.filter(status='sent').count(), 3)
+
+
 class AdminDashboardProductionDataTest(TestCase):
     """
     Run this test against production database to verify data accuracy.
@@ -382,3 +938,426 @@ class AdminDashboardProductionDataTest(TestCase):
             self.fail(f"Data mismatches found:\n" + "\n".join(errors))
         else:
             print("✓ All dashboard data matches database!")
+
+
+class CertificationJourneyQueryTest(TestCase):
+    """Test that the certification journey is built in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from onboarding.models import CertificationTrack
+        user = User.objects.create_user(username='journeydev', email='journeydev@test.com', password='pass123')
+        cls.user = user
+        cls.member = TeamMember.objects.create(
+            user=user, team_member_type='buildly-hire-backend', first_name='Journey', last_name='Dev',
+            email='journeydev@test.com', has_completed_assessment=True, assessment_completed_at=now(),
+        )
+        cls.resource = Resource.objects.create(
+            team_member_type='buildly-hire-backend', title='Journey Resource', link='https://example.com/r'
+        )
+        keys = [key for key, _ in CertificationTrack.TRACK_CHOICES]
+        cls.first_level = cls._create_track(keys[0], 0)
+        cls.spare_keys = keys[1:]
+
+    @classmethod
+    def _create_track(cls, key, order):
+        """Create a track with three levels; progress and an approved project on level 1"""
+        from onboarding.models import (
+            CertificationTrack, CommunityCertificationLevel, DeveloperCertificationProgress,
+            CertificationProject, CertificationProjectSubmission
+        )
+        track = CertificationTrack.objects.create(key=key, name=key.title(), description='x', order=order)
+        levels = [
+            CommunityCertificationLevel.objects.create(
+                track=track, level=number, name=f'{key} {number}', description='x', required_projects_count=2
+            )
+            for number in (1, 2, 3)
+        ]
+        progress = DeveloperCertificationProgress.objects.create(
+            developer=cls.member, certification_level=levels[0], status='in_progress'
+        )
+        progress.resources_completed.add(cls.resource)
+        for number, status in enumerate(('approved', 'approved', 'submitted')):
+            project = CertificationProject.objects.create(
+                certification_level=levels[0], name=f'p{number}', description='x'
+            )
+            CertificationProjectSubmission.objects.create(
+                developer=cls.member, project=project, title='t', description='x',
+                repository_url='https://github.com/x/y', status=status,
+            )
+        return levels[0]
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_query_count_constant_with_more_tracks(self):
+        """Test that adding tracks, levels and progress does not add queries"""
+        # Warm per-user caches (e.g. the unread notification count)
+        self.client.get('/onboarding/certifications/')
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.client.get('/onboarding/certifications/')
+        self.assertEqual(response.status_code, 200)
+        level = response.context['tracks'][0].levels_list[0]
+        self.assertEqual(level.approved_projects, 2)
+        self.assertEqual(level.progress.overall_progress_percent, int((16 + 0 + 100) / 3))
+
+        for order, key in enumerate(self.spare_keys[:3], start=1):
+            self._create_track(key, order)
+
+        with CaptureQueriesContext(connection) as with_more:
+            response = self.client.get('/onboarding/certifications/')
+
+        self.assertEqual(len(response.context['tracks']), 4)
+        self.assertEqual(len(with_more.captured_queries), len(baseline.captured_queries))
+
+
+class CertificationProgressCounterTest(TestCase):
+    """Test the denormalised counters on DeveloperCertificationProgress"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from onboarding.models import (
+            CertificationTrack, CommunityCertificationLevel, DeveloperCertificationProgress, CertificationProject
+        )
+        user = User.objects.create_user(username='counterdev', email='counterdev@test.com', password='pass123')
+        cls.member = TeamMember.objects.create(
+            user=user, team_member_type='buildly-hire-backend', first_name='Counter', last_name='Dev',
+            email='counterdev@test.com',
+        )
+        track = CertificationTrack.objects.create(key='backend', name='Backend', description='x')
+        cls.level = CommunityCertificationLevel.objects.create(
+            track=track, level=1, name='Backend 1', description='x',
+            required_resources_count=2, required_quizzes_count=1, required_projects_count=1,
+        )
+        cls.progress = DeveloperCertificationProgress.objects.create(developer=cls.member, certification_level=cls.level)
+        cls.resources = [
+            Resource.objects.create(team_member_type='buildly-hire-backend', title=f'R{i}', link=f'https://example.com/{i}')
+            for i in range(2)
+        ]
+        cls.quiz = Quiz.objects.create(name='Q', owner=user, available_date=now().date(), url='https://example.com/q')
+        cls.project = CertificationProject.objects.create(certification_level=cls.level, name='P', description='x')
+
+    def _fresh(self):
+        from onboarding.models import DeveloperCertificationProgress
+        return DeveloperCertificationProgress.objects.select_related('certification_level').get(pk=self.progress.pk)
+
+    def test_m2m_changes_update_counters_from_either_side(self):
+        """Test that adds, removes and clears on both sides keep the counts current"""
+        self.progress.resources_completed.add(*self.resources)
+        self.assertEqual(self.progress.resources_completed_count, 2)
+        self.resources[0].completed_by_progress.remove(self.progress)
+        self.assertEqual(self._fresh().resources_completed_count, 1)
+        self.resources[1].completed_by_progress.clear()
+        self.assertEqual(self._fresh().resources_completed_count, 0)
+
+        self.quiz.passed_by_progress.add(self.progress)
+        self.assertEqual(self._fresh().quizzes_passed_count, 1)
+
+    def test_submission_status_updates_approved_count(self):
+        """Test that approving, rejecting and deleting submissions recount projects"""
+        from onboarding.models import CertificationProjectSubmission
+        submission = CertificationProjectSubmission.objects.create(
+            developer=self.member, project=self.project, title='t', description='x',
+            repository_url='https://github.com/x/y', status='approved',
+        )
+        self.assertEqual(self._fresh().approved_projects_count, 1)
+        submission.status = 'rejected'
+        submission.save()
+        self.assertEqual(self._fresh().approved_projects_count, 0)
+        submission.status = 'approved'
+        submission.save()
+        submission.delete()
+        self.assertEqual(self._fresh().approved_projects_count, 0)
+
+    def test_reading_progress_runs_no_queries(self):
+        """Test that percentages and completion checks read the stored counters"""
+        self.progress.resources_completed.add(*self.resources)
+        self.progress.quizzes_passed.add(self.quiz)
+        progress = self._fresh()
+        with self.assertNumQueries(0):
+            self.assertEqual(progress.overall_progress_percent, int((100 + 100 + 0) / 3))
+            self.assertEqual(progress.check_completion()[0], False)
+
+    def test_rebuild_command(self):
+        """Test that the command reports and repairs stale counters"""
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from onboarding.models import DeveloperCertificationProgress
+        self.progress.resources_completed.add(self.resources[0])
+        DeveloperCertificationProgress.objects.filter(pk=self.progress.pk).update(resources_completed_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_certification_counters', '--check', stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('rebuild_certification_counters', stdout=out)
+        self.assertIn('1 were stale', out.getvalue())
+        self.assertEqual(self._fresh().resources_completed_count, 1)
+        call_command('rebuild_certification_counters', '--check', stdout=io.StringIO())
+
+
+class CertificationEligibilityTest(TestCase):
+    """Test the set-based certification eligibility evaluator and auto-issuing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from onboarding.models import (
+            CertificationLevel, CertificationTrack, CommunityCertificationLevel, CompositeCertification,
+            Customer, DeveloperCertificationProgress, DeveloperTrainingEnrollment, SectionProgress,
+            TeamTraining, TrainingSection,
+        )
+        owner = User.objects.create_user(username='eligowner', email='eligowner@test.com', password='pass123')
+        customer = Customer.objects.create(
+            company_name='Elig Co', contact_name='Owner', contact_email='elig@test.com',
+            username='eligco', password='pass123',
+        )
+        cls.training = TeamTraining.objects.create(customer=customer, name='Onboarding')
+        cls.section = TrainingSection.objects.create(training=cls.training, name='Basics', order=1)
+        cls.quiz = Quiz.objects.create(name='Basics Quiz', owner=owner, available_date=now().date(), url='https://example.com/q')
+        questions = [
+            QuizQuestion.objects.create(team_member_type='buildly-hire-backend', quiz=cls.quiz,
+                                        question=f'Q{i}', question_type='essay')
+            for i in range(2)
+        ]
+        cls.level = CertificationLevel.objects.create(name='Team Certified', description='x')
+        cls.level.required_trainings.add(cls.training)
+        cls.level.required_sections.add(cls.section)
+        cls.level.required_quizzes.add(cls.quiz)
+
+        cls.tracks = [
+            CertificationTrack.objects.create(key=key, name=key.title(), description='x', order=i)
+            for i, key in enumerate(['leadership', 'backend', 'frontend'])
+        ]
+        cls.composite = CompositeCertification.objects.create(
+            key='cto_lead', name='CTO', description='x', min_level=3, min_total_tracks=2,
+        )
+        cls.composite.required_tracks.add(cls.tracks[0])
+        senior_levels = [
+            CommunityCertificationLevel.objects.create(track=track, level=3, name=f'{track.name} 3', description='x')
+            for track in cls.tracks
+        ]
+
+        cls.members = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'elig{i}', email=f'elig{i}@test.com', password='pass123')
+            cls.members.append(TeamMember.objects.create(
+                user=user, team_member_type='buildly-hire-backend', first_name='Elig', last_name=str(i),
+                email=f'elig{i}@test.com', approved=True,
+            ))
+        complete, no_quiz, no_section, nothing = cls.members
+
+        for member in (complete, no_quiz, no_section):
+            enrollment = DeveloperTrainingEnrollment.objects.create(developer=member, training=cls.training, status='completed')
+            if member is not no_section:
+                SectionProgress.objects.create(enrollment=enrollment, section=cls.section, status='completed')
+        for question in questions:
+            QuizAnswer.objects.create(question=question, team_member=complete, answer='a', evaluator_score=4)
+        QuizAnswer.objects.create(question=questions[0], team_member=no_quiz, answer='a', evaluator_score=4)
+        QuizAnswer.objects.create(question=questions[1], team_member=no_quiz, answer='a', evaluator_score=2)
+
+        # complete: leadership + backend; no_quiz: backend + frontend; no_section: leadership only
+        for member, levels in ((complete, senior_levels[:2]), (no_quiz, senior_levels[1:]), (no_section, senior_levels[:1])):
+            for level in levels:
+                DeveloperCertificationProgress.objects.create(developer=member, certification_level=level, status='completed')
+
+    def test_matrix_reasons_match_requirements(self):
+        """Test that each cell carries the first unmet requirement, as the model methods report"""
+        from onboarding.eligibility import evaluate_certification_eligibility
+        complete, no_quiz, no_section, nothing = self.members
+        matrix = evaluate_certification_eligibility(self.members, [self.level, self.composite])
+
+        self.assertEqual(matrix[(complete.id, self.level)][:2], (True, 'All requirements met'))
+        self.assertEqual(matrix[(no_quiz.id, self.level)].reason, "Quiz 'Basics Quiz' not passed")
+        self.assertEqual(matrix[(no_section.id, self.level)].reason, "Section 'Basics' not completed")
+        self.assertEqual(matrix[(nothing.id, self.level)].reason, "Training 'Onboarding' not completed")
+
+        self.assertTrue(matrix[(complete.id, self.composite)].eligible)
+        self.assertEqual(list(matrix[(complete.id, self.composite)].qualifying_tracks), self.tracks[:2])
+        self.assertEqual(matrix[(no_quiz.id, self.composite)].reason, 'Missing required track(s): Leadership')
+        self.assertEqual(matrix[(no_section.id, self.composite)].reason, 'Need Level 3+ in 2 tracks, have 1')
+
+        for member in self.members:
+            self.assertEqual(self.level.check_developer_eligibility(member), tuple(matrix[(member.id, self.level)][:2]))
+            eligible, reason, tracks = self.composite.check_developer_eligibility(member)
+            self.assertEqual((eligible, reason), tuple(matrix[(member.id, self.composite)][:2]))
+
+    def test_query_count_does_not_grow_with_developers(self):
+        """Test that the evaluator runs the same number of queries for one or many developers"""
+        from onboarding.eligibility import evaluate_certification_eligibility
+        from onboarding.models import CertificationLevel, CompositeCertification
+
+        def certifications():
+            return [CertificationLevel.objects.get(pk=self.level.pk), CompositeCertification.objects.get(pk=self.composite.pk)]
+
+        first, second = certifications(), certifications()
+        with CaptureQueriesContext(connection) as single:
+            evaluate_certification_eligibility(self.members[:1], first)
+        with CaptureQueriesContext(connection) as many:
+            evaluate_certification_eligibility(self.members, second)
+        self.assertEqual(len(single), len(many))
+
+    def test_auto_issue_certificates(self):
+        """Test that the batch command issues only missing certificates for eligible developers"""
+        from django.core.management import call_command
+        from onboarding.models import DeveloperCertification, DeveloperCompositeCertification
+        complete = self.members[0]
+
+        out = io.StringIO()
+        call_command('auto_issue_certificates', '--dry-run', stdout=out)
+        self.assertIn('Would issue 2 certificates', out.getvalue())
+        self.assertFalse(DeveloperCertification.objects.exists())
+
+        call_command('auto_issue_certificates', '--skip-documents', '--batch-size', '2', stdout=io.StringIO())
+        cert = DeveloperCertification.objects.get()
+        self.assertEqual((cert.developer, cert.certification_level), (complete, self.level))
+        self.assertTrue(cert.verify_hash())
+        award = DeveloperCompositeCertification.objects.get()
+        self.assertEqual(award.developer, complete)
+        self.assertEqual(set(award.qualifying_tracks.all()), set(self.tracks[:2]))
+
+        out = io.StringIO()
+        call_command('auto_issue_certificates', '--skip-documents', stdout=out)
+        self.assertIn('Issued 0 certificates', out.getvalue())
+
+
+class DeveloperQuizResultTest(TestCase):
+    """Test the per developer and quiz result summary"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from onboarding.models import Customer, DeveloperTrainingEnrollment, SectionProgress, TeamTraining, TrainingSection
+        cls.admin_user = User.objects.create_superuser(username='resultadmin', email='resultadmin@test.com', password='pass123')
+        user = User.objects.create_user(username='resultdev', email='resultdev@test.com', password='pass123')
+        cls.member = TeamMember.objects.create(
+            user=user, team_member_type='buildly-hire-backend', first_name='Result', last_name='Dev',
+            email='resultdev@test.com',
+        )
+        cls.quiz = Quiz.objects.create(name='Section Quiz', owner=cls.admin_user, available_date=now().date(), url='https://example.com/q')
+        cls.questions = [
+            QuizQuestion.objects.create(quiz=cls.quiz, question=f'Q{i}', question_type='essay') for i in range(2)
+        ]
+        cls.answers = [
+            QuizAnswer.objects.create(question=question, team_member=cls.member, answer='a')
+            for question in cls.questions
+        ]
+        customer = Customer.objects.create(
+            company_name='Result Co', contact_name='Owner', contact_email='result@test.com',
+            username='resultco', password='pass123',
+        )
+        training = TeamTraining.objects.create(customer=customer, name='Training')
+        cls.section = TrainingSection.objects.create(training=training, name='Section', order=1)
+        cls.section.quizzes.add(cls.quiz)
+        enrollment = DeveloperTrainingEnrollment.objects.create(developer=cls.member, training=training)
+        cls.progress = SectionProgress.objects.create(enrollment=enrollment, section=cls.section)
+
+    def _evaluate(self, answer, score):
+        self.client.force_login(self.admin_user)
+        response = self.client.post(f'/onboarding/admin-assessment/{self.member.id}/review/', {
+            'bulk_evaluation': '1',
+            'answer_ids': [answer.id],
+            f'score_{answer.id}': score,
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def _result(self):
+        from onboarding.models import DeveloperQuizResult
+        return DeveloperQuizResult.objects.get(developer=self.member, quiz=self.quiz)
+
+    def test_evaluations_update_the_summary(self):
+        """Test that evaluating answers keeps best score, pass flag and evaluation time current"""
+        self.assertFalse(self._result().passed)
+        self.assertIsNone(self._result().best_score)
+
+        self._evaluate(self.answers[0], 4)
+        result = self._result()
+        self.assertEqual((result.best_score, result.questions_passed, result.passed), (4, 1, False))
+        self.assertIsNotNone(result.last_evaluated_at)
+
+        self._evaluate(self.answers[1], 3)
+        self.assertTrue(self._result().passed)
+
+        # A new question has to be answered before the quiz counts as passed again
+        QuizQuestion.objects.create(quiz=self.quiz, question='Q2', question_type='essay')
+        self.assertFalse(self._result().passed)
+
+    def test_section_quiz_check_reads_the_summary(self):
+        """Test that quizzes_passed and progress_percent agree with and without annotations"""
+        from onboarding.models import SectionProgress
+        self.assertFalse(self.progress.quizzes_passed())
+        self._evaluate(self.answers[0], 4)
+        self.assertTrue(SectionProgress.objects.get(pk=self.progress.pk).quizzes_passed())
+
+        annotated = SectionProgress.objects.with_progress().get(pk=self.progress.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(annotated.quizzes_passed())
+            self.assertEqual(annotated.progress_percent(), 0)
+
+        self.answers[0].delete()
+        self.assertFalse(SectionProgress.objects.with_progress().get(pk=self.progress.pk).quizzes_passed())
+        self.assertEqual(self._result().questions_passed, 0)
+
+    def test_section_quiz_passes_with_one_evaluated_answer(self):
+        """Test that a section still only needs one passing answer while certifications need all"""
+        from onboarding.models import SectionProgress
+        self._evaluate(self.answers[1], 3)
+
+        self.assertFalse(self._result().passed)
+        self.assertTrue(SectionProgress.objects.get(pk=self.progress.pk).quizzes_passed())
+        self.assertTrue(SectionProgress.objects.with_progress().get(pk=self.progress.pk).quizzes_passed())
+
+
+class BulkEnrollmentTest(TestCase):
+    """Test enrolling whole developer teams into a training"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from onboarding.models import Customer, DeveloperTeam, TeamTraining, TrainingSection
+        cls.admin_user = User.objects.create_superuser(username='enrolladmin', email='enrolladmin@test.com', password='pass123')
+        customer = Customer.objects.create(
+            company_name='Enroll Co', contact_name='Owner', contact_email='enroll@test.com',
+            username='enrollco', password='pass123',
+        )
+        cls.training = TeamTraining.objects.create(customer=customer, name='Training')
+        cls.sections = [
+            TrainingSection.objects.create(training=cls.training, name=f'Section {i}', order=i) for i in range(2)
+        ]
+        TrainingSection.objects.create(training=cls.training, name='Retired', order=9, is_active=False)
+        cls.team = DeveloperTeam.objects.create(customer=customer, name='Squad')
+        cls.members = []
+        for i in range(6):
+            user = User.objects.create_user(username=f'enroll{i}', email=f'enroll{i}@test.com', password='pass123')
+            cls.members.append(TeamMember.objects.create(
+                user=user, team_member_type='buildly-hire-backend', first_name='Enroll', last_name=str(i),
+                email=f'enroll{i}@test.com',
+            ))
+
+    def test_enrollment_queries_do_not_grow_with_team_size(self):
+        """Test that enrolling a team runs the same queries for two or six members"""
+        from onboarding.enrollment import enroll_developers
+        from onboarding.models import DeveloperTrainingEnrollment
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(enroll_developers(self.training, self.members[:2]), 2)
+        DeveloperTrainingEnrollment.objects.all().delete()
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(enroll_developers(self.training, self.members), 6)
+        self.assertEqual(len(small), len(large))
+
+    def test_assign_team_enrolls_missing_members_with_section_progress(self):
+        """Test that assigning a team skips existing enrolments and pre-creates section progress"""
+        from onboarding.enrollment import enroll_developers
+        from onboarding.models import DeveloperTrainingEnrollment, SectionProgress
+        self.team.members.add(*self.members)
+        enroll_developers(self.training, self.members[:1])
+
+        self.client.force_login(self.admin_user)
+        response = self.client.post(f'/onboarding/admin/trainings/{self.training.id}/assign-team/', {'team_id': self.team.id})
+        self.assertEqual(response.status_code, 302)
+
+        enrollments = DeveloperTrainingEnrollment.objects.filter(training=self.training)
+        self.assertEqual(enrollments.count(), 6)
+        self.assertEqual(enrollments.filter(assigned_by=self.admin_user).count(), 5)
+        self.assertEqual(
+            set(SectionProgress.objects.values_list('enrollment__developer_id', 'section_id')),
+            {(member.id, section.id) for member in self.members for section in self.sections},
+        )
+        self.assertEqual(self.training.auto_enroll_team_members(), 0)
@@ -72,37 +72,83 @@ def send_email(to_email: str, subject: str, template_name: str, context: dict, f
         context: Context data for template
         from_email: Sender email (defaults to DEFAULT_FROM_EMAIL)
         bcc: List of BCC email addresses
+    
+    Returns the number of messages sent, or False on errors.
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    if not from_email:
-        from_email = settings.DEFAULT_FROM_EMAIL or 'noreply@buildly.io'
-    
     try:
-        # Render HTML and text versions
-        html_content = render_to_string(template_name, context)
-        text_content = strip_tags(html_content)
-        
-        # Create email
+        email = PreparedEmail(subject, template_name, context, from_email)
+    except Exception as e:
+        logger.error(f"Error rendering email to {to_email}: {str(e)}")
+        return False
+    return email.send(to_email, bcc=bcc)
+
+
+class PreparedEmail:
+    """
+    An email rendered once and sent to many recipients.
+
+    render_to_string/strip_tags run in the constructor; each send only swaps
+    in per-recipient values (plain str.replace of placeholder keys, e.g. an
+    unsubscribe token) and builds the message. Pass a connection from
+    django.core.mail.get_connection() to send a whole batch over one
+    backend connection.
+    """
+
+    def __init__(self, subject: str, template_name: str, context: dict, from_email: str = None):
+        self.subject = subject
+        self.from_email = from_email or settings.DEFAULT_FROM_EMAIL or 'noreply@buildly.io'
+        self.html_content = render_to_string(template_name, context)
+        self.text_content = strip_tags(self.html_content)
+
+    @staticmethod
+    def _substitute(content: str, substitutions: dict = None) -> str:
+        for placeholder, value in (substitutions or {}).items():
+            content = content.replace(placeholder, str(value))
+        return content
+
+    def message(self, to_email: str, substitutions: dict = None, connection=None, bcc: list = None):
+        """Build the EmailMultiAlternatives for one recipient"""
         email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=from_email,
+            subject=self.subject,
+            body=self._substitute(self.text_content, substitutions),
+            from_email=self.from_email,
             to=[to_email],
-            bcc=bcc or []
+            bcc=bcc or [],
+            connection=connection,
         )
-        email.attach_alternative(html_content, "text/html")
-        
-        # Send via MailerSend
-        result = email.send()
-        logger.info(f"Email sent successfully to {to_email}: subject='{subject}', result={result}")
-        print(f"[EMAIL] Sent to {to_email}: {subject} (result: {result})")
-        return result
-    except Exception as e:
-        logger.error(f"Error sending email to {to_email}: {str(e)}")
-        print(f"[EMAIL ERROR] Failed to send to {to_email}: {str(e)}")
-        return False
+        email.attach_alternative(self._substitute(self.html_content, substitutions), "text/html")
+        return email
+
+    def send(self, to_email: str, substitutions: dict = None, connection=None, bcc: list = None,
+             fail_silently: bool = True):
+        """
+        Send to one recipient, reusing connection if given.
+
+        Returns the number of messages sent, or False on errors unless
+        fail_silently is off (callers that need to tell rate limits from hard
+        failures re-raise).
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+
+        try:
+            email = self.message(to_email, substitutions, connection, bcc)
+            if connection is not None:
+                # Open explicitly so send_messages() keeps the connection for the next recipient
+                connection.open()
+                result = connection.send_messages([email])
+            else:
+                result = email.send()
+            logger.info(f"Email sent successfully to {to_email}: subject='{self.subject}', result={result}")
+            return result
+        except Exception as e:
+            logger.error(f"Error sending email to {to_email}: {str(e)}")
+            if not fail_silently:
+                raise
+            return False
 
 
 def send_community_approval_email(team_member, profile_type=None):
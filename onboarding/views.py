@@ -6,10 +6,14 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.models import User
 from django.views.generic import CreateView
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, F, Max, OuterRef, Subquery, Case, When, Value, CharField, Prefetch, prefetch_related_objects
 from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.db import transaction
 from .forms import TeamMemberRegistrationForm, ResourceForm, TeamMemberUpdateForm, DevelopmentAgencyForm
 from .models import TeamMember, TeamMemberType, Resource, TeamMemberResource,CertificationExam,Quiz, QuizQuestion, QuizAnswer, DevelopmentAgency, TEAM_MEMBER_TYPES, Customer, CustomerDeveloperAssignment, Contract, TeamTraining, DeveloperTrainingEnrollment, DeveloperTeam
+from .identity import get_request_identity
+from .enrollment import enroll_developers
 from submission.models import SubmissionLink, Submission
 from django.contrib import messages
 from django.utils.timezone import now
@@ -100,10 +104,8 @@ def edit_profile(request):
 
 @login_required
 def dashboard(request):
-    try:
-        team_member = TeamMember.objects.get(user=request.user)
-    except TeamMember.DoesNotExist:
-        team_member = None
+    identity = get_request_identity(request)
+    team_member = identity.team_member
 
     # Redirect to assessment if not completed (regardless of approval status)
     if team_member is not None and not team_member.has_completed_assessment:
@@ -172,20 +174,10 @@ def dashboard(request):
             )
         
         resources = resources.distinct().order_by('team_member_type', 'title')
-        
-        # Add progress data to resources
-        for resource in resources:
-            # Use filter().first() to handle potential duplicates and get the most recent one
-            member_resource = TeamMemberResource.objects.filter(
-                team_member=team_member, 
-                resource=resource
-            ).order_by('-id').first()
-            
-            if member_resource:
-                resource.progress_percentage = member_resource.percentage_complete
-            else:
-                resource.progress_percentage = 0
-        
+
+        # Add progress data to resources in the same query (latest row per resource)
+        resources = TeamMemberResource.annotate_progress(resources, team_member)
+
         member_resource = TeamMemberResource.objects.filter(team_member=team_member)
         certification_exams = CertificationExam.objects.filter(team_member=team_member)
         calendar_embed_code = team_member.google_calendar_embed_code if team_member else None
@@ -202,15 +194,12 @@ def dashboard(request):
 
         # Fetch contracts for company admins
         contracts = []
-        company_admin = None
-        try:
-            company_admin = CompanyAdmin.objects.get(user=request.user)
+        company_admin = identity.company_admin
+        if company_admin is not None:
             # Get contracts for this company admin's customer
             contracts = Contract.objects.filter(
                 customer=company_admin.customer
             ).order_by('-created_at')
-        except CompanyAdmin.DoesNotExist:
-            pass
         
         # Fetch certificates for this developer
         from .models import DeveloperCertification, DeveloperPublicProfile
@@ -782,6 +771,17 @@ def assessment_complete(request):
 # ADMIN VIEWS - Dashboard, Reports, and Management
 # ============================================================================
 
+# Sort options for the assessment report (GET value -> ORDER BY)
+ASSESSMENT_REPORT_SORTS = {
+    'newest': (F('submitted_at').desc(nulls_first=True), '-id'),
+    'oldest': (F('submitted_at').asc(nulls_last=True), 'id'),
+    'name': ('first_name', 'last_name', 'id'),
+    'ai_flagged': ('-ai_flagged', F('submitted_at').desc(nulls_first=True), '-id'),
+    'pending': ('-pending_essays', F('submitted_at').desc(nulls_first=True), '-id'),
+}
+ASSESSMENT_REPORT_PAGE_SIZE = 50
+
+
 @user_passes_test(lambda u: u.is_staff)
 def admin_assessment_reports(request):
     """List all assessment submissions with filtering and search"""
@@ -789,11 +789,26 @@ def admin_assessment_reports(request):
     quiz_filter = request.GET.get('quiz', '')
     status_filter = request.GET.get('status', '')
     search_query = request.GET.get('search', '')
-    
-    # Get all team members who have submitted answers
-    team_members_with_answers = TeamMember.objects.filter(
-        quizanswer__isnull=False
-    ).distinct()
+    sort = request.GET.get('sort', 'newest')
+    if sort not in ASSESSMENT_REPORT_SORTS:
+        sort = 'newest'
+    
+    # Per-member answer stats in one grouped query
+    essay_q = Q(quizanswer__question__question_type='essay')
+    first_quiz = QuizAnswer.objects.filter(
+        team_member=OuterRef('pk')
+    ).order_by('id').values('question__quiz_id')[:1]
+    
+    team_members_with_answers = TeamMember.objects.annotate(
+        total_answers=Count('quizanswer'),
+        mc_count=Count('quizanswer', filter=Q(quizanswer__question__question_type='multiple_choice')),
+        essay_count=Count('quizanswer', filter=essay_q),
+        evaluated_essays=Count('quizanswer', filter=essay_q & Q(quizanswer__evaluator_score__isnull=False)),
+        pending_essays=Count('quizanswer', filter=essay_q & Q(quizanswer__evaluator_score__isnull=True)),
+        ai_flagged=Count('quizanswer', filter=Q(quizanswer__ai_detection_score__gte=70)),
+        submitted_at=Max('quizanswer__submitted_at'),
+        quiz_id=Subquery(first_quiz),
+    ).filter(total_answers__gt=0)
     
     # Apply filters
     if search_query:
@@ -804,62 +819,50 @@ def admin_assessment_reports(request):
             Q(user__username__icontains=search_query)
         )
     
+    # Status filters run against the aggregates so they don't narrow the counted answers
     if status_filter == 'evaluated':
         team_members_with_answers = team_members_with_answers.filter(
-            quizanswer__evaluator_score__isnull=False
-        ).distinct()
+            id__in=QuizAnswer.objects.filter(evaluator_score__isnull=False).values('team_member_id')
+        )
     elif status_filter == 'pending':
-        team_members_with_answers = team_members_with_answers.filter(
-            quizanswer__question__question_type='essay',
-            quizanswer__evaluator_score__isnull=True
-        ).distinct()
+        team_members_with_answers = team_members_with_answers.filter(pending_essays__gt=0)
     
-    # Get submission data for each team member
-    submissions = []
-    for tm in team_members_with_answers:
-        answers = QuizAnswer.objects.filter(team_member=tm)
-        
-        # Get quiz info
-        quiz = None
-        if answers.exists():
-            quiz = answers.first().question.quiz
-        
-        # Count questions by type
-        mc_count = answers.filter(question__question_type='multiple_choice').count()
-        essay_count = answers.filter(question__question_type='essay').count()
-        
-        # Check evaluation status
-        essay_answers = answers.filter(question__question_type='essay')
-        evaluated_essays = essay_answers.filter(evaluator_score__isnull=False).count()
-        
-        # AI detection
-        ai_flagged = answers.filter(
-            ai_detection_score__gte=70
-        ).count()
-        
-        submissions.append({
-            'team_member': tm,
-            'quiz': quiz,
-            'total_answers': answers.count(),
-            'mc_count': mc_count,
-            'essay_count': essay_count,
-            'evaluated_essays': evaluated_essays,
-            'ai_flagged': ai_flagged,
-            'submitted_at': answers.order_by('-submitted_at').first().submitted_at if answers.exists() else None,
-        })
+    team_members_with_answers = team_members_with_answers.order_by(*ASSESSMENT_REPORT_SORTS[sort])
+    
+    paginator = Paginator(team_members_with_answers, ASSESSMENT_REPORT_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    # Only the current page is materialised; roles and quizzes are fetched in bulk
+    page_members = list(page_obj.object_list)
+    prefetch_related_objects(page_members, 'profile_types')
+    quizzes = Quiz.objects.in_bulk({tm.quiz_id for tm in page_members if tm.quiz_id})
     
-    # Sort by submission date (newest first)
-    submissions.sort(key=lambda x: x['submitted_at'] or now(), reverse=True)
+    submissions = [
+        {
+            'team_member': tm,
+            'quiz': quizzes.get(tm.quiz_id),
+            'total_answers': tm.total_answers,
+            'mc_count': tm.mc_count,
+            'essay_count': tm.essay_count,
+            'evaluated_essays': tm.evaluated_essays,
+            'ai_flagged': tm.ai_flagged,
+            'submitted_at': tm.submitted_at,
+        }
+        for tm in page_members
+    ]
     
     # Get available quizzes for filter dropdown
     available_quizzes = Quiz.objects.all()
     
     context = {
         'submissions': submissions,
+        'page_obj': page_obj,
+        'total_submissions': paginator.count,
         'available_quizzes': available_quizzes,
         'search_query': search_query,
         'status_filter': status_filter,
         'quiz_filter': quiz_filter,
+        'sort': sort,
     }
     
     return render(request, 'admin_assessment_reports.html', context)
@@ -2163,91 +2166,107 @@ def admin_contract_delete(request, contract_id):
     return redirect('onboarding:admin_customer_detail', customer_id=customer_id)
 
 
-@user_passes_test(lambda u: u.is_staff)
+ADMIN_DEVELOPERS_PAGE_SIZE = 50
+
+
 @user_passes_test(lambda u: u.is_staff)
 def admin_developers_list(request):
     """Unified admin developer management with search, filters, and approval"""
-    from onboarding.models import DeveloperTeam, DeveloperTrainingEnrollment, Quiz
-    developers = TeamMember.objects.all().prefetch_related('tech_skills', 'types', 'profile_types', 'developer_teams').order_by('-id')
-    # Annotate each developer with approval status, team, and profile/quiz/training links
-    developer_list = []
-    for dev in developers:
-        # Approval status
-        if dev.community_approval_date:
-            approval_status = 'approved'
-        elif dev.approved:
-            approval_status = 'legacy'
-        else:
-            approval_status = 'pending'
-        # Team (first team or None)
-        team = dev.developer_teams.first()
-        team_name = team.name if team else None
-        # Profile URL
-        from django.urls import reverse
-        profile_url = reverse('onboarding:admin_developer_profile', args=[dev.id])
-        # Quizzes: link to profile with anchor
-        quizzes_url = f"{profile_url}#assessmentDetails"
-        # Trainings: link to profile with anchor
-        trainings_url = f"{profile_url}#resources"
-        developer_list.append({
-            'id': dev.id,
-            'first_name': dev.first_name,
-            'last_name': dev.last_name,
-            'email': dev.email,
-            'github_account': dev.get_github_username() or '',
-            'experience_years': dev.experience_years,
-            'tech_skills': dev.tech_skills.all(),
-            'user': dev.user,
-            'approval_status': approval_status,
-            'team': team_name,
-            'profile_url': profile_url,
-            'quizzes_url': quizzes_url,
-            'trainings_url': trainings_url,
-            'community_approval_date': dev.community_approval_date,
-            'approved': dev.approved,
-            'types': dev.types.all(),
-        })
-    # ...existing code...
+    from django.urls import reverse
+    developers = TeamMember.objects.select_related('user').annotate(
+        approval_status=Case(
+            When(community_approval_date__isnull=False, then=Value('approved')),
+            When(approved=True, then=Value('legacy')),
+            default=Value('pending'),
+            output_field=CharField(),
+        )
+    )
     
     # Search
     search_query = request.GET.get('search', '')
     if search_query:
-        developer_list = [d for d in developer_list if search_query.lower() in (d['first_name'].lower() + d['last_name'].lower() + d['email'].lower() + (d['github_account'] or '').lower())]
+        developers = developers.filter(
+            Q(first_name__icontains=search_query) |
+            Q(last_name__icontains=search_query) |
+            Q(email__icontains=search_query) |
+            Q(github_account__icontains=search_query)
+        )
     
     # Filter by approval status
     approval_filter = request.GET.get('approval', '')
     if approval_filter:
-        developer_list = [d for d in developer_list if d['approval_status'] == approval_filter]
+        developers = developers.filter(approval_status=approval_filter)
     
     # Filter by team member type
     type_filter = request.GET.get('type', '')
     if type_filter:
-        developer_list = [d for d in developer_list if any(t.key == type_filter for t in d['types'])]
+        developers = developers.filter(profile_types__key=type_filter)
     
     # Filter by experience level
     exp_filter = request.GET.get('experience', '')
     if exp_filter == 'junior':
-        developer_list = [d for d in developer_list if d['experience_years'] and d['experience_years'] < 3]
+        developers = developers.filter(experience_years__gt=0, experience_years__lt=3)
     elif exp_filter == 'mid':
-        developer_list = [d for d in developer_list if d['experience_years'] and 3 <= d['experience_years'] < 7]
+        developers = developers.filter(experience_years__gte=3, experience_years__lt=7)
     elif exp_filter == 'senior':
-        developer_list = [d for d in developer_list if d['experience_years'] and d['experience_years'] >= 7]
+        developers = developers.filter(experience_years__gte=7)
     
     # Filter by affiliation
     affiliation_filter = request.GET.get('affiliation', '')
     if affiliation_filter == 'independent':
-        developer_list = [d for d in developer_list if getattr(TeamMember.objects.get(id=d['id']), 'is_independent', True)]
+        developers = developers.filter(is_independent=True)
     elif affiliation_filter == 'agency':
-        developer_list = [d for d in developer_list if not getattr(TeamMember.objects.get(id=d['id']), 'is_independent', True)]
+        developers = developers.filter(is_independent=False)
     
     # Sort by last name, first name
-    developer_list = sorted(developer_list, key=lambda d: (d['last_name'], d['first_name']))
+    developers = developers.order_by('last_name', 'first_name', 'id')
+    
+    paginator = Paginator(developers, ADMIN_DEVELOPERS_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    
+    # Only the current page is materialised, with its related rows prefetched
+    page_developers = list(page_obj.object_list)
+    prefetch_related_objects(page_developers, 'tech_skills', 'profile_types', 'developer_teams')
+    
+    developer_list = []
+    for dev in page_developers:
+        # Team (first team or None)
+        teams = dev.developer_teams.all()
+        team_name = teams[0].name if teams else None
+        # Profile URL
+        profile_url = reverse('onboarding:admin_developer_profile', args=[dev.id])
+        developer_list.append({
+            'id': dev.id,
+            'first_name': dev.first_name,
+            'last_name': dev.last_name,
+            'email': dev.email,
+            'github_account': dev.get_github_username() or '',
+            'experience_years': dev.experience_years,
+            'tech_skills': dev.tech_skills.all(),
+            'user': dev.user,
+            'approval_status': dev.approval_status,
+            'team': team_name,
+            'profile_url': profile_url,
+            # Quizzes and trainings link to profile anchors
+            'quizzes_url': f"{profile_url}#assessmentDetails",
+            'trainings_url': f"{profile_url}#resources",
+            'community_approval_date': dev.community_approval_date,
+            'approved': dev.approved,
+            'types': dev.types.all(),
+        })
 
     # Get unique types for filter dropdown
     all_types = TeamMemberType.objects.all().order_by('label')
 
+    # Preserve active filters in pagination links
+    filter_params = request.GET.copy()
+    filter_params.pop('page', None)
+
     context = {
         'developers': developer_list,
+        'page_obj': page_obj,
+        'total_developers': paginator.count,
+        'filter_querystring': filter_params.urlencode(),
         'search_query': search_query,
         'approval_filter': approval_filter,
         'type_filter': type_filter,
@@ -2578,6 +2597,7 @@ def sync_github_skills(request, developer_id):
     """Sync technology skills from GitHub"""
     import requests
     from django.utils import timezone
+    from mysite.github_client import RateLimited, get_github_client
     from onboarding.models import TechnologySkill
     
     developer = get_object_or_404(TeamMember, id=developer_id)
@@ -2589,7 +2609,7 @@ def sync_github_skills(request, developer_id):
     
     try:
         # Get repos from GitHub API
-        response = requests.get(f'https://api.github.com/users/{github_username}/repos', timeout=10)
+        response = get_github_client().get(f'/users/{github_username}/repos')
         response.raise_for_status()
         repos = response.json()
         
@@ -2664,6 +2684,8 @@ def sync_github_skills(request, developer_id):
                 updated_count += 1
         
         messages.success(request, f"Successfully synced skills from GitHub! Updated {updated_count} technologies.")
+    except RateLimited as e:
+        messages.error(request, f"GitHub's rate limit is exhausted; try again in {max(e.retry_after // 60, 1)} minute(s).")
     except requests.RequestException as e:
         messages.error(request, f"Failed to fetch GitHub data: {str(e)}")
     except Exception as e:
@@ -3416,12 +3438,14 @@ def notification_center(request):
     # Mark as read if requested
     if request.GET.get('mark_read') == 'all':
         notifications.filter(is_read=False).update(is_read=True)
+        # Bulk update skips post_save, so clear the cached count explicitly
+        Notification.invalidate_unread_count(request.user.pk)
         messages.success(request, 'All notifications marked as read.')
         return redirect('onboarding:notification_center')
     
     context = {
         'notifications': notifications,
-        'unread_count': notifications.filter(is_read=False).count()
+        'unread_count': get_request_identity(request).unread_notification_count
     }
     
     return render(request, 'notification_center.html', context)
@@ -3443,7 +3467,7 @@ def notification_mark_read(request, notification_id):
 @login_required
 def notification_unread_count(request):
     """API endpoint for unread notification count"""
-    count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+    count = get_request_identity(request).unread_notification_count
     return JsonResponse({'count': count})
 
 
@@ -3951,12 +3975,7 @@ def admin_training_enroll(request, training_id):
             messages.error(request, 'Developer must be community-approved first.')
             return redirect('onboarding:admin_training_detail', training_id=training.id)
 
-    enrollment, created = DeveloperTrainingEnrollment.objects.get_or_create(
-        developer=developer,
-        training=training,
-        defaults={'assigned_by': request.user}
-    )
-    if created:
+    if enroll_developers(training, [developer], assigned_by=request.user):
         messages.success(request, f"Assigned {developer.first_name} {developer.last_name} to training.")
     else:
         messages.info(request, 'Developer is already assigned to this training.')
@@ -4984,9 +5003,7 @@ def admin_community_newsletter(request):
             approved=True
         ).exclude(email='').exclude(email__isnull=True)
         
-        recipient_emails = list(approved_developers.values_list('email', flat=True))
-        
-        if not recipient_emails:
+        if not approved_developers.exists():
             messages.error(request, 'No approved developers with email addresses found.')
             return redirect('onboarding:admin_community_newsletter')
         
@@ -5013,38 +5030,38 @@ def admin_community_newsletter(request):
         }
         
         try:
-            from onboarding.models import NewsletterRecipient
+            from onboarding.newsletter_dispatch import materialize_recipients
             
-            # Create newsletter record first with 'sending' status
-            newsletter = CommunityNewsletter.objects.create(
-                subject=subject,
-                custom_message=custom_message,
-                total_customers=total_customers,
-                total_developers=total_developers,
-                new_customers_this_month=new_customers_this_month,
-                new_developers_this_month=new_developers_this_month,
-                active_opportunities=active_opportunities,
-                open_source_projects=open_source_projects,
-                status='sending',
-                recipient_count=0,
-                failed_count=0,
-                pending_count=len(approved_developers),
-                sent_by=request.user,
-            )
-            
-            # Create all recipients as pending
-            for developer in approved_developers:
-                NewsletterRecipient.objects.create(
-                    newsletter=newsletter,
-                    developer=developer,
-                    email=developer.email,
-                    status='pending',
+            with transaction.atomic():
+                # Create newsletter record first with 'sending' status
+                newsletter = CommunityNewsletter.objects.create(
+                    subject=subject,
+                    custom_message=custom_message,
+                    total_customers=total_customers,
+                    total_developers=total_developers,
+                    new_customers_this_month=new_customers_this_month,
+                    new_developers_this_month=new_developers_this_month,
+                    active_opportunities=active_opportunities,
+                    open_source_projects=open_source_projects,
+                    status='sending',
+                    recipient_count=0,
+                    failed_count=0,
+                    pending_count=0,
+                    sent_by=request.user,
                 )
+                
+                # Create all recipients as pending, streamed in bulk batches
+                recipient_total = materialize_recipients(newsletter, approved_developers)
+                newsletter.pending_count = recipient_total
+                newsletter.save(update_fields=['pending_count'])
+            
+                # Hand off to the background dispatcher once the rows are committed
+                from onboarding.tasks import queue_newsletter_dispatch
+                transaction.on_commit(lambda: queue_newsletter_dispatch(newsletter.id))
             
-            # Redirect to the detail page where processing will happen
             messages.info(
                 request, 
-                f'Newsletter created with {len(approved_developers)} recipients. Processing will begin shortly.'
+                f'Newsletter created with {recipient_total} recipients. Sending will continue in the background.'
             )
             return redirect('onboarding:admin_newsletter_detail', newsletter_id=newsletter.id)
                 
@@ -5078,7 +5095,7 @@ def admin_newsletter_detail(request, newsletter_id):
     # Get recipients grouped by status
     sent_recipients = newsletter.recipients.filter(status='sent')
     failed_recipients = newsletter.recipients.filter(status='failed')
-    pending_recipients = newsletter.recipients.filter(status='pending')
+    pending_recipients = newsletter.recipients.filter(status__in=['pending', 'sending'])
     
     total_recipients = sent_recipients.count() + failed_recipients.count() + pending_recipients.count()
     
@@ -5097,102 +5114,29 @@ def admin_newsletter_detail(request, newsletter_id):
 @login_required
 @user_passes_test(lambda u: u.is_staff)
 def admin_newsletter_process(request, newsletter_id):
-    """Process a batch of pending newsletter emails with rate limiting"""
-    from onboarding.models import CommunityNewsletter, NewsletterRecipient
-    from onboarding.utils import send_email, get_site_url
+    """Make sure a background dispatch is queued and report progress (for AJAX polling)"""
+    from onboarding.models import CommunityNewsletter
+    from onboarding.newsletter_dispatch import claimable_recipients
+    from onboarding.tasks import queue_newsletter_dispatch
     from django.http import JsonResponse
-    import calendar
-    import time
     
     newsletter = get_object_or_404(CommunityNewsletter, id=newsletter_id)
     
-    # Get pending recipients (process in batches of 5)
-    BATCH_SIZE = 5
-    DELAY_BETWEEN_EMAILS = 2  # seconds
-    
-    pending_recipients = newsletter.recipients.filter(status='pending')[:BATCH_SIZE]
-    
-    if not pending_recipients.exists():
-        # No more pending, mark as completed
-        newsletter.update_counts()
-        return JsonResponse({
-            'status': 'completed',
-            'sent': newsletter.recipient_count,
-            'failed': newsletter.failed_count,
-            'pending': 0,
-            'message': 'All emails processed!'
-        })
-    
-    # Prepare email context
-    site_url = get_site_url()
-    today = now()
-    month_name = calendar.month_name[today.month]
-    
-    email_context = {
-        'custom_message': newsletter.custom_message,
-        'month_name': month_name,
-        'year': today.year,
-        'total_developers': newsletter.total_developers,
-        'total_customers': newsletter.total_customers,
-        'new_developers_this_month': newsletter.new_developers_this_month,
-        'new_customers_this_month': newsletter.new_customers_this_month,
-        'active_opportunities': newsletter.active_opportunities,
-        'open_source_projects': newsletter.open_source_projects,
-        'dashboard_url': f"{site_url}/onboarding/dashboard/",
-        'certifications_url': f"{site_url}/onboarding/certifications/",
-        'resources_url': f"{site_url}/onboarding/resources/",
-        'unsubscribe_url': f"{site_url}/onboarding/unsubscribe/",
-    }
-    
-    processed_in_batch = 0
-    
-    for recipient in pending_recipients:
-        try:
-            result = send_email(
-                to_email=recipient.email,
-                subject=newsletter.subject,
-                template_name='emails/community_newsletter.html',
-                context=email_context,
-            )
-            if result:
-                recipient.status = 'sent'
-                recipient.sent_at = now()
-                recipient.error_message = None
-            else:
-                recipient.status = 'failed'
-                recipient.error_message = 'Email send returned False'
-                recipient.retry_count += 1
-        except Exception as e:
-            error_msg = str(e)
-            # Check if it's a rate limit error
-            if 'Too many requests' in error_msg or '450' in error_msg:
-                recipient.error_message = f'Rate limited: {error_msg}'
-                # Don't mark as failed, leave as pending for retry
-                recipient.retry_count += 1
-            else:
-                recipient.status = 'failed'
-                recipient.error_message = error_msg
-                recipient.retry_count += 1
-        
-        recipient.save()
-        processed_in_batch += 1
-        
-        # Add delay between emails to avoid rate limiting
-        if processed_in_batch < len(pending_recipients):
-            time.sleep(DELAY_BETWEEN_EMAILS)
+    queued = False
+    if newsletter.status == 'sending' and claimable_recipients(newsletter).exists():
+        queued = queue_newsletter_dispatch(newsletter.id)
     
-    # Update counts
+    newsletter.refresh_from_db()
     newsletter.update_counts()
-    
-    remaining = newsletter.recipients.filter(status='pending').count()
+    remaining = newsletter.pending_count
     
     return JsonResponse({
         'status': 'processing' if remaining > 0 else 'completed',
         'sent': newsletter.recipient_count,
         'failed': newsletter.failed_count,
         'pending': remaining,
-        'processed_batch': processed_in_batch,
-        'message': f'Processed {processed_in_batch} emails. {remaining} remaining.'
+        'queued': queued,
+        'message': f'{remaining} remaining. Sending continues in the background.' if remaining else 'All emails processed!'
     })
 
 
@@ -5231,12 +5175,16 @@ def admin_newsletter_resend(request, newsletter_id):
         return redirect('onboarding:admin_newsletter_detail', newsletter_id=newsletter_id)
     
     # Mark all failed as pending for retry
-    failed_count = newsletter.recipients.filter(status='failed').update(status='pending', error_message=None)
+    failed_count = newsletter.recipients.filter(status='failed').update(
+        status='pending', error_message=None, retry_count=0, next_attempt_at=None
+    )
     
     if failed_count > 0:
         newsletter.status = 'sending'
         newsletter.update_counts()
-        messages.info(request, f'Marked {failed_count} failed recipients for retry. Processing will begin.')
+        from onboarding.tasks import queue_newsletter_dispatch
+        queue_newsletter_dispatch(newsletter.id)
+        messages.info(request, f'Marked {failed_count} failed recipients for retry. Sending will continue in the background.')
     else:
         messages.info(request, 'No failed recipients to retry.')
     
@@ -5852,18 +5800,15 @@ def manage_public_profile(request):
                 try:
                     import requests
                     from django.utils import timezone
+                    from mysite.github_client import RateLimited, get_github_client
                     
-                    # Use OAuth token if available for better rate limits
-                    headers = {'Accept': 'application/vnd.github.v3+json'}
-                    if github_oauth_token:
-                        headers['Authorization'] = f'token {github_oauth_token}'
+                    # Per-user calls never spend the server's GITHUB_API_TOKEN budget:
+                    # use the member's OAuth token, or GitHub's anonymous (per-IP) limit
+                    client = get_github_client()
+                    token = github_oauth_token or ''
                     
                     # Fetch user data from GitHub API
-                    user_response = requests.get(
-                        f'https://api.github.com/users/{github_username}',
-                        headers=headers,
-                        timeout=10
-                    )
+                    user_response = client.get(f'/users/{github_username}', token=token)
                     
                     if user_response.status_code == 200:
                         user_data = user_response.json()
@@ -5873,10 +5818,11 @@ def manage_public_profile(request):
                         # Fetch repos with stars for total stars count and top repos
                         total_stars = 0
                         top_repos = []
-                        repos_response = requests.get(
-                            f'https://api.github.com/users/{github_username}/repos?per_page=100&sort=updated',
-                            headers=headers,
-                            timeout=15
+                        repos_response = client.get(
+                            f'/users/{github_username}/repos',
+                            token=token,
+                            params={'per_page': 100, 'sort': 'updated'},
+                            timeout=(5, 15)
                         )
                         if repos_response.status_code == 200:
                             repos = repos_response.json()
@@ -5899,10 +5845,10 @@ def manage_public_profile(request):
                         profile.github_top_repos = top_repos
                         
                         # Get contribution stats from events
-                        events_response = requests.get(
-                            f'https://api.github.com/users/{github_username}/events/public?per_page=100',
-                            headers=headers,
-                            timeout=10
+                        events_response = client.get(
+                            f'/users/{github_username}/events/public',
+                            token=token,
+                            params={'per_page': 100}
                         )
                         
                         if events_response.status_code == 200:
@@ -5926,6 +5872,9 @@ def manage_public_profile(request):
                     else:
                         messages.error(request, f"Could not fetch GitHub data. Status: {user_response.status_code}")
                         
+                except RateLimited as e:
+                    hint = "" if github_oauth_token else " Connect your GitHub account to sync with your own rate limit."
+                    messages.error(request, f"GitHub's rate limit is exhausted; try again in {max(e.retry_after // 60, 1)} minute(s).{hint}")
                 except requests.RequestException as e:
                     messages.error(request, f"Error syncing GitHub stats: {str(e)}")
                 except Exception as e:
@@ -6046,10 +5995,7 @@ def certification_journey(request):
     Main certification journey page showing all tracks and progress.
     Allows developers to see available certifications and start/continue their journey.
     """
-    from .models import (
-        CertificationTrack, CommunityCertificationLevel, DeveloperCertificationProgress,
-        CertificationProjectSubmission
-    )
+    from .models import CertificationTrack, CommunityCertificationLevel, DeveloperCertificationProgress
     
     try:
         team_member = TeamMember.objects.get(user=request.user)
@@ -6057,8 +6003,14 @@ def certification_journey(request):
         messages.error(request, 'You must be a registered developer to view certifications.')
         return redirect('onboarding:dashboard')
     
-    # Get all active tracks with their levels
-    tracks = CertificationTrack.objects.filter(is_active=True).order_by('order')
+    # Get all active tracks with their active levels (one query for all levels)
+    tracks = CertificationTrack.objects.filter(is_active=True).order_by('order').prefetch_related(
+        Prefetch(
+            'levels',
+            queryset=CommunityCertificationLevel.objects.filter(is_active=True).order_by('level'),
+            to_attr='active_levels',
+        )
+    )
     
     # Get developer's progress
     progress_map = {}
@@ -6066,6 +6018,7 @@ def certification_journey(request):
         developer=team_member
     ).select_related('certification_level', 'certification_level__track')
     
+    # Progress rows carry denormalised resource/quiz/project counters
     for p in developer_progress:
         progress_map[p.certification_level_id] = p
     
@@ -6074,29 +6027,17 @@ def certification_journey(request):
     active_progress = []
     
     for track in tracks:
-        levels = CommunityCertificationLevel.objects.filter(
-            track=track, 
-            is_active=True
-        ).order_by('level')
-        
         levels_list = []
         completed_levels = 0
         previous_completed = True  # Level 1 is always unlocked
         
-        for level in levels:
+        for level in track.active_levels:
             progress = progress_map.get(level.id)
             
             # Check if level is locked (previous level not completed)
             is_locked = level.level > 1 and not previous_completed
             
-            # Count approved projects for this level
-            approved_projects = 0
-            if progress:
-                approved_projects = CertificationProjectSubmission.objects.filter(
-                    developer=team_member,
-                    project__certification_level=level,
-                    status='approved'
-                ).count()
+            approved_projects = progress.approved_projects_count if progress else 0
             
             level.progress = progress
             level.is_locked = is_locked
@@ -6206,7 +6147,7 @@ def certification_level_detail(request, level_id):
         from django.utils import timezone
         progress.status = 'in_progress'
         progress.started_at = timezone.now()
-        progress.save()
+        progress.save(update_fields=['status', 'started_at', 'updated_at'])
     
     # Get resources linked to this level
     resources = level.resources.all()
@@ -6228,11 +6169,7 @@ def certification_level_detail(request, level_id):
         project.submission_status = submission.status if submission else None
     
     # Count approved projects
-    approved_projects = CertificationProjectSubmission.objects.filter(
-        developer=team_member,
-        project__certification_level=level,
-        status='approved'
-    ).count()
+    approved_projects = progress.approved_projects_count
     
     # Check if can complete
     can_complete, reason = progress.check_completion()
@@ -6343,7 +6280,7 @@ def complete_certification(request, level_id):
     # Mark progress as completed
     progress.status = 'completed'
     progress.completed_at = timezone.now()
-    progress.save()
+    progress.save(update_fields=['issued_certificate', 'status', 'completed_at', 'updated_at'])
     
     messages.success(request, f'🎉 Congratulations! You\'ve earned the {level.name} certification!')
     